@@ -0,0 +1,194 @@
+import os
+import sys
+import json
+import time
+import argparse
+import pandas as pd
+from dotenv import load_dotenv
+
+# Load environment variables from a .env file, before the project modules:
+# their settings are read when they're imported
+load_dotenv()
+
+from src import nodes
+from src.graph import OutReachAutomation
+from src.tools.leads_loader.file_loader import FileLeadLoader
+from src.tools.local_docs_manager import LocalDocsManager
+from src.usage import JobUsage, job_usage, format_usage_summary
+
+import logging
+
+# Configure logging for CLI usage
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger(__name__)
+
+
+def load_leads(file_path):
+    if file_path.endswith('.csv'):
+        df = pd.read_csv(file_path)
+    elif file_path.endswith(('.xls', '.xlsx')):
+        df = pd.read_excel(file_path)
+    else:
+        raise ValueError("Invalid file format")
+    df.columns = [c.strip().upper() for c in df.columns]
+    # Leads to process have an empty STATUS (see FileLeadLoader.fetch_records)
+    for col, default_val in {"STATUS": "", "LEAD_SCORE": 0, "QUALIFIED": "NO"}.items():
+        if col not in df.columns:
+            df[col] = default_val
+    df["STATUS"] = df["STATUS"].fillna("")
+    return df
+
+
+def run_mode(file_path, mode, output_dir):
+    """
+    Run the graph variant on a fresh copy of the leads, reports are written
+    locally under `<output_dir>/<mode>` and no email draft is created.
+    """
+    mode_dir = os.path.join(output_dir, mode)
+    lead_loader = FileLeadLoader(load_leads(file_path))
+    automation = OutReachAutomation(
+        lead_loader,
+        docs_manager=LocalDocsManager(os.path.join(mode_dir, "docs")),
+        fused=(mode == "fused"),
+        use_async=False,
+    )
+
+    usage = JobUsage()
+    token = job_usage.set(usage)
+    started_at = time.monotonic()
+    try:
+        automation.app.invoke({"leads_ids": []}, {"recursion_limit": 1000})
+    finally:
+        job_usage.reset(token)
+    wall_time = time.monotonic() - started_at
+
+    summary = usage.summary()
+    result = {
+        "mode": mode,
+        "wall_time": round(wall_time, 2),
+        "usage": summary,
+        "outputs": lead_outputs(lead_loader, os.path.join(mode_dir, "docs")),
+    }
+    with open(os.path.join(mode_dir, "usage.json"), "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"[{mode}] done in {wall_time:.1f}s")
+    print(format_usage_summary(summary))
+    return result
+
+
+def lead_outputs(lead_loader, docs_root):
+    """
+    Per-lead outputs of a run, to compare the quality of the graph variants:
+    status, score & qualification of each lead (by row) and the size of each
+    report saved in the per-lead folders ({folder: {title: characters}}).
+    """
+    columns = [col for col in ("STATUS", "LEAD_SCORE", "QUALIFIED") if col in lead_loader.df.columns]
+    leads = {
+        str(index): {col: (None if pd.isna(value) else str(value)) for col, value in row.items()}
+        for index, row in lead_loader.df[columns].iterrows()
+    }
+    reports = {}
+    leads_root = os.path.join(docs_root, "Lead_Reports")
+    if os.path.isdir(leads_root):
+        for folder in sorted(os.listdir(leads_root)):
+            folder_path = os.path.join(leads_root, folder)
+            reports[folder] = {}
+            for file_name in sorted(os.listdir(folder_path)):
+                with open(os.path.join(folder_path, file_name), encoding="utf-8", errors="replace") as f:
+                    reports[folder][os.path.splitext(file_name)[0]] = len(f.read())
+    return {"leads": leads, "reports": reports}
+
+
+def compare_outputs(standard, fused):
+    """
+    Side-by-side summary of the per-lead outputs of two runs: lead scores &
+    qualification, and the reports found in one run only or in both (with
+    their sizes).
+    """
+    leads = []
+    for lead_id in sorted(set(standard["leads"]) | set(fused["leads"]), key=lambda x: (len(x), x)):
+        a, b = standard["leads"].get(lead_id, {}), fused["leads"].get(lead_id, {})
+        leads.append({
+            "lead": lead_id,
+            "score": [a.get("LEAD_SCORE"), b.get("LEAD_SCORE")],
+            "qualified": [a.get("QUALIFIED"), b.get("QUALIFIED")],
+            "same_qualification": a.get("QUALIFIED") == b.get("QUALIFIED"),
+        })
+    reports = []
+    for folder in sorted(set(standard["reports"]) | set(fused["reports"])):
+        a, b = standard["reports"].get(folder, {}), fused["reports"].get(folder, {})
+        for title in sorted(set(a) | set(b)):
+            reports.append({"folder": folder, "report": title, "chars": [a.get(title), b.get(title)]})
+    return {"leads": leads, "reports": reports}
+
+
+def print_output_comparison(comparison):
+    print(f"\n{'lead':<10} {'standard score / qualified':>29}{'fused score / qualified':>29}")
+    for lead in comparison["leads"]:
+        marker = "" if lead["same_qualification"] else "  <- differs"
+        print(
+            f"{lead['lead']:<10} {str(lead['score'][0]):>16} / {str(lead['qualified'][0]):<10}"
+            f"{str(lead['score'][1]):>16} / {str(lead['qualified'][1]):<10}{marker}"
+        )
+    print(f"\n{'report (chars)':<42} {'standard':>10} {'fused':>11}")
+    for report in comparison["reports"]:
+        name = f"{report['folder']}/{report['report']}"[:42]
+        standard, fused = (
+            "missing" if chars is None else chars for chars in report["chars"]
+        )
+        print(f"{name:<42} {standard:>10} {fused:>11}")
+    same = sum(lead["same_qualification"] for lead in comparison["leads"])
+    print(f"\nSame qualification for {same}/{len(comparison['leads'])} leads")
+
+
+def llm_stats(summary):
+    # LLM calls are recorded per model, tools per resource name
+    llm = [
+        stats for resource, stats in summary["per_resource"].items()
+        if stats["input_tokens"] or stats["output_tokens"]
+    ]
+    return {
+        "llm_calls": sum(stats["calls"] for stats in llm),
+        "tokens": sum(stats["input_tokens"] + stats["output_tokens"] for stats in llm),
+        "cost": sum(stats["cost"] for stats in llm),
+    }
+
+
+def print_comparison(results):
+    print("\nmode       wall time   LLM calls      tokens   est. cost")
+    for result in results:
+        stats = llm_stats(result["usage"])
+        print(
+            f"{result['mode']:<10} {result['wall_time']:>8.1f}s "
+            f"{stats['llm_calls']:>11} {stats['tokens']:>11} {stats['cost']:>10.4f}$"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='Benchmark the standard and fused InsightFlow graphs on a leads file'
+    )
+    parser.add_argument('file_path', type=str, help='Path to the input file (.csv, .xlsx, .xls)')
+    parser.add_argument('--mode', choices=['standard', 'fused', 'both'], default='both')
+    parser.add_argument('--output', type=str, default='benchmarks', help='Output folder')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.file_path):
+        print(f"Error: File not found at {args.file_path}")
+        sys.exit(1)
+
+    # Benchmarks must not create Gmail drafts, documents are saved locally
+    nodes.CREATE_EMAIL_DRAFTS = False
+
+    modes = ['standard', 'fused'] if args.mode == 'both' else [args.mode]
+    results = []
+    for mode in modes:
+        os.makedirs(os.path.join(args.output, mode), exist_ok=True)
+        results.append(run_mode(args.file_path, mode, args.output))
+
+    print_comparison(results)
+    if len(results) == 2:
+        comparison = compare_outputs(results[0]["outputs"], results[1]["outputs"])
+        with open(os.path.join(args.output, "comparison.json"), "w", encoding="utf-8") as f:
+            json.dump(comparison, f, indent=2)
+        print_output_comparison(comparison)
@@ -0,0 +1,152 @@
+import os
+import re
+import sys
+import time
+import zlib
+import sqlite3
+import argparse
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import html2text
+from bs4 import BeautifulSoup
+from src.tools.base.html_extractor import parse_html, html_to_markdown, extract_page, SKIPPED_TAGS
+
+WORD_PATTERN = re.compile(r"\w+")
+LINK_PATTERN = re.compile(r"\]\(\s*([^)\s]+)\s*\)")
+
+
+def load_corpus(path):
+    """
+    Saved pages to convert: a folder of .html files or the scraped pages
+    cache (HTTP_CACHE_PATH). Returns [(name, html)].
+    """
+    if os.path.isdir(path):
+        corpus = []
+        for name in sorted(os.listdir(path)):
+            if name.endswith((".html", ".htm")):
+                with open(os.path.join(path, name), encoding="utf-8", errors="replace") as f:
+                    corpus.append((name, f.read()))
+        return corpus
+    with sqlite3.connect(path) as db:
+        rows = db.execute("SELECT url, html FROM pages").fetchall()
+    return [(url, zlib.decompress(html).decode("utf-8")) for url, html in rows]
+
+
+def reference_markdown(html, strip_tags=()):
+    """
+    Previous extraction path: html.parser, prettify, then html2text.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup.find_all(list(strip_tags)):
+        tag.decompose()
+    h = html2text.HTML2Text()
+    h.ignore_links = False
+    h.ignore_images = True
+    h.ignore_tables = True
+    markdown = h.handle(soup.prettify())
+    return re.sub(r"\n{3,}", "\n\n", markdown).strip()
+
+
+def fast_markdown(html):
+    return html_to_markdown(parse_html(html))
+
+
+def timed(convert, corpus, repeat):
+    best = None
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        outputs = [convert(html) for _, html in corpus]
+        elapsed = time.perf_counter() - started_at
+        best = elapsed if best is None else min(best, elapsed)
+    return best, outputs
+
+
+def recall(reference, output, pattern):
+    # Share of the reference items (words, link targets) found in the output
+    expected = Counter(pattern.findall(reference.lower()))
+    found = Counter(pattern.findall(output.lower()))
+    total = sum(expected.values())
+    return sum((expected & found).values()) / total if total else 1.0
+
+
+def compare(corpus, repeat=3, show_worst=5):
+    size_mb = sum(len(html.encode("utf-8")) for _, html in corpus) / 1024 / 1024
+    reference_time, reference = timed(reference_markdown, corpus, repeat)
+    fast_time, fast = timed(fast_markdown, corpus, repeat)
+
+    print(f"{len(corpus)} pages, {size_mb:.1f} MB of HTML (best of {repeat} runs)\n")
+    print("engine                       time    pages/s      MB/s   output tokens")
+    for name, elapsed, outputs in (
+        ("bs4 + prettify + html2text", reference_time, reference),
+        ("lxml single pass", fast_time, fast),
+    ):
+        tokens = sum(len(output) for output in outputs) // 4
+        print(
+            f"{name:<26} {elapsed:>7.2f}s {len(corpus) / elapsed:>10.1f} "
+            f"{size_mb / elapsed:>9.2f} {tokens:>15}"
+        )
+    print(f"\nspeedup: x{reference_time / fast_time:.1f}")
+
+    # Equivalence: the skipped nodes (nav, forms...) are dropped on purpose,
+    # so the reference is computed without them
+    scores = []
+    for (name, html), output in zip(corpus, fast):
+        expected = reference_markdown(html, SKIPPED_TAGS)
+        scores.append(
+            (recall(expected, output, WORD_PATTERN), recall(expected, output, LINK_PATTERN), name)
+        )
+    words = sum(score[0] for score in scores) / len(scores)
+    links = sum(score[1] for score in scores) / len(scores)
+    print(f"content equivalence: {100 * words:.1f}% of words, {100 * links:.1f}% of links kept")
+    for word_recall, link_recall, name in sorted(scores)[:show_worst]:
+        print(f"  {100 * word_recall:5.1f}% words, {100 * link_recall:5.1f}% links  {name}")
+
+
+def compare_parallel(corpus, workers):
+    """
+    Throughput of the conversion run by concurrent lead workers: in threads
+    (serialized by the GIL) vs in worker processes (see `cpu_pool`).
+    """
+    htmls = [html for _, html in corpus]
+    size_mb = sum(len(html.encode("utf-8")) for html in htmls) / 1024 / 1024
+    print(f"\n{workers} workers ({os.cpu_count()} cores)      time    pages/s      MB/s")
+    with ThreadPoolExecutor(workers) as executor:
+        started_at = time.perf_counter()
+        list(executor.map(extract_page, htmls))
+        threads_time = time.perf_counter() - started_at
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        # Workers are started before timing (the app's pool is persistent)
+        list(executor.map(extract_page, htmls[:workers]))
+        started_at = time.perf_counter()
+        list(executor.map(extract_page, htmls))
+        processes_time = time.perf_counter() - started_at
+    for name, elapsed in (("threads", threads_time), ("processes", processes_time)):
+        print(f"{name:<26} {elapsed:>7.2f}s {len(htmls) / elapsed:>10.1f} {size_mb / elapsed:>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='Benchmark the HTML to markdown extraction against the previous html2text path'
+    )
+    parser.add_argument(
+        'corpus', type=str,
+        help='Folder of saved .html pages, or the scraped pages cache (database/http_cache.sqlite3)'
+    )
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per engine (best is kept)')
+    parser.add_argument(
+        '--workers', type=int, default=os.cpu_count() or 1,
+        help='Concurrent workers of the threads vs processes comparison (0 skips it)'
+    )
+    args = parser.parse_args()
+
+    if not os.path.exists(args.corpus):
+        print(f"Error: Corpus not found at {args.corpus}")
+        sys.exit(1)
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        print(f"Error: No pages in {args.corpus}")
+        sys.exit(1)
+    compare(corpus, args.repeat)
+    if args.workers:
+        compare_parallel(corpus, args.workers)
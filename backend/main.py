@@ -5,15 +5,18 @@ import argparse
 import pandas as pd
 from datetime import datetime
 from dotenv import load_dotenv
+
+# Load environment variables from a .env file, before the project modules:
+# their settings are read when they're imported
+load_dotenv()
+
 from src.graph import OutReachAutomation
 from src.state import *
 from src.tools.leads_loader.file_loader import FileLeadLoader
+from src.usage import JobUsage, job_usage, format_usage_summary, USAGE_COLUMNS_IN_OUTPUT
 
 import logging
 
-# Load environment variables from a .env file
-load_dotenv()
-
 # Configure logging for CLI usage
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger(__name__)
@@ -68,7 +71,8 @@ if __name__ == "__main__":
         # Instantiate the OutReachAutomation class
         # Note: We are creating a new instance here. 
         # In a real production env, we might want to share resources, but for a subprocess this is fine.
-        automation = OutReachAutomation(lead_loader)
+        # The graph is run with `app.invoke`: sync nodes, whatever ASYNC_GRAPH says
+        automation = OutReachAutomation(lead_loader, use_async=False)
         app = automation.app
 
         # initial graph inputs:
@@ -83,11 +87,20 @@ if __name__ == "__main__":
         # We can't easily stream "internal" graph steps unless we add callbacks or print statements inside nodes.
         # Assuming nodes.py has print statements, they will be captured.
         
+        # Collect API calls, tokens and latency per node and lead
+        usage = JobUsage()
+        job_usage.set(usage)
+
         result = app.invoke(inputs, config)
         
         print("Analysis complete. Generating output...")
+        print(format_usage_summary(usage.summary()))
         sys.stdout.flush()
 
+        if USAGE_COLUMNS_IN_OUTPUT:
+            for lead_id, columns in usage.lead_columns().items():
+                lead_loader.update_record(lead_id, columns)
+
         # Save the processed data to a local Excel file
         # We'll save it in the same directory or a temp one, but let's output the path
         output_dir = os.path.dirname(file_path)
@@ -0,0 +1,130 @@
+import os
+import sys
+import argparse
+import threading
+import contextvars
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+# Load environment variables from a .env file, before the project modules:
+# their settings are read when they're imported
+load_dotenv()
+
+from src.graph import OutReachAutomation
+from src.llm.batch import BatchCollector, batch_collector
+from src.tools.base.fake_tools import FAKE_TOOLS
+from src.tools.leads_loader.file_loader import FileLeadLoader
+from src.tools.leads_loader.single_lead_loader import SingleLeadLoader
+from src.usage import JobUsage, job_usage, format_usage_summary, USAGE_COLUMNS_IN_OUTPUT
+
+import logging
+
+# Configure logging for CLI usage
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger(__name__)
+
+# Leads running at the same time, their LLM calls of each stage share batches
+BATCH_LEADS_IN_FLIGHT = int(os.getenv("BATCH_LEADS_IN_FLIGHT", "500"))
+
+
+def run_batch_job(lead_loader, docs_manager=None, fused=None, backend=None, leads_in_flight=None):
+    """
+    Run every lead in its own graph concurrently, the LLM calls being collected
+    into provider batch jobs: leads advance stage by stage as batches complete.
+    """
+    records = lead_loader.fetch_records()
+    lock = threading.Lock()
+    leads_in_flight = leads_in_flight or BATCH_LEADS_IN_FLIGHT
+    collector = BatchCollector(
+        backend=backend, expected_workers=len(records), max_workers=leads_in_flight
+    )
+    token = batch_collector.set(collector)
+    print(f"Running {len(records)} leads in batch mode")
+    sys.stdout.flush()
+
+    def run_lead(index, record):
+        loader = SingleLeadLoader(lead_loader, record, lock=lock)
+        with collector.worker(f"lead-{index}"):
+            try:
+                # Leads run in threads with `app.invoke`: sync nodes
+                automation = OutReachAutomation(loader, docs_manager, fused=fused, use_async=False)
+                automation.app.invoke({"leads_ids": []}, {"recursion_limit": 1000})
+            except Exception as e:
+                print(f"Error processing lead {record.get('id', index)}: {e}")
+
+    try:
+        with ThreadPoolExecutor(max_workers=leads_in_flight) as executor:
+            # Each lead runs in a copy of the job context (collector, usage)
+            futures = [
+                executor.submit(contextvars.copy_context().run, run_lead, index, record)
+                for index, record in enumerate(records)
+            ]
+            for future in futures:
+                future.result()
+    finally:
+        batch_collector.reset(token)
+        collector.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='Run InsightFlow AI Analysis on a large leads file with provider batch APIs'
+    )
+    parser.add_argument('file_path', type=str, help='Path to the input file (.csv, .xlsx, .xls)')
+    parser.add_argument('--backend', choices=['native', 'local'], default=None,
+                        help='Provider batch APIs or local stand-in (defaults to LLM_BATCH_BACKEND)')
+    parser.add_argument('--local-docs', action='store_true',
+                        help='Save documents locally instead of Google Docs')
+    args = parser.parse_args()
+    file_path = args.file_path
+
+    if not os.path.exists(file_path):
+        print(f"Error: File not found at {file_path}")
+        sys.exit(1)
+
+    if file_path.endswith('.csv'):
+        df = pd.read_csv(file_path)
+    elif file_path.endswith(('.xls', '.xlsx')):
+        df = pd.read_excel(file_path)
+    else:
+        print("Error: Invalid file format")
+        sys.exit(1)
+
+    df.columns = [c.strip().upper() for c in df.columns]
+    # Leads to process have an empty STATUS (see FileLeadLoader.fetch_records)
+    for col, default_val in {"STATUS": "", "LEAD_SCORE": 0, "QUALIFIED": "NO"}.items():
+        if col not in df.columns:
+            df[col] = default_val
+    df["STATUS"] = df["STATUS"].fillna("")
+
+    lead_loader = FileLeadLoader(df)
+    # Offline runs (see fake_tools) keep the reports on disk too
+    if args.local_docs or FAKE_TOOLS:
+        from src.tools.local_docs_manager import LocalDocsManager
+
+        docs_manager = LocalDocsManager()
+    else:
+        from src.tools.google_docs_tools import GoogleDocsManager
+
+        docs_manager = GoogleDocsManager()
+
+    # Collect API calls, tokens and latency per node and lead
+    usage = JobUsage()
+    job_usage.set(usage)
+
+    run_batch_job(lead_loader, docs_manager, backend=args.backend)
+
+    print("Analysis complete. Generating output...")
+    print(format_usage_summary(usage.summary()))
+    if USAGE_COLUMNS_IN_OUTPUT:
+        for lead_id, columns in usage.lead_columns().items():
+            lead_loader.update_record(lead_id, columns)
+
+    output_path = os.path.join(
+        os.path.dirname(file_path),
+        "Processed_" + os.path.splitext(os.path.basename(file_path))[0] + ".xlsx",
+    )
+    with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
+        lead_loader.df.to_excel(writer, index=False)
+    print(f"OUTPUT_FILE:{output_path}")
@@ -1,6 +1,5 @@
 import os
 import sys
-import pandas as pd
 import logging
 import asyncio
 import threading
@@ -9,14 +8,20 @@ from fastapi import FastAPI, UploadFile, File, HTTPException, WebSocket, WebSock
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
-# Import project modules
-from src.graph import OutReachAutomation
-from src.tools.leads_loader.file_loader import FileLeadLoader
-from src.tools.google_docs_tools import GoogleDocsManager
-
-# Load environment variables
+# Load environment variables from a .env file, before the project modules:
+# their settings are read when they're imported
 load_dotenv()
 
+# Import project modules. The graph, the leads loader & Google clients (and
+# pandas) are imported by the analysis job: the CPU worker processes (see
+# cpu_pool) re-import this module when it's run as a script
+from src.llm.streaming import stream_sink
+from src.usage import JobUsage, job_usage, format_usage_summary, USAGE_COLUMNS_IN_OUTPUT
+from src.tools.base.http_client import close_http_clients, aclose_async_client
+from src.tools.base.http_cache import http_cache
+from src.tools.base.browser_pool import browser_pool
+from src.tools.base.cpu_pool import shutdown_cpu_pool
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger(__name__)
@@ -58,6 +63,17 @@ async def startup_event():
     # Don't initialize GoogleDocsManager at startup - defer until needed
     # This prevents blocking when OAuth credentials don't exist
     logger.info("Application startup complete. Google services will initialize on first use.")
+    # Headless browsers for JS-rendered websites start in the background (JS_RENDERING)
+    asyncio.get_running_loop().run_in_executor(None, browser_pool.warm)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Close the pooled keep-alive connections of the tools
+    close_http_clients()
+    await aclose_async_client()
+    http_cache.close()
+    browser_pool.close()
+    shutdown_cpu_pool()
 
 @app.post("/upload")
 async def upload_file_for_analysis(file: UploadFile = File(...)):
@@ -91,7 +107,13 @@ async def upload_file_for_analysis(file: UploadFile = File(...)):
 @app.websocket("/ws/analyze/{file_id}")
 async def websocket_analyze(websocket: WebSocket, file_id: str):
     await websocket.accept()
-    
+    import pandas as pd
+    from src.graph import OutReachAutomation
+    from src.tools.leads_loader.file_loader import FileLeadLoader
+    from src.tools.google_docs_tools import GoogleDocsManager
+    from src.tools.local_docs_manager import LocalDocsManager
+    from src.tools.base.fake_tools import FAKE_TOOLS
+
     file_path = ""
     try:
         # Decode file_id to get path
@@ -159,6 +181,9 @@ async def websocket_analyze(websocket: WebSocket, file_id: str):
             
             # Use global docs_manager if available
             global docs_manager
+            if not docs_manager and FAKE_TOOLS:
+                # Offline run (see fake_tools): reports & output stay on disk
+                docs_manager = LocalDocsManager()
             if not docs_manager:
                 try:
                     logger.info("Initializing Google Docs Manager (lazy initialization)...")
@@ -183,10 +208,36 @@ async def websocket_analyze(websocket: WebSocket, file_id: str):
             # to avoid blocking the FastAPI event loop.
             def run_graph():
                 return app_graph.invoke(inputs, config)
-            
-            result = await asyncio.to_thread(run_graph)
+
+            # Forward streamed LLM tokens of this job to its WebSocket.
+            # asyncio.to_thread copies the current context, so the graph thread sees the sink
+            def send_stream_event(event):
+                asyncio.run_coroutine_threadsafe(websocket.send_json(event), loop)
+
+            # Collect API calls, tokens and latency of this job per node and lead
+            usage = JobUsage()
+
+            stream_token = stream_sink.set(send_stream_event)
+            usage_token = job_usage.set(usage)
+            try:
+                if automation.use_async:
+                    # Async-native nodes run on the server event loop
+                    result = await app_graph.ainvoke(inputs, config)
+                else:
+                    result = await asyncio.to_thread(run_graph)
+            finally:
+                job_usage.reset(usage_token)
+                stream_sink.reset(stream_token)
             
             logger.info("Analysis complete. Generating output...")
+
+            # --- Report Usage ---
+            usage_summary = usage.summary()
+            logger.info(format_usage_summary(usage_summary))
+            await websocket.send_json({"type": "USAGE_SUMMARY", "usage": usage_summary})
+            if USAGE_COLUMNS_IN_OUTPUT:
+                for lead_id, columns in usage.lead_columns().items():
+                    lead_loader.update_record(lead_id, columns)
             
             # --- Save Processed File ---
             output_dir = os.path.dirname(file_path)
@@ -271,4 +322,4 @@ def health_check():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run("server:app", host="0.0.0.0", port=8000)
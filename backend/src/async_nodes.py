@@ -0,0 +1,355 @@
+import asyncio
+import logging
+
+from . import nodes
+from .nodes import OutReachAutomationNodes
+from .tools.base.markdown_scraper_tool import ascrape_website_to_markdown
+from .tools.base.search_tools import aget_recent_news
+from .tools.base.site_crawler import acrawl_company_site, website_content
+from .tools.base.prefetcher import prefetch_site
+from .tools.base.boilerplate import strip_boilerplate
+from .tools.base.content_reducer import (
+    areduce_content,
+    WEBSITE_CONTENT_TOKEN_BUDGET,
+    BLOG_CONTENT_TOKEN_BUDGET,
+)
+from .tools.base.link_rewriter import rewrite_links
+from .tools.lead_research import aresearch_lead_on_linkedin
+from .tools.company_research import aresearch_lead_company, agenerate_company_profile
+from .tools.youtube_tools import aget_youtube_stats
+from .tools.lead_scoring import score_lead_report, lead_score_batcher
+from .tools.rag_tool import fetch_similar_case_study
+from .prompts import *
+from .state import CompanyData, GraphState
+from .structured_outputs import (
+    EmailResponse,
+    CompanyResearch,
+    LeadResearchReports,
+    InterviewPreparation,
+)
+from .utils import ainvoke_llm, get_report, save_reports_locally
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncOutReachAutomationNodes(OutReachAutomationNodes):
+    """
+    Async-native variant of the graph nodes, run with `app.ainvoke`: LLM calls,
+    scraping and API requests are awaited on the event loop instead of holding
+    a thread each. Nodes only touching the leads loader stay sync (LangGraph
+    runs them in its executor). Prompts, inputs & outputs are built by the
+    helpers of the sync nodes, only the awaited calls live here.
+    """
+
+    async def fetch_linkedin_profile_data(self, state: GraphState):
+        logger.info("----- Searching Lead data on LinkedIn -----")
+        lead_data = state["current_lead"]
+        company_data = state.get("company_data", CompanyData())
+        # The website of the email domain downloads in the background while
+        # the lead & company are researched on LinkedIn
+        prefetch_site(lead_data.website)
+
+        # Scrape lead linkedin profile
+        (lead_profile, company_name, company_website, company_linkedin_url) = (
+            await aresearch_lead_on_linkedin(lead_data.name, lead_data.email)
+        )
+        lead_data.profile = lead_profile
+        # Unless it's the same site, the LinkedIn company website too
+        prefetch_site(company_website, prefetched=lead_data.website)
+
+        # Research company on linkedin
+        company_profile = await aresearch_lead_company(company_linkedin_url)
+        self._set_company_data(company_data, company_name, company_website, company_profile)
+
+        self.drive_folder_name = self._lead_folder(lead_data, company_data)
+        # Ensure the folder exists in Drive; if already exists, leave it
+        try:
+            await self.docs_manager.aensure_folder_path(
+                self.drive_folder_name, make_shareable=True
+            )
+        except Exception as e:
+            logger.error(f"Could not create or access Drive folder '{self.drive_folder_name}': {e}")
+
+        return {"current_lead": lead_data, "company_data": company_data, "reports": []}
+
+    async def review_company_website(self, state: GraphState):
+        logger.info("----- Scraping company website -----")
+        lead_data = state.get("current_lead")
+        company_data = state.get("company_data")
+        company_website = company_data.website
+        if company_website:
+            # Crawl the company website, blog & social links are read from the HTML
+            try:
+                company_data.website_pages, links = await acrawl_company_site(company_website)
+            except Exception:
+                company_data.website_pages, links = {}, {}
+            content = website_content(company_data.website_pages)
+
+            website_output = None
+            if self._should_analyze_website(content, links):
+                content = await areduce_content(
+                    content, WEBSITE_CONTENT_TOKEN_BUDGET, label="website content"
+                )
+                website_output = await ainvoke_llm(
+                    **self._website_request(company_website, content, links)
+                )
+            website_summary = self._set_website_links(company_data, links, website_output)
+
+            # Update company profile with website summary
+            company_data.profile = await agenerate_company_profile(
+                company_data.profile, website_summary
+            )
+
+        # Generate general lead search report
+        general_lead_search_report = await ainvoke_llm(
+            system_prompt=LEAD_SEARCH_REPORT_PROMPT,
+            user_message=self._lead_search_inputs(lead_data, company_data),
+            model="gemini-2.5-pro",
+        )
+        return {
+            "company_data": company_data,
+            "reports": [self._report("General Lead Research Report", general_lead_search_report)],
+        }
+
+    async def review_company_website_fused(self, state: GraphState):
+        logger.info("----- Researching company website & profile (fused) -----")
+        lead_data = state.get("current_lead")
+        company_data = state.get("company_data")
+        company_website = company_data.website
+
+        content, links = "", {}
+        if company_website:
+            try:
+                company_data.website_pages, links = await acrawl_company_site(company_website)
+            except Exception:
+                company_data.website_pages, links = {}, {}
+            content = website_content(company_data.website_pages)
+            if content and content.strip():
+                content = await areduce_content(
+                    content, WEBSITE_CONTENT_TOKEN_BUDGET, label="website content"
+                )
+
+        prompt, inputs = self._fused_research_inputs(lead_data, company_data, content)
+        research = await ainvoke_llm(
+            system_prompt=prompt,
+            user_message=inputs,
+            model="gemini-2.5-pro",
+            response_format=CompanyResearch,
+        )
+        return self._fused_research_result(company_data, links, research)
+
+    async def analyze_blog_content(self, state: GraphState):
+        logger.info("----- Analyzing company main blog -----")
+        reports_out = []
+
+        # Check if company has a blog
+        company_data = state["company_data"]
+        blog_url = company_data.social_media_links.blog
+        if blog_url:
+            blog_content = self._crawled_page(company_data, "blog", blog_url)
+            if blog_content is None:
+                blog_content = strip_boilerplate(blog_url, await ascrape_website_to_markdown(blog_url))
+            blog_content = await areduce_content(
+                blog_content, BLOG_CONTENT_TOKEN_BUDGET, label="blog content"
+            )
+            blog_analysis_report = await ainvoke_llm(
+                system_prompt=BLOG_ANALYSIS_PROMPT.format(company_name=company_data.name),
+                user_message=blog_content,
+                model="gemini-2.5-pro",
+            )
+            reports_out.append(self._report("Blog Analysis Report", blog_analysis_report))
+        return {"reports": reports_out}
+
+    async def analyze_social_media_content(self, state: GraphState):
+        logger.info("----- Analyzing company social media accounts -----")
+        company_data = state["company_data"]
+        youtube_url = company_data.social_media_links.youtube
+
+        # Facebook & Twitter analysis aren't implemented yet (see the sync node)
+        reports_out = []
+        if youtube_url:
+            try:
+                youtube_data = self._youtube_inputs(await aget_youtube_stats(youtube_url))
+            except Exception as e:
+                youtube_data = self._youtube_inputs(error=e)
+            youtube_insight = await ainvoke_llm(
+                system_prompt=YOUTUBE_ANALYSIS_PROMPT.format(company_name=company_data.name),
+                user_message=youtube_data,
+                model="gemini-2.5-pro",
+            )
+            reports_out.append(self._report("Youtube Analysis Report", youtube_insight))
+
+        return {"company_data": company_data, "reports": reports_out}
+
+    async def analyze_recent_news(self, state: GraphState):
+        logger.info("----- Analyzing recent news about company -----")
+        company_data = state["company_data"]
+
+        # Fetch recent news using serper API
+        recent_news = await aget_recent_news(company=company_data.name)
+        news_insight = await ainvoke_llm(
+            system_prompt=self._news_analysis_prompt(company_data),
+            user_message=recent_news,
+            model="gemini-2.5-pro",
+        )
+        return {"reports": [self._report("News Analysis Report", news_insight)]}
+
+    async def generate_digital_presence_report(self, state: GraphState):
+        logger.info("----- Generate Digital presence analysis report -----")
+
+        prompt, inputs = self._digital_presence_inputs(state)
+        digital_presence_report = await ainvoke_llm(
+            system_prompt=prompt, user_message=inputs, model="gemini-2.5-pro"
+        )
+        return {"reports": [self._report("Digital Presence Report", digital_presence_report)]}
+
+    async def generate_full_lead_research_report(self, state: GraphState):
+        logger.info("----- Generate global lead analysis report -----")
+
+        prompt, inputs = self._full_report_inputs(state)
+        full_report = await ainvoke_llm(
+            system_prompt=prompt,
+            user_message=inputs,
+            model="gemini-2.5-pro",
+            stream=True,
+            stream_label="Global Lead Analysis Report",
+        )
+        return {"reports": [self._report("Global Lead Analysis Report", full_report)]}
+
+    async def generate_lead_research_reports_fused(self, state: GraphState):
+        logger.info("----- Generate digital presence & global lead analysis reports (fused) -----")
+
+        prompt, inputs = self._fused_reports_inputs(state)
+        output = await ainvoke_llm(
+            system_prompt=prompt,
+            user_message=inputs,
+            model="gemini-2.5-pro",
+            response_format=LeadResearchReports,
+        )
+        return self._fused_reports_result(output)
+
+    @staticmethod
+    async def score_lead(state: GraphState):
+        logger.info("----- Scoring lead -----")
+
+        # Load reports
+        reports = state["reports"]
+        global_research_report = get_report(reports, "Global Lead Analysis Report")
+
+        # Scoring lead
+        if lead_score_batcher.batch_size > 1:
+            # The micro-batcher waits on other leads with blocking futures
+            lead_score = await asyncio.to_thread(
+                score_lead_report, state["current_lead"].id, global_research_report
+            )
+            return {"lead_score": lead_score}
+        lead_score = await ainvoke_llm(
+            system_prompt=SCORE_LEAD_PROMPT,
+            user_message=global_research_report,
+            model="gemini-2.5-pro",
+        )
+        return {"lead_score": lead_score.strip()}
+
+    async def generate_custom_outreach_report(self, state: GraphState):
+        logger.info("----- Crafting Custom outreach report based on gathered information -----")
+
+        # Load reports
+        reports = state["reports"]
+        general_lead_search_report = get_report(reports, "General Lead Research Report")
+        global_research_report = get_report(reports, "Global Lead Analysis Report")
+
+        # The vector store client is sync-only
+        case_study_report = await asyncio.to_thread(
+            fetch_similar_case_study, general_lead_search_report
+        )
+
+        # Generate report
+        custom_outreach_report = await ainvoke_llm(
+            **self._outreach_request(global_research_report, case_study_report)
+        )
+
+        # Insert and validate our website/case study links deterministically
+        revised_outreach_report, unresolved = rewrite_links(custom_outreach_report)
+
+        # Proof read generated report only when links/placeholders are left unresolved
+        proofread_request = self._proofread_request(revised_outreach_report, unresolved)
+        if proofread_request:
+            revised_outreach_report, _ = rewrite_links(await ainvoke_llm(**proofread_request))
+
+        # Store report into google docs and get shareable link
+        new_doc = await self.docs_manager.aadd_document(
+            **self._outreach_document(revised_outreach_report)
+        )
+        return self._outreach_links(new_doc)
+
+    async def generate_personalized_email(self, state: GraphState):
+        logger.info("----- Generating personalized email -----")
+
+        output = await ainvoke_llm(
+            system_prompt=PERSONALIZE_EMAIL_PROMPT,
+            user_message=self._email_inputs(state),
+            model="gemini-2.5-pro",
+            response_format=EmailResponse,
+        )
+        # Gmail drafts go through the sync API client
+        return await asyncio.to_thread(self._deliver_email, state, output)
+
+    async def generate_interview_script(self, state: GraphState):
+        logger.info("----- Generating interview script -----")
+
+        # Load reports
+        reports = state["reports"]
+        global_research_report = get_report(reports, "Global Lead Analysis Report")
+
+        # Generating SPIN questions
+        spin_questions = await ainvoke_llm(
+            system_prompt=GENERATE_SPIN_QUESTIONS_PROMPT,
+            user_message=global_research_report,
+            model="gemini-2.5-pro",
+        )
+
+        # Generating interview script
+        interview_script = await ainvoke_llm(
+            system_prompt=WRITE_INTERVIEW_SCRIPT_PROMPT,
+            user_message=self._interview_inputs(global_research_report, spin_questions),
+            model="gemini-2.5-pro",
+        )
+        return {"reports": [self._report("Interview Script", interview_script)]}
+
+    async def generate_interview_script_fused(self, state: GraphState):
+        logger.info("----- Generating interview script (fused) -----")
+
+        prompt, inputs = self._fused_interview_inputs(state)
+        output = await ainvoke_llm(
+            system_prompt=prompt,
+            user_message=inputs,
+            model="gemini-2.5-pro",
+            response_format=InterviewPreparation,
+            cache_prompt=True,
+        )
+        return {"reports": [self._report("Interview Script", output.interview_script)]}
+
+    async def save_reports_to_google_docs(self, state: GraphState):
+        logger.info("----- Save Reports to Google Docs -----")
+
+        current_folder = self.drive_folder_name
+        if not current_folder:
+            return state
+
+        # Load all reports
+        reports = self._unique_reports(state["reports"])
+
+        # Ensure reports are saved locally
+        await asyncio.to_thread(save_reports_locally, reports)
+
+        # Save all reports to Google docs in the same per-lead folder
+        if nodes.SAVE_TO_GOOGLE_DOCS:
+            for report in reports:
+                # Skip creating a doc if one with the same title already exists
+                exists = await self.docs_manager.adocument_exists_in_folder(
+                    current_folder, report.title
+                )
+                if not self._skip_existing_document(report, exists):
+                    await self.docs_manager.aadd_document(**self._report_document(report))
+
+        return state
@@ -1,50 +1,80 @@
+import os
 from langgraph.graph import END, StateGraph
 from .nodes import OutReachAutomationNodes
+from .async_nodes import AsyncOutReachAutomationNodes
 from .state import GraphState
 from .tools.leads_loader.lead_loader_base import LeadLoaderBase
+from .usage import track_node
+
+# Enable or disable the fused graph variant: related research/report steps run
+# as a single LLM call each, cutting round-trips per lead
+FUSED_GRAPH = os.getenv("FUSED_GRAPH", "false").lower() in ("1", "true", "yes")
+# Build the graph from the async-native nodes, the graph must then be run
+# with `app.ainvoke` (the server does so on its own event loop, the CLI
+# scripts always build the sync graph)
+ASYNC_GRAPH = os.getenv("ASYNC_GRAPH", "false").lower() in ("1", "true", "yes")
 
 
 class OutReachAutomation:
-    def __init__(self, loader: LeadLoaderBase, docs_manager=None):
+    def __init__(self, loader: LeadLoaderBase, docs_manager=None, fused=None, use_async=None):
         # Initialize the automation workflow by building the graph
-        self.app = self.build_graph(loader, docs_manager)
+        self.fused = FUSED_GRAPH if fused is None else fused
+        self.use_async = ASYNC_GRAPH if use_async is None else use_async
+        self.app = self.build_graph(loader, docs_manager, self.fused, self.use_async)
 
-    def build_graph(self, loader, docs_manager=None):
+    def build_graph(self, loader, docs_manager=None, fused=False, use_async=False):
         """
         Constructs the state graph for the outreach automation workflow.
+        With `fused`, the website review, the digital presence & global reports
+        and the interview script each run as one combined LLM call.
+        With `use_async`, I/O bound nodes are coroutines (run with `ainvoke`).
         """
         # Create the main graph with a predefined state
         graph = StateGraph(GraphState)
         
         # Initialize the nodes with the provided lead loader
-        nodes = OutReachAutomationNodes(loader, docs_manager)
+        nodes_class = AsyncOutReachAutomationNodes if use_async else OutReachAutomationNodes
+        nodes = nodes_class(loader, docs_manager)
+
+        def add_node(name, node):
+            # Attribute API calls, tokens and time to the node & the current lead
+            graph.add_node(name, track_node(name, node))
 
         # **Step 1: Adding nodes to the graph**
         # Fetch new leads from the CRM
-        graph.add_node("get_new_leads", nodes.get_new_leads)
-        graph.add_node("check_for_remaining_leads", nodes.check_for_remaining_leads)
+        add_node("get_new_leads", nodes.get_new_leads)
+        add_node("check_for_remaining_leads", nodes.check_for_remaining_leads)
 
         # Research phase: gather data and insights about the lead
-        graph.add_node("fetch_linkedin_profile_data", nodes.fetch_linkedin_profile_data)
-        graph.add_node("review_company_website", nodes.review_company_website)
-        graph.add_node("collect_company_information", nodes.collect_company_information)
-        graph.add_node("analyze_blog_content", nodes.analyze_blog_content)
-        graph.add_node("analyze_social_media_content", nodes.analyze_social_media_content)
-        graph.add_node("analyze_recent_news", nodes.analyze_recent_news)
-        graph.add_node("generate_full_lead_research_report", nodes.generate_full_lead_research_report)
-        graph.add_node("generate_digital_presence_report", nodes.generate_digital_presence_report)
-        graph.add_node("score_lead", nodes.score_lead)
+        add_node("fetch_linkedin_profile_data", nodes.fetch_linkedin_profile_data)
+        if fused:
+            add_node("review_company_website", nodes.review_company_website_fused)
+        else:
+            add_node("review_company_website", nodes.review_company_website)
+        add_node("collect_company_information", nodes.collect_company_information)
+        add_node("analyze_blog_content", nodes.analyze_blog_content)
+        add_node("analyze_social_media_content", nodes.analyze_social_media_content)
+        add_node("analyze_recent_news", nodes.analyze_recent_news)
+        if fused:
+            add_node("generate_full_lead_research_report", nodes.generate_lead_research_reports_fused)
+        else:
+            add_node("generate_full_lead_research_report", nodes.generate_full_lead_research_report)
+            add_node("generate_digital_presence_report", nodes.generate_digital_presence_report)
+        add_node("score_lead", nodes.score_lead)
 
         # Outreach preparation phase
-        graph.add_node("create_outreach_materials", nodes.create_outreach_materials)
-        graph.add_node("generate_custom_outreach_report", nodes.generate_custom_outreach_report)
-        graph.add_node("generate_personalized_email", nodes.generate_personalized_email)
-        graph.add_node("generate_interview_script", nodes.generate_interview_script)
+        add_node("create_outreach_materials", nodes.create_outreach_materials)
+        add_node("generate_custom_outreach_report", nodes.generate_custom_outreach_report)
+        add_node("generate_personalized_email", nodes.generate_personalized_email)
+        if fused:
+            add_node("generate_interview_script", nodes.generate_interview_script_fused)
+        else:
+            add_node("generate_interview_script", nodes.generate_interview_script)
 
         # Reporting and finalization
-        graph.add_node("save_reports_to_google_docs", nodes.save_reports_to_google_docs)
-        graph.add_node("await_reports_creation", nodes.await_reports_creation)
-        graph.add_node("update_CRM", nodes.update_CRM)
+        add_node("save_reports_to_google_docs", nodes.save_reports_to_google_docs)
+        add_node("await_reports_creation", nodes.await_reports_creation)
+        add_node("update_CRM", nodes.update_CRM)
 
         # **Step 2: Setting up edges between nodes**
 
@@ -74,10 +104,16 @@ class OutReachAutomation:
         graph.add_edge("collect_company_information", "analyze_recent_news")
 
         # Analysis results converge into generating reports
-        graph.add_edge("analyze_blog_content", "generate_digital_presence_report")
-        graph.add_edge("analyze_social_media_content", "generate_digital_presence_report")
-        graph.add_edge("analyze_recent_news", "generate_digital_presence_report")
-        graph.add_edge("generate_digital_presence_report", "generate_full_lead_research_report")
+        if fused:
+            # Both reports are written by a single node
+            graph.add_edge("analyze_blog_content", "generate_full_lead_research_report")
+            graph.add_edge("analyze_social_media_content", "generate_full_lead_research_report")
+            graph.add_edge("analyze_recent_news", "generate_full_lead_research_report")
+        else:
+            graph.add_edge("analyze_blog_content", "generate_digital_presence_report")
+            graph.add_edge("analyze_social_media_content", "generate_digital_presence_report")
+            graph.add_edge("analyze_recent_news", "generate_digital_presence_report")
+            graph.add_edge("generate_digital_presence_report", "generate_full_lead_research_report")
 
         # Scoring phase with conditional qualification check
         graph.add_edge("generate_full_lead_research_report", "score_lead")
@@ -0,0 +1,499 @@
+import os
+import re
+import json
+import time
+import logging
+import threading
+import contextvars
+from collections import defaultdict
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .rate_limiter import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Job-level collector gathering the LLM calls of all leads into batch jobs,
+# set by the batch runner (see run_batch.py), unset for interactive runs
+batch_collector = contextvars.ContextVar("llm_batch_collector", default=None)
+# Lead worker of the running graph, used to know when every lead waits on a batch
+batch_worker = contextvars.ContextVar("llm_batch_worker", default=None)
+
+# "native": provider batch APIs (google, openai, anthropic), "local": run the
+# requests through the regular LLM path (stand-in for tests and other providers)
+LLM_BATCH_BACKEND = os.getenv("LLM_BATCH_BACKEND", "native").lower()
+# A batch is submitted when every running lead waits on an LLM call, when it
+# reaches the maximum size or when its oldest request waited for the window
+LLM_BATCH_WINDOW_SECONDS = float(os.getenv("LLM_BATCH_WINDOW_SECONDS", "120"))
+LLM_BATCH_MAX_REQUESTS = int(os.getenv("LLM_BATCH_MAX_REQUESTS", "1000"))
+LLM_BATCH_POLL_SECONDS = float(os.getenv("LLM_BATCH_POLL_SECONDS", "30"))
+# Batches still unfinished after this long (the providers' completion window)
+# are given up, their requests fall back to regular calls
+LLM_BATCH_DEADLINE_SECONDS = float(os.getenv("LLM_BATCH_DEADLINE_SECONDS", "86400"))
+# Price of batch requests relative to interactive ones, used for cost estimates
+LLM_BATCH_PRICE_FACTOR = float(os.getenv("LLM_BATCH_PRICE_FACTOR", "0.5"))
+LLM_BATCH_MAX_OUTPUT_TOKENS = 8192
+
+
+class BatchItemError(RuntimeError):
+    """
+    Raised when a request of a batch job failed or returned an unusable
+    output, and by `poll` when the batch job itself ended in failure.
+    """
+
+
+class BatchRequest:
+    def __init__(self, system_prompt, user_message, provider, model, response_format=None):
+        self.system_prompt = system_prompt
+        self.user_message = user_message
+        self.provider = provider
+        self.model = model
+        self.response_format = response_format
+        self.future = Future()
+        self.created_at = time.monotonic()
+
+    @property
+    def group(self):
+        schema = self.response_format.__name__ if self.response_format else "text"
+        return (self.provider, self.model, schema)
+
+
+def _result(text="", input_tokens=0, output_tokens=0, error=None):
+    return {
+        "text": text,
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "error": error,
+    }
+
+
+def parse_output(text, response_format):
+    """
+    Parse a batch output into the structured output model (JSON, possibly
+    wrapped in a markdown code block).
+    """
+    if not response_format:
+        return text
+    text = re.sub(r"^```(?:json)?\s*|\s*```$", "", (text or "").strip())
+    try:
+        return response_format.model_validate_json(text)
+    except Exception as e:
+        raise BatchItemError(f"Invalid {response_format.__name__} batch output: {e}") from e
+
+
+class GeminiBatchBackend:
+    """
+    Gemini Batch API with inline requests.
+    """
+
+    poll_interval = LLM_BATCH_POLL_SECONDS
+    DONE_STATES = ("JOB_STATE_SUCCEEDED", "JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED")
+
+    def __init__(self):
+        from google import genai
+
+        api_key = os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
+        self.client = genai.Client(api_key=api_key)
+
+    def submit(self, model, requests):
+        inline_requests = []
+        for request in requests:
+            config = {
+                "system_instruction": {"parts": [{"text": request.system_prompt}]},
+                "temperature": 0.1,
+            }
+            if request.response_format:
+                config["response_mime_type"] = "application/json"
+                config["response_schema"] = request.response_format
+            inline_requests.append(
+                {
+                    "contents": [{"role": "user", "parts": [{"text": request.user_message}]}],
+                    "config": config,
+                }
+            )
+        job = self.client.batches.create(
+            model=model, src=inline_requests, config={"display_name": "insightflow-batch"}
+        )
+        return job.name
+
+    def poll(self, handle, requests):
+        job = self.client.batches.get(name=handle)
+        if job.state.name not in self.DONE_STATES:
+            return None
+        if job.state.name != "JOB_STATE_SUCCEEDED":
+            raise BatchItemError(f"Gemini batch {handle} ended with {job.state.name}")
+        results = []
+        for response in job.dest.inlined_responses:
+            if response.error:
+                results.append(_result(error=str(response.error)))
+                continue
+            usage = response.response.usage_metadata
+            results.append(
+                _result(
+                    response.response.text,
+                    getattr(usage, "prompt_token_count", 0) or 0,
+                    getattr(usage, "candidates_token_count", 0) or 0,
+                )
+            )
+        return results
+
+
+class OpenAIBatchBackend:
+    """
+    OpenAI Batch API (JSONL file of chat completion requests).
+    """
+
+    poll_interval = LLM_BATCH_POLL_SECONDS
+    DONE_STATES = ("completed", "failed", "expired", "cancelled")
+
+    def __init__(self):
+        from openai import OpenAI
+
+        self.client = OpenAI()
+
+    def submit(self, model, requests):
+        lines = []
+        for index, request in enumerate(requests):
+            body = {
+                "model": model,
+                "temperature": 0.1,
+                "messages": [
+                    {"role": "system", "content": request.system_prompt},
+                    {"role": "user", "content": request.user_message},
+                ],
+            }
+            if request.response_format:
+                body["response_format"] = {
+                    "type": "json_schema",
+                    "json_schema": {
+                        "name": request.response_format.__name__,
+                        "schema": request.response_format.model_json_schema(),
+                    },
+                }
+            lines.append(
+                json.dumps(
+                    {
+                        "custom_id": str(index),
+                        "method": "POST",
+                        "url": "/v1/chat/completions",
+                        "body": body,
+                    }
+                )
+            )
+        batch_file = self.client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode("utf-8")), purpose="batch"
+        )
+        job = self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        return job.id
+
+    def poll(self, handle, requests):
+        job = self.client.batches.retrieve(handle)
+        if job.status not in self.DONE_STATES:
+            return None
+        results = [_result(error=f"OpenAI batch {handle} ended with {job.status}")] * len(requests)
+        if job.output_file_id:
+            for line in self.client.files.content(job.output_file_id).text.splitlines():
+                item = json.loads(line)
+                index = int(item["custom_id"])
+                response = item.get("response") or {}
+                if item.get("error") or response.get("status_code") != 200:
+                    results[index] = _result(error=str(item.get("error") or response))
+                    continue
+                body = response["body"]
+                usage = body.get("usage", {})
+                results[index] = _result(
+                    body["choices"][0]["message"]["content"],
+                    usage.get("prompt_tokens", 0),
+                    usage.get("completion_tokens", 0),
+                )
+        return results
+
+
+class AnthropicBatchBackend:
+    """
+    Anthropic Message Batches API, structured outputs through a forced tool call.
+    """
+
+    poll_interval = LLM_BATCH_POLL_SECONDS
+
+    def __init__(self):
+        import anthropic
+
+        self.client = anthropic.Anthropic()
+
+    def submit(self, model, requests):
+        batch_requests = []
+        for index, request in enumerate(requests):
+            params = {
+                "model": model,
+                "max_tokens": LLM_BATCH_MAX_OUTPUT_TOKENS,
+                "temperature": 0.1,
+                "system": request.system_prompt,
+                "messages": [{"role": "user", "content": request.user_message}],
+            }
+            if request.response_format:
+                name = request.response_format.__name__
+                params["tools"] = [
+                    {
+                        "name": name,
+                        "description": f"Return the {name} output.",
+                        "input_schema": request.response_format.model_json_schema(),
+                    }
+                ]
+                params["tool_choice"] = {"type": "tool", "name": name}
+            batch_requests.append({"custom_id": str(index), "params": params})
+        batch = self.client.messages.batches.create(requests=batch_requests)
+        return batch.id
+
+    def poll(self, handle, requests):
+        batch = self.client.messages.batches.retrieve(handle)
+        if batch.processing_status != "ended":
+            return None
+        results = [_result(error=f"Missing result in Anthropic batch {handle}")] * len(requests)
+        for item in self.client.messages.batches.results(handle):
+            index = int(item.custom_id)
+            if item.result.type != "succeeded":
+                results[index] = _result(error=f"Anthropic batch request {item.result.type}")
+                continue
+            message = item.result.message
+            text = ""
+            for block in message.content:
+                if block.type == "tool_use":
+                    text = json.dumps(block.input)
+                elif block.type == "text":
+                    text += block.text
+            results[index] = _result(
+                text, message.usage.input_tokens, message.usage.output_tokens
+            )
+        return results
+
+
+class LocalBatchBackend:
+    """
+    Stand-in running the batch requests through the regular LLM path in a
+    thread pool, e.g. with the fake provider for tests and benchmarks.
+    """
+
+    poll_interval = 0.5
+
+    def __init__(self, provider, max_workers=16):
+        self.provider = provider
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-batch")
+
+    def _run(self, model, request):
+        from ..utils import invoke_llm
+
+        output = invoke_llm(
+            system_prompt=request.system_prompt,
+            user_message=request.user_message,
+            model=model,
+            llm_provider=self.provider,
+            response_format=request.response_format,
+        )
+        text = output.model_dump_json() if request.response_format else output
+        return _result(
+            text,
+            estimate_tokens(request.system_prompt) + estimate_tokens(request.user_message),
+            estimate_tokens(text),
+        )
+
+    def submit(self, model, requests):
+        # A fresh context: no collector (no recursion) and no usage double counting
+        return [
+            self.executor.submit(contextvars.Context().run, self._run, model, request)
+            for request in requests
+        ]
+
+    def poll(self, handle, requests):
+        if not all(future.done() for future in handle):
+            return None
+        results = []
+        for future in handle:
+            error = future.exception()
+            results.append(_result(error=str(error)) if error else future.result())
+        return results
+
+
+NATIVE_BACKENDS = {
+    "google": GeminiBatchBackend,
+    "openai": OpenAIBatchBackend,
+    "anthropic": AnthropicBatchBackend,
+}
+
+
+class BatchCollector:
+    """
+    Collects the LLM requests of concurrently running leads and submits them
+    as provider batch jobs, so all leads advance through the graph stage by stage.
+    """
+
+    def __init__(self, backend=None, window=None, max_requests=None, expected_workers=0, max_workers=None):
+        self.backend_name = backend or LLM_BATCH_BACKEND
+        self.window = LLM_BATCH_WINDOW_SECONDS if window is None else window
+        self.max_requests = LLM_BATCH_MAX_REQUESTS if max_requests is None else max_requests
+        self.backends = {}
+        self.pending = []
+        self.jobs = []
+        self.workers = set()
+        # Workers not started yet, and how many may run at once: a batch isn't
+        # submitted early while more leads are about to reach the same stage
+        self.unstarted = expected_workers
+        self.max_workers = max_workers
+        self.waiting = defaultdict(int)
+        self.condition = threading.Condition()
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, name="llm-batch-collector", daemon=True)
+        self.thread.start()
+
+    def _backend(self, provider):
+        if provider not in self.backends:
+            backend_class = NATIVE_BACKENDS.get(provider)
+            if self.backend_name == "native" and backend_class:
+                self.backends[provider] = backend_class()
+            else:
+                self.backends[provider] = LocalBatchBackend(provider)
+        return self.backends[provider]
+
+    @contextmanager
+    def worker(self, name):
+        """
+        Register a lead worker for the duration of its graph run.
+        """
+        token = batch_worker.set(name)
+        with self.condition:
+            self.workers.add(name)
+            self.unstarted = max(0, self.unstarted - 1)
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.workers.discard(name)
+                self.condition.notify_all()
+            batch_worker.reset(token)
+
+    def running_workers(self):
+        """
+        Names of the lead workers currently running their graph.
+        """
+        with self.condition:
+            return set(self.workers)
+
+    @contextmanager
+    def blocked(self):
+        """
+        Count the current lead worker as waiting while it blocks, on a batch
+        request or on another batching stage (e.g. the lead score batcher).
+        """
+        worker = batch_worker.get()
+        with self.condition:
+            self.waiting[worker] += 1
+            self.condition.notify_all()
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.waiting[worker] -= 1
+                if not self.waiting[worker]:
+                    del self.waiting[worker]
+
+    def invoke(self, system_prompt, user_message, provider, model, response_format=None):
+        """
+        Queue a request for the next batch and block until its result is available.
+        Returns (output, result) where result holds the token usage.
+        """
+        request = BatchRequest(system_prompt, user_message, provider, model, response_format)
+        with self.condition:
+            self.pending.append(request)
+        with self.blocked():
+            result = request.future.result()
+        if result["error"]:
+            raise BatchItemError(result["error"])
+        return parse_output(result["text"], response_format), result
+
+    def _ready(self):
+        if not self.pending:
+            return False
+        all_started = not self.unstarted or (
+            self.max_workers is not None and len(self.workers) >= self.max_workers
+        )
+        all_waiting = all_started and self.workers and all(w in self.waiting for w in self.workers)
+        return bool(
+            all_waiting
+            or self.closed
+            or len(self.pending) >= self.max_requests
+            or time.monotonic() - self.pending[0].created_at >= self.window
+        )
+
+    def _submit(self, requests):
+        groups = defaultdict(list)
+        for request in requests:
+            groups[request.group].append(request)
+        for (provider, model, schema), group in groups.items():
+            for start in range(0, len(group), self.max_requests):
+                chunk = group[start : start + self.max_requests]
+                try:
+                    backend = self._backend(provider)
+                    handle = backend.submit(model, chunk)
+                except Exception as e:
+                    logger.error(f"Could not submit batch of {len(chunk)} {model} requests: {e}")
+                    for request in chunk:
+                        request.future.set_result(_result(error=str(e)))
+                    continue
+                logger.info(f"Submitted batch of {len(chunk)} {model} requests ({schema}) to {provider}")
+                self.jobs.append(
+                    {
+                        "backend": backend,
+                        "handle": handle,
+                        "requests": chunk,
+                        "submitted_at": time.monotonic(),
+                        "polled_at": time.monotonic(),
+                    }
+                )
+
+    def _poll(self):
+        for job in list(self.jobs):
+            backend = job["backend"]
+            if time.monotonic() - job["polled_at"] < backend.poll_interval:
+                continue
+            job["polled_at"] = time.monotonic()
+            try:
+                results = backend.poll(job["handle"], job["requests"])
+            except BatchItemError as e:
+                # The provider reported the batch as failed, cancelled or expired
+                results = [_result(error=str(e))] * len(job["requests"])
+            except Exception as e:
+                # Status checks failing (network, 5xx) don't mean the batch did
+                logger.warning(f"Could not poll batch {job['handle']}, retrying: {e}")
+                results = None
+            if results is None:
+                if time.monotonic() - job["submitted_at"] < LLM_BATCH_DEADLINE_SECONDS:
+                    continue
+                logger.error(f"Batch {job['handle']} unfinished after {LLM_BATCH_DEADLINE_SECONDS:g}s, giving up")
+                results = [_result(error=f"Batch {job['handle']} timed out")] * len(job["requests"])
+            self.jobs.remove(job)
+            logger.info(f"Batch of {len(job['requests'])} requests completed")
+            for request, result in zip(job["requests"], results):
+                request.future.set_result(result)
+
+    def _run(self):
+        while True:
+            with self.condition:
+                self.condition.wait(timeout=0.5)
+                if self.closed and not self.pending and not self.jobs:
+                    return
+                batch = []
+                if self._ready():
+                    batch, self.pending = self.pending, []
+            if batch:
+                self._submit(batch)
+            self._poll()
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.thread.join()
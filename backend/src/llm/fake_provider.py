@@ -0,0 +1,231 @@
+import os
+import re
+import json
+import time
+import random
+import hashlib
+import typing
+import functools
+import threading
+from collections import Counter
+from typing import Any, Iterator, List, Optional
+
+from pydantic import BaseModel
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableLambda
+
+from .rate_limiter import estimate_tokens
+
+# Latency distribution of fake calls: "constant", "uniform" or "lognormal"
+FAKE_LLM_LATENCY_DISTRIBUTION = os.getenv("FAKE_LLM_LATENCY_DISTRIBUTION", "lognormal")
+FAKE_LLM_LATENCY_SECONDS = float(os.getenv("FAKE_LLM_LATENCY_SECONDS", "2"))
+# Spread of the distribution: sigma for lognormal, +/- seconds for uniform
+FAKE_LLM_LATENCY_SPREAD = float(os.getenv("FAKE_LLM_LATENCY_SPREAD", "0.5"))
+FAKE_LLM_OUTPUT_TOKENS = int(os.getenv("FAKE_LLM_OUTPUT_TOKENS", "400"))
+# Share of calls failing with a simulated 429/500/503 provider error
+FAKE_LLM_ERROR_RATE = float(os.getenv("FAKE_LLM_ERROR_RATE", "0"))
+FAKE_LLM_SEED = os.getenv("FAKE_LLM_SEED", "0")
+# Optional JSON file of fixtures: {"text": {"<system prompt substring>": "<output>"},
+# "structured": {"<schema name>": {<field>: <value>}}}
+FAKE_LLM_FIXTURES = os.getenv("FAKE_LLM_FIXTURES", "")
+
+# Built-in text outputs picked by a substring of the system prompt
+DEFAULT_TEXT_FIXTURES = {
+    "lead scoring analyst": "{score}",
+    "extracting LinkedIn URLs": "https://www.linkedin.com/in/fake-lead",
+}
+
+# Number of calls seen per prompt, so retries of a failed call roll a new
+# (but still deterministic) outcome
+_call_counts = Counter()
+_call_counts_lock = threading.Lock()
+
+# Lead headings of batched prompts (see BATCH_SCORE_LEAD_PROMPT)
+LEAD_HEADING_PATTERN = re.compile(r"^# Lead: (.+)$", re.MULTILINE)
+
+LOREM_WORDS = (
+    "company platform customers growth digital strategy automation market "
+    "solutions team product services data insights engagement content brand "
+    "industry operations partners innovation analytics revenue pipeline"
+).split()
+
+
+class FakeProviderError(Exception):
+    """Simulated provider error carrying an HTTP status code."""
+
+    def __init__(self, status_code):
+        super().__init__(f"{status_code} simulated provider error")
+        self.status_code = status_code
+
+
+@functools.lru_cache(maxsize=1)
+def _load_fixtures():
+    if not FAKE_LLM_FIXTURES:
+        return {}
+    with open(FAKE_LLM_FIXTURES, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _sample_latency(rng):
+    if FAKE_LLM_LATENCY_DISTRIBUTION == "constant":
+        return FAKE_LLM_LATENCY_SECONDS
+    if FAKE_LLM_LATENCY_DISTRIBUTION == "uniform":
+        return max(0.0, rng.uniform(
+            FAKE_LLM_LATENCY_SECONDS - FAKE_LLM_LATENCY_SPREAD,
+            FAKE_LLM_LATENCY_SECONDS + FAKE_LLM_LATENCY_SPREAD,
+        ))
+    # lognormal with the configured median
+    return rng.lognormvariate(0, FAKE_LLM_LATENCY_SPREAD) * FAKE_LLM_LATENCY_SECONDS
+
+
+def _fake_text(rng, title, tokens):
+    words = [rng.choice(LOREM_WORDS) for _ in range(max(1, int(tokens * 0.75)))]
+    paragraphs = [" ".join(words[i : i + 60]).capitalize() + "." for i in range(0, len(words), 60)]
+    sections = [f"# {title}"]
+    for index, paragraph in enumerate(paragraphs, start=1):
+        sections.append(f"## Section {index}\n\n{paragraph}")
+    return "\n\n".join(sections)
+
+
+def _fake_value(rng, name, annotation, prompt=""):
+    origin = typing.get_origin(annotation)
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return _fake_structured(rng, annotation, {}, prompt)
+    if annotation is bool:
+        return rng.random() < 0.5
+    if annotation is int:
+        return rng.randint(1, 10)
+    if annotation is float:
+        return round(rng.uniform(1, 10), 1)
+    if origin in (list, List):
+        item = (typing.get_args(annotation) or (None,))[0]
+        if isinstance(item, type) and issubclass(item, BaseModel) and "lead_id" in item.model_fields:
+            # One item per lead of a batched prompt (e.g. LeadScores)
+            return [
+                _fake_structured(rng, item, {item.__name__: {"lead_id": lead_id.strip()}}, prompt)
+                for lead_id in LEAD_HEADING_PATTERN.findall(prompt)
+            ]
+        return []
+    if origin is dict:
+        return {}
+    # Links are left empty so fake runs don't trigger real scraping
+    if any(key in name for key in ("url", "link", "youtube", "twitter", "facebook")):
+        return ""
+    if any(key in name for key in ("summary", "email", "content", "report", "profile", "script", "questions")):
+        return _fake_text(rng, name.replace("_", " ").title(), FAKE_LLM_OUTPUT_TOKENS // 2)
+    return " ".join(rng.choice(LOREM_WORDS) for _ in range(8)).capitalize()
+
+
+def _fake_structured(rng, schema, fixtures, prompt=""):
+    values = dict(fixtures.get(schema.__name__, {}))
+    for name, field in schema.model_fields.items():
+        if name not in values:
+            values[name] = _fake_value(rng, name, field.annotation, prompt)
+    return schema.model_validate(values)
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Offline chat model returning deterministic, schema-valid outputs with
+    simulated latency, token usage and error rate. Used with `llm_provider="fake"`
+    to benchmark and load-test the graph without calling a real provider.
+    """
+
+    model: str = "fake"
+    # Request deadline, as enforced by the real provider clients
+    timeout: Optional[float] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    @staticmethod
+    def _digest(messages):
+        return hashlib.sha256(
+            (FAKE_LLM_SEED + "".join(str(m.content) for m in messages)).encode("utf-8")
+        ).hexdigest()
+
+    def _rng(self, messages):
+        # Same prompt, same output
+        return random.Random(int(self._digest(messages)[:16], 16))
+
+    def _maybe_fail(self, messages):
+        if not FAKE_LLM_ERROR_RATE:
+            return
+        digest = self._digest(messages)
+        with _call_counts_lock:
+            _call_counts[digest] += 1
+            attempt = _call_counts[digest]
+        rng = random.Random(f"{digest}:{attempt}")
+        if rng.random() < FAKE_LLM_ERROR_RATE:
+            raise FakeProviderError(rng.choice((429, 500, 503)))
+
+    def _wait(self, seconds):
+        if self.timeout is not None and seconds > self.timeout:
+            time.sleep(self.timeout)
+            raise TimeoutError(f"Request timed out after {self.timeout:g}s")
+        time.sleep(seconds)
+
+    def _simulate_call(self, messages, rng):
+        self._wait(_sample_latency(rng))
+        self._maybe_fail(messages)
+
+    def _text_output(self, messages, rng):
+        system_prompt = next(
+            (str(m.content) for m in messages if isinstance(m, SystemMessage)), ""
+        )
+        fixtures = {**DEFAULT_TEXT_FIXTURES, **_load_fixtures().get("text", {})}
+        for marker, output in fixtures.items():
+            if marker.lower() in system_prompt.lower():
+                return output.format(score=round(rng.uniform(1, 10), 1))
+        title = next((line.strip("# ") for line in system_prompt.splitlines() if line.strip()), "Report")
+        return _fake_text(rng, title[:80], FAKE_LLM_OUTPUT_TOKENS)
+
+    def _usage(self, messages, text):
+        input_tokens = sum(estimate_tokens(m.content) for m in messages)
+        output_tokens = estimate_tokens(text)
+        return {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        rng = self._rng(messages)
+        self._simulate_call(messages, rng)
+        text = self._text_output(messages, rng)
+        message = AIMessage(content=text, usage_metadata=self._usage(messages, text))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        rng = self._rng(messages)
+        latency = _sample_latency(rng)
+        text = self._text_output(messages, rng)
+        words = text.split(" ")
+        # First token after ~20% of the latency, the rest spread over the remaining time
+        self._wait(latency * 0.2)
+        self._maybe_fail(messages)
+        for index, word in enumerate(words):
+            time.sleep(latency * 0.8 / len(words))
+            content = word if index == len(words) - 1 else word + " "
+            yield ChatGenerationChunk(message=AIMessageChunk(content=content))
+        yield ChatGenerationChunk(
+            message=AIMessageChunk(content="", usage_metadata=self._usage(messages, text))
+        )
+
+    def with_structured_output(self, schema, include_raw=False, **kwargs):
+        def generate(messages):
+            messages = messages.to_messages() if hasattr(messages, "to_messages") else messages
+            rng = self._rng(messages)
+            self._simulate_call(messages, rng)
+            prompt = "\n".join(str(m.content) for m in messages)
+            parsed = _fake_structured(rng, schema, _load_fixtures().get("structured", {}), prompt)
+            if not include_raw:
+                return parsed
+            raw_text = parsed.model_dump_json()
+            raw = AIMessage(content=raw_text, usage_metadata=self._usage(messages, raw_text))
+            return {"raw": raw, "parsed": parsed, "parsing_error": None}
+
+        return RunnableLambda(generate)
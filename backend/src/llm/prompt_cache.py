@@ -0,0 +1,151 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+from concurrent.futures import Future
+from langchain_core.messages import SystemMessage, HumanMessage
+
+from .rate_limiter import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Enable or disable registering large static system prompts with the provider cache
+PROMPT_CACHING = os.getenv("PROMPT_CACHING", "true").lower() in ("1", "true", "yes")
+# Smallest prompt each provider model caches (by model name prefix): Gemini
+# refuses to create smaller caches, Anthropic ignores the cache_control mark
+PROMPT_CACHE_MIN_TOKENS = {
+    "gemini-2.5-pro": 4096,
+    "gemini-2.5-flash": 1024,
+    "claude-haiku": 2048,
+    "claude": 1024,
+}
+DEFAULT_PROMPT_CACHE_MIN_TOKENS = 4096
+# Overrides the table above for every model
+if os.getenv("PROMPT_CACHE_MIN_TOKENS"):
+    PROMPT_CACHE_MIN_TOKENS = {"": int(os.getenv("PROMPT_CACHE_MIN_TOKENS"))}
+PROMPT_CACHE_TTL_SECONDS = int(os.getenv("PROMPT_CACHE_TTL_SECONDS", "3600"))
+# Renew a cache this long before it expires, and wait this long before
+# trying again to create a cache that failed
+PROMPT_CACHE_RENEW_MARGIN_SECONDS = 120
+PROMPT_CACHE_RETRY_AFTER_SECONDS = 600
+
+
+def min_cached_tokens(model):
+    """
+    Smallest system prompt (in estimated tokens) worth caching for `model`.
+    """
+    for prefix, tokens in PROMPT_CACHE_MIN_TOKENS.items():
+        if model.startswith(prefix):
+            return tokens
+    return DEFAULT_PROMPT_CACHE_MIN_TOKENS
+
+
+class PromptCache:
+    """
+    Process-wide registry of provider cache handles for static system prompts,
+    keyed by (provider, model, prompt hash) so leads and jobs reuse them.
+
+    - google: the prompt is stored with Gemini context caching and referenced
+      by name (`cached_content`), so it is not resent with each call.
+    - anthropic: the system block is marked with `cache_control`, the provider
+      then reuses its cached prefix.
+    - others (e.g. openai caches long prefixes automatically): no-op.
+    """
+
+    def __init__(self):
+        self.handles = {}
+        # Caches being created, so concurrent calls of a prompt wait for the
+        # same creation while calls of other prompts go on
+        self.creating = {}
+        self.lock = threading.Lock()
+        self._genai_client = None
+
+    @staticmethod
+    def _key(provider, model, system_prompt):
+        digest = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+        return (provider, model, digest)
+
+    def _client(self):
+        if self._genai_client is None:
+            from google import genai
+
+            api_key = os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
+            self._genai_client = genai.Client(api_key=api_key)
+        return self._genai_client
+
+    def _create_gemini_cache(self, model, system_prompt):
+        from google.genai import types
+
+        cache = self._client().caches.create(
+            model=model,
+            config=types.CreateCachedContentConfig(
+                display_name=f"insightflow-{hashlib.sha256(system_prompt.encode('utf-8')).hexdigest()[:12]}",
+                system_instruction=system_prompt,
+                ttl=f"{PROMPT_CACHE_TTL_SECONDS}s",
+            ),
+        )
+        return cache.name
+
+    def get_gemini_cache(self, model, system_prompt):
+        """
+        Return the Gemini cache name of the prompt, creating (or renewing) it if needed.
+        Returns None when caching is unavailable, the failure is remembered for a while.
+        """
+        key = self._key("google", model, system_prompt)
+        now = time.time()
+        with self.lock:
+            handle = self.handles.get(key)
+            if handle and handle["expires_at"] > now:
+                return handle["name"]
+            creating = self.creating.get(key)
+            if creating is None:
+                self.creating[key] = Future()
+        if creating is not None:
+            return creating.result()
+
+        # Created outside the lock (network call)
+        name, expires_at = None, now + PROMPT_CACHE_RETRY_AFTER_SECONDS
+        try:
+            name = self._create_gemini_cache(model, system_prompt)
+            expires_at = now + PROMPT_CACHE_TTL_SECONDS - PROMPT_CACHE_RENEW_MARGIN_SECONDS
+            logger.info(f"Registered prompt cache {name} for {model}")
+        except Exception as e:
+            logger.warning(f"Prompt caching unavailable for {model}, sending full prompt: {e}")
+        finally:
+            with self.lock:
+                self.handles[key] = {"name": name, "expires_at": expires_at}
+                creating = self.creating.pop(key)
+            creating.set_result(name)
+        return name
+
+    def invalidate(self, provider, model, system_prompt):
+        with self.lock:
+            self.handles.pop(self._key(provider, model, system_prompt), None)
+
+    def prepare(self, provider, model, system_prompt, user_message, structured=False):
+        """
+        Build the messages of a call and the extra LLM arguments referencing
+        the provider cache. Falls back to plain messages when not applicable.
+        """
+        plain = ([SystemMessage(content=system_prompt), HumanMessage(content=user_message)], {})
+        if not PROMPT_CACHING or estimate_tokens(system_prompt) < min_cached_tokens(model):
+            return plain
+
+        if provider == "google" and not structured:
+            # Gemini rejects system instructions/tools next to cached content,
+            # so only plain text calls use it
+            name = self.get_gemini_cache(model, system_prompt)
+            if name:
+                return [HumanMessage(content=user_message)], {"cached_content": name}
+        elif provider == "anthropic":
+            system = SystemMessage(
+                content=[
+                    {"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}
+                ]
+            )
+            return [system, HumanMessage(content=user_message)], {}
+        return plain
+
+
+prompt_cache = PromptCache()
@@ -0,0 +1,190 @@
+import os
+import time
+import random
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Weighted providers used by invoke_llm, e.g. "google:3,openai:1,anthropic:1".
+# Empty: every call goes to LLM_PROVIDER only.
+LLM_PROVIDER_POOL = os.getenv("LLM_PROVIDER_POOL", "")
+# "failover": always use the heaviest healthy provider, the others take over on errors
+# "balance": spread calls across healthy providers according to their weights
+LLM_POOL_MODE = os.getenv("LLM_POOL_MODE", "failover").lower()
+# Consecutive failures after which a provider is taken out of the pool for a cooldown,
+# doubled each time it fails again right after coming back
+LLM_POOL_FAILURE_THRESHOLD = int(os.getenv("LLM_POOL_FAILURE_THRESHOLD", "3"))
+LLM_POOL_COOLDOWN_SECONDS = float(os.getenv("LLM_POOL_COOLDOWN_SECONDS", "30"))
+LLM_POOL_MAX_COOLDOWN_SECONDS = 600
+
+# Model used on each provider in place of the model requested by a call site
+MODEL_EQUIVALENTS = {
+    "gemini-2.5-pro": {"openai": "gpt-4o", "anthropic": "claude-sonnet-4-5"},
+    "gemini-2.5-flash": {"openai": "gpt-4o-mini", "anthropic": "claude-haiku-4-5"},
+}
+
+
+class ProviderUnavailableError(RuntimeError):
+    """Raised when a provider fails with an error that another provider may not have."""
+
+
+def parse_pool(spec):
+    """
+    Parse "google:3,openai:1" (or a list of (provider, weight)) into
+    [(provider, weight)], weights default to 1.
+    """
+    if not spec:
+        return []
+    if not isinstance(spec, str):
+        return [(provider, float(weight)) for provider, weight in spec]
+    members = []
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        provider, _, weight = item.strip().partition(":")
+        members.append((provider.strip().lower(), float(weight or 1)))
+    return members
+
+
+def model_for(provider, model):
+    """
+    Model to request from `provider` for a call site written for `model`.
+    """
+    return MODEL_EQUIVALENTS.get(model, {}).get(provider, model)
+
+
+class ProviderHealth:
+    """
+    Circuit breaker of one provider: opened after consecutive failures,
+    half-open again once the cooldown is over, closed by a success.
+    """
+
+    def __init__(self):
+        self.consecutive_failures = 0
+        self.opened = 0
+        self.open_until = 0.0
+
+    def is_available(self, now):
+        return now >= self.open_until
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self.opened = 0
+        self.open_until = 0.0
+
+    def record_failure(self, now):
+        self.consecutive_failures += 1
+        # A half-open provider failing again goes straight back to cooldown
+        if self.consecutive_failures >= LLM_POOL_FAILURE_THRESHOLD or self.opened:
+            self.opened += 1
+            cooldown = min(
+                LLM_POOL_MAX_COOLDOWN_SECONDS,
+                LLM_POOL_COOLDOWN_SECONDS * 2 ** (self.opened - 1),
+            )
+            self.open_until = now + cooldown
+            self.consecutive_failures = 0
+            return cooldown
+        return None
+
+
+class ProviderHealthTracker:
+    """
+    Process-wide health of the LLM providers, shared by every pool.
+    """
+
+    def __init__(self):
+        self.providers = {}
+        self.lock = threading.Lock()
+
+    def _get(self, provider):
+        return self.providers.setdefault(provider, ProviderHealth())
+
+    def is_available(self, provider):
+        with self.lock:
+            return self._get(provider).is_available(time.monotonic())
+
+    def open_until(self, provider):
+        with self.lock:
+            return self._get(provider).open_until
+
+    def record_success(self, provider):
+        with self.lock:
+            self._get(provider).record_success()
+
+    def record_failure(self, provider, error=None):
+        with self.lock:
+            cooldown = self._get(provider).record_failure(time.monotonic())
+        if cooldown:
+            logger.warning(
+                f"LLM provider {provider} taken out of the pool for {cooldown:.0f}s "
+                f"after failures ({type(error).__name__}: {error})"
+            )
+
+
+provider_health = ProviderHealthTracker()
+
+
+class ProviderPool:
+    """
+    Weighted set of providers for a call site, picking a healthy provider
+    for each attempt and failing over to the next one on errors.
+    """
+
+    def __init__(self, members, mode=None, health=None):
+        self.members = [(provider, weight) for provider, weight in members if weight > 0]
+        self.mode = mode or LLM_POOL_MODE
+        self.health = health or provider_health
+
+    @property
+    def providers(self):
+        return [provider for provider, _ in self.members]
+
+    def candidates(self, exclude=()):
+        """
+        Providers to try, best first, skipping `exclude` (already failed for
+        this call). When every provider is cooling down, the one coming back
+        first is used rather than failing the call.
+        """
+        members = [(p, w) for p, w in self.members if p not in exclude]
+        if not members:
+            return []
+        healthy = [(p, w) for p, w in members if self.health.is_available(p)]
+        if not healthy:
+            return sorted((p for p, _ in members), key=self.health.open_until)
+        if self.mode == "balance":
+            # Weighted random order (Efraimidis-Spirakis)
+            ordered = sorted(healthy, key=lambda m: -random.random() ** (1.0 / m[1]))
+        else:
+            ordered = sorted(healthy, key=lambda m: -m[1])
+        return [p for p, _ in ordered]
+
+    def select(self, model, exclude=()):
+        """
+        Return the (provider, model) to use for the next attempt.
+        """
+        candidates = self.candidates(exclude) or self.candidates()
+        provider = candidates[0]
+        return provider, model_for(provider, model)
+
+    def has_alternative(self, exclude):
+        return any(
+            p not in exclude and self.health.is_available(p) for p in self.providers
+        )
+
+    def record_success(self, provider):
+        self.health.record_success(provider)
+
+    def record_failure(self, provider, error=None):
+        self.health.record_failure(provider, error)
+
+
+def get_provider_pool(providers=None, default_provider="google"):
+    """
+    Pool of a call site: `providers` (spec or list) if given, else
+    LLM_PROVIDER_POOL, else the single default provider.
+    """
+    members = parse_pool(providers) or parse_pool(LLM_PROVIDER_POOL)
+    if not members:
+        members = [(default_provider, 1.0)]
+    return ProviderPool(members)
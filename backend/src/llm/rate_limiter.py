@@ -0,0 +1,277 @@
+import os
+import time
+import asyncio
+import threading
+import logging
+from contextlib import contextmanager, asynccontextmanager
+
+logger = logging.getLogger(__name__)
+
+# Default per-provider limits. Every value can be overridden through the
+# environment, e.g. LLM_GOOGLE_RPM=60, LLM_GOOGLE_TPM=1000000,
+# LLM_GOOGLE_MAX_CONCURRENCY=8
+DEFAULT_PROVIDER_LIMITS = {
+    "google": {"rpm": 150, "tpm": 2_000_000, "max_concurrency": 16},
+    "openai": {"rpm": 500, "tpm": 800_000, "max_concurrency": 16},
+    "anthropic": {"rpm": 50, "tpm": 400_000, "max_concurrency": 8},
+    # Offline provider used for benchmarks, limited only when configured
+    "fake": {"rpm": 1_000_000, "tpm": 1_000_000_000, "max_concurrency": 256},
+}
+FALLBACK_LIMITS = {"rpm": 60, "tpm": 500_000, "max_concurrency": 4}
+
+# Errors that mean "the provider is overloaded, slow down"
+OVERLOAD_STATUS_CODES = (429, 503)
+OVERLOAD_MARKERS = ("429", "503", "rate limit", "resource_exhausted", "overloaded", "quota")
+
+
+def estimate_tokens(text) -> int:
+    """
+    Rough token estimate (~4 characters per token) used for rate budgeting.
+    """
+    if not text:
+        return 0
+    return max(1, len(str(text)) // 4)
+
+
+def is_overload_error(error) -> bool:
+    """
+    Check if an exception raised by a provider SDK is a 429/503 style error.
+    """
+    for attr in ("status_code", "code", "http_status"):
+        value = getattr(error, attr, None)
+        if value in OVERLOAD_STATUS_CODES:
+            return True
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) in OVERLOAD_STATUS_CODES:
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in OVERLOAD_MARKERS)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at `rate_per_minute`.
+    The balance may go negative when usage is debited after the fact,
+    which makes later callers wait until the debt is paid back.
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = float(capacity if capacity is not None else rate_per_minute)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate_per_second
+        )
+        self.updated_at = now
+
+    def acquire(self, amount=1):
+        """
+        Block until `amount` tokens are available, then take them.
+        Requests larger than the bucket capacity are capped so they can't wait forever.
+        """
+        amount = min(float(amount), self.capacity)
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate_per_second
+            time.sleep(min(wait, 1.0))
+
+    async def aacquire(self, amount=1):
+        """
+        Async version of `acquire`, waiting without blocking the event loop.
+        """
+        amount = min(float(amount), self.capacity)
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate_per_second
+            await asyncio.sleep(min(wait, 1.0))
+
+    def debit(self, amount):
+        """
+        Take tokens without waiting (used to account for usage known only afterwards).
+        """
+        with self.lock:
+            self._refill()
+            self.tokens -= float(amount)
+
+
+class AIMDConcurrencyLimiter:
+    """
+    Adaptive concurrency limit using additive-increase / multiplicative-decrease:
+    every success grows the limit by 1/limit (about +1 per full window),
+    every overload error multiplies it by `decrease_factor`.
+    """
+
+    def __init__(self, max_limit, min_limit=1, initial_limit=None, decrease_factor=0.5):
+        self.max_limit = float(max_limit)
+        self.min_limit = float(min_limit)
+        self.limit = float(initial_limit if initial_limit is not None else max(min_limit, max_limit / 2))
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+
+    async def aacquire(self, poll_interval=0.05):
+        # Slots are shared with the threads, so the condition is polled instead of awaited
+        while True:
+            with self.condition:
+                if self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+            await asyncio.sleep(poll_interval)
+
+    def release(self, overloaded=False, succeeded=True):
+        with self.condition:
+            self.in_flight -= 1
+            if overloaded:
+                self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                logger.warning(f"LLM overload detected, concurrency limit lowered to {int(self.limit)}")
+            elif succeeded:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self.condition.notify_all()
+
+
+class ConcurrencySlot:
+    """
+    Slot taken from an `AIMDConcurrencyLimiter`, released once: by the call
+    when it ends, or earlier when the call is abandoned (see `retry.Attempt`).
+    """
+
+    def __init__(self, concurrency):
+        self.concurrency = concurrency
+        self.released = False
+        self.lock = threading.Lock()
+
+    def release(self, overloaded=False, succeeded=True):
+        with self.lock:
+            if self.released:
+                return
+            self.released = True
+        self.concurrency.release(overloaded=overloaded, succeeded=succeeded)
+
+
+class ProviderLimiter:
+    """
+    Combines requests-per-minute and tokens-per-minute buckets with an
+    AIMD concurrency limit for a single LLM provider.
+    """
+
+    def __init__(self, provider, rpm, tpm, max_concurrency):
+        self.provider = provider
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.concurrency = AIMDConcurrencyLimiter(max_concurrency)
+
+    def _slot(self, attempt):
+        slot = ConcurrencySlot(self.concurrency)
+        if attempt is not None:
+            # An abandoned call doesn't keep its slot (nor adapts the limit)
+            attempt.on_abandon(lambda: slot.release(succeeded=False))
+        return slot
+
+    @contextmanager
+    def limit(self, estimated_tokens=0, attempt=None):
+        """
+        Wait for a slot, run the wrapped call, then adapt the concurrency limit
+        from its outcome. Yields a callable to report the output tokens used.
+        """
+        self.requests.acquire(1)
+        if estimated_tokens:
+            self.tokens.acquire(estimated_tokens)
+        self.concurrency.acquire()
+        slot = self._slot(attempt)
+        succeeded = False
+        try:
+            yield self.tokens.debit
+            succeeded = True
+        except Exception as e:
+            slot.release(overloaded=is_overload_error(e), succeeded=False)
+            raise
+        finally:
+            # Also runs on cancellation, which isn't an Exception
+            slot.release(succeeded=succeeded)
+
+    @asynccontextmanager
+    async def alimit(self, estimated_tokens=0, attempt=None):
+        """
+        Async version of `limit`, sharing the same budgets.
+        """
+        await self.requests.aacquire(1)
+        if estimated_tokens:
+            await self.tokens.aacquire(estimated_tokens)
+        await self.concurrency.aacquire()
+        slot = self._slot(attempt)
+        succeeded = False
+        try:
+            yield self.tokens.debit
+            succeeded = True
+        except Exception as e:
+            slot.release(overloaded=is_overload_error(e), succeeded=False)
+            raise
+        finally:
+            # Also runs on cancellation, which isn't an Exception
+            slot.release(succeeded=succeeded)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def _limit_from_env(provider, key, default):
+    value = os.getenv(f"LLM_{provider.upper()}_{key.upper()}")
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning(f"Ignoring invalid LLM_{provider.upper()}_{key.upper()}={value!r}")
+        return default
+
+
+def _build_limiter(provider, rpm=None, tpm=None, max_concurrency=None):
+    defaults = DEFAULT_PROVIDER_LIMITS.get(provider, FALLBACK_LIMITS)
+    return ProviderLimiter(
+        provider,
+        rpm=rpm or _limit_from_env(provider, "rpm", defaults["rpm"]),
+        tpm=tpm or _limit_from_env(provider, "tpm", defaults["tpm"]),
+        max_concurrency=max_concurrency
+        or _limit_from_env(provider, "max_concurrency", defaults["max_concurrency"]),
+    )
+
+
+def configure_provider_limits(provider, rpm=None, tpm=None, max_concurrency=None):
+    """
+    Replace the process-wide limiter of a provider with new limits.
+    Omitted values fall back to the environment / built-in defaults.
+    """
+    limiter = _build_limiter(provider, rpm, tpm, max_concurrency)
+    with _limiters_lock:
+        _limiters[provider] = limiter
+    return limiter
+
+
+def get_provider_limiter(provider) -> ProviderLimiter:
+    """
+    Get the shared limiter for a provider, creating it on first use.
+    """
+    with _limiters_lock:
+        if provider not in _limiters:
+            _limiters[provider] = _build_limiter(provider)
+        return _limiters[provider]
@@ -0,0 +1,303 @@
+import os
+import time
+import asyncio
+import random
+import contextvars
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from .rate_limiter import is_overload_error
+
+logger = logging.getLogger(__name__)
+
+# Defaults, overridable through the environment
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "180"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "1"))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "30"))
+# Hedging sends a duplicate request when the first one is slower than
+# the observed latency quantile for that kind of call
+LLM_HEDGE_REQUESTS = os.getenv("LLM_HEDGE_REQUESTS", "false").lower() in ("1", "true", "yes")
+LLM_HEDGE_QUANTILE = float(os.getenv("LLM_HEDGE_QUANTILE", "0.95"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "10"))
+
+# Status codes that will not get better by retrying
+PERMANENT_STATUS_CODES = (400, 401, 403, 404, 422)
+# Programming errors are never retried
+PERMANENT_ERROR_TYPES = (TypeError, KeyError, AttributeError, NotImplementedError)
+# Parsing errors of structured outputs (matched by name to avoid importing every SDK)
+MALFORMED_OUTPUT_ERROR_NAMES = ("ValidationError", "OutputParserException", "JSONDecodeError")
+
+# Shared pool running the hedged LLM calls. Plain attempts run in the calling
+# thread, their deadline is enforced by the provider client (see `LLMCall`)
+_executor = ThreadPoolExecutor(max_workers=64, thread_name_prefix="llm-call")
+
+
+class MalformedOutputError(ValueError):
+    """Raised when a structured LLM response is missing or doesn't match its schema."""
+
+
+class LLMTimeoutError(TimeoutError):
+    """Raised when an LLM call doesn't return within its deadline."""
+
+
+def _status_code(error):
+    for attr in ("status_code", "code", "http_status"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    return getattr(getattr(error, "response", None), "status_code", None)
+
+
+def is_retryable_error(error) -> bool:
+    """
+    Decide if a failed LLM call is worth retrying: timeouts, overloads,
+    server errors, network errors and malformed structured outputs are;
+    bad requests, auth errors and programming errors aren't.
+    """
+    if isinstance(error, (MalformedOutputError, TimeoutError)):
+        return True
+    if type(error).__name__ in MALFORMED_OUTPUT_ERROR_NAMES:
+        return True
+    if is_overload_error(error):
+        return True
+    status_code = _status_code(error)
+    if status_code in PERMANENT_STATUS_CODES:
+        return False
+    if isinstance(error, PERMANENT_ERROR_TYPES):
+        return False
+    return True
+
+
+def backoff_delay(attempt, base=None, cap=None) -> float:
+    """
+    Exponential backoff with full jitter: uniform(0, min(cap, base * 2^attempt)).
+    """
+    base = LLM_BACKOFF_BASE_SECONDS if base is None else base
+    cap = LLM_BACKOFF_MAX_SECONDS if cap is None else cap
+    return random.uniform(0, min(cap, base * (2**attempt)))
+
+
+class Attempt:
+    """
+    A call running in the executor. Threads can't be stopped, so a call that
+    lost a hedge or passed its deadline is abandoned instead: what it holds
+    (e.g. its limiter slot) is handed back right away and its late outcome
+    is ignored. The running call reads it from `current_attempt`.
+    """
+
+    def __init__(self):
+        self.abandoned = False
+        self.callbacks = []
+        self.lock = threading.Lock()
+
+    def on_abandon(self, callback):
+        with self.lock:
+            if not self.abandoned:
+                self.callbacks.append(callback)
+                return
+        callback()
+
+    def abandon(self):
+        with self.lock:
+            if self.abandoned:
+                return
+            self.abandoned = True
+            callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+current_attempt = contextvars.ContextVar("llm_attempt", default=None)
+
+
+def _submit(call):
+    # Run in a copy of the caller's context so context variables (job, node...) follow the call
+    attempt = Attempt()
+    context = contextvars.copy_context()
+    context.run(current_attempt.set, attempt)
+    return _executor.submit(context.run, call), attempt
+
+
+class LatencyTracker:
+    """
+    Keeps a sliding window of successful call latencies per call kind
+    to derive the hedging delay.
+    """
+
+    def __init__(self, window=200):
+        self.window = window
+        self.samples = {}
+        self.lock = threading.Lock()
+
+    def record(self, key, seconds):
+        with self.lock:
+            self.samples.setdefault(key, deque(maxlen=self.window)).append(seconds)
+
+    def quantile(self, key, q):
+        with self.lock:
+            samples = sorted(self.samples.get(key, ()))
+        if len(samples) < LLM_HEDGE_MIN_SAMPLES:
+            return None
+        index = min(len(samples) - 1, int(q * len(samples)))
+        return samples[index]
+
+
+latency_tracker = LatencyTracker()
+
+
+def _run_attempt(call, timeout, hedge, latency_key):
+    """
+    Run a single (possibly hedged) attempt and return its result.
+    """
+    started_at = time.monotonic()
+    hedge_delay = latency_tracker.quantile(latency_key, LLM_HEDGE_QUANTILE) if hedge else None
+    if hedge_delay is None or hedge_delay >= timeout:
+        result = call()
+        latency_tracker.record(latency_key, time.monotonic() - started_at)
+        return result
+
+    future, attempt = _submit(call)
+    attempts = {future: attempt}
+    done, _ = wait(attempts, timeout=hedge_delay)
+    if not done:
+        logger.info(f"LLM call slower than p{int(LLM_HEDGE_QUANTILE * 100)} ({hedge_delay:.1f}s), sending hedged request")
+        future, attempt = _submit(call)
+        attempts[future] = attempt
+
+    deadline = started_at + timeout
+    error = None
+    pending = set(attempts)
+    try:
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    latency_tracker.record(latency_key, time.monotonic() - started_at)
+                    return future.result()
+                error = future.exception()
+    finally:
+        # The losing/timed out calls run on until their client timeout
+        for future in pending:
+            future.cancel()
+            attempts[future].abandon()
+
+    if error is not None and not pending:
+        raise error
+    raise LLMTimeoutError(f"LLM call timed out after {timeout:g}s")
+
+
+def call_with_retries(
+    call,
+    timeout=None,
+    max_retries=None,
+    hedge=None,
+    latency_key="default",
+    on_retry=None,
+    backoff=None,
+):
+    """
+    Call `call()` with a per-attempt timeout, optional hedging and retries
+    using exponential backoff with jitter on retryable errors. Unhedged
+    attempts run in the calling thread: `call` must enforce `timeout` itself.
+    `on_retry(error)` is called before each retry, `backoff(attempt, error)`
+    may override the delay (e.g. no wait when failing over to another provider).
+    """
+    timeout = LLM_TIMEOUT_SECONDS if timeout is None else timeout
+    max_retries = LLM_MAX_RETRIES if max_retries is None else max_retries
+    hedge = LLM_HEDGE_REQUESTS if hedge is None else hedge
+
+    for attempt in range(max_retries + 1):
+        try:
+            return _run_attempt(call, timeout, hedge, latency_key)
+        except Exception as e:
+            error = e
+        if attempt >= max_retries or not is_retryable_error(error):
+            raise error
+        if on_retry:
+            on_retry(error)
+        delay = backoff(attempt, error) if backoff else backoff_delay(attempt)
+        logger.warning(
+            f"LLM call failed ({type(error).__name__}: {error}), "
+            f"retrying in {delay:.1f}s ({attempt + 1}/{max_retries})"
+        )
+        time.sleep(delay)
+
+
+async def _arun_attempt(call, timeout, hedge, latency_key):
+    """
+    Async version of `_run_attempt`, `call` returning a coroutine.
+    """
+    started_at = time.monotonic()
+    tasks = [asyncio.ensure_future(call())]
+    deadline = started_at + timeout
+
+    hedge_delay = latency_tracker.quantile(latency_key, LLM_HEDGE_QUANTILE) if hedge else None
+    if hedge_delay is not None and hedge_delay < timeout:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+        if not done:
+            logger.info(f"LLM call slower than p{int(LLM_HEDGE_QUANTILE * 100)} ({hedge_delay:.1f}s), sending hedged request")
+            tasks.append(asyncio.ensure_future(call()))
+
+    error = None
+    pending = set(tasks)
+    try:
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(
+                pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None:
+                    latency_tracker.record(latency_key, time.monotonic() - started_at)
+                    return task.result()
+                error = task.exception()
+    finally:
+        # Unlike threads, the losing/timed out requests are actually cancelled
+        for task in pending:
+            task.cancel()
+
+    if error is not None and not pending:
+        raise error
+    raise LLMTimeoutError(f"LLM call timed out after {timeout:g}s")
+
+
+async def acall_with_retries(
+    call,
+    timeout=None,
+    max_retries=None,
+    hedge=None,
+    latency_key="default",
+    on_retry=None,
+    backoff=None,
+):
+    """
+    Async version of `call_with_retries`: `call()` returns a coroutine,
+    attempts and backoff delays are awaited on the running event loop.
+    """
+    timeout = LLM_TIMEOUT_SECONDS if timeout is None else timeout
+    max_retries = LLM_MAX_RETRIES if max_retries is None else max_retries
+    hedge = LLM_HEDGE_REQUESTS if hedge is None else hedge
+
+    for attempt in range(max_retries + 1):
+        try:
+            return await _arun_attempt(call, timeout, hedge, latency_key)
+        except Exception as e:
+            error = e
+        if attempt >= max_retries or not is_retryable_error(error):
+            raise error
+        if on_retry:
+            on_retry(error)
+        delay = backoff(attempt, error) if backoff else backoff_delay(attempt)
+        logger.warning(
+            f"LLM call failed ({type(error).__name__}: {error}), "
+            f"retrying in {delay:.1f}s ({attempt + 1}/{max_retries})"
+        )
+        await asyncio.sleep(delay)
@@ -0,0 +1,66 @@
+import os
+import time
+import uuid
+import logging
+import contextvars
+
+logger = logging.getLogger(__name__)
+
+# Job-level sink receiving streaming events (a callable taking a dict).
+# The server sets it for each WebSocket job, it is unset for CLI runs.
+stream_sink = contextvars.ContextVar("llm_stream_sink", default=None)
+
+# Minimum delay between two forwarded messages of the same stream,
+# chunks received in between are coalesced into a single message
+LLM_STREAM_FLUSH_INTERVAL_SECONDS = float(os.getenv("LLM_STREAM_FLUSH_INTERVAL_SECONDS", "0.5"))
+
+
+class TokenStreamForwarder:
+    """
+    Accumulates streamed LLM chunks and forwards them to the job sink,
+    throttled to one message per flush interval.
+    """
+
+    def __init__(self, sink, label, flush_interval=None):
+        self.sink = sink
+        self.label = label
+        self.stream_id = uuid.uuid4().hex
+        self.flush_interval = (
+            LLM_STREAM_FLUSH_INTERVAL_SECONDS if flush_interval is None else flush_interval
+        )
+        self.parts = []
+        self.buffer = []
+        self.last_flush = time.monotonic()
+
+    def push(self, chunk):
+        if not chunk:
+            return
+        self.parts.append(chunk)
+        self.buffer.append(chunk)
+        if time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self, done=False):
+        if not self.buffer and not done:
+            return
+        event = {
+            "type": "LLM_STREAM",
+            "stream_id": self.stream_id,
+            "label": self.label,
+            "text": "".join(self.buffer),
+            "done": done,
+        }
+        self.buffer = []
+        self.last_flush = time.monotonic()
+        try:
+            self.sink(event)
+        except Exception as e:
+            # Never fail a generation because the client went away
+            logger.debug(f"Could not forward stream chunk: {e}")
+
+    def finish(self):
+        """
+        Flush remaining chunks, mark the stream as done and return the full text.
+        """
+        self.flush(done=True)
+        return "".join(self.parts)
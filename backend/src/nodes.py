@@ -4,15 +4,42 @@ from datetime import datetime
 logger = logging.getLogger(__name__)
 from .tools.base.markdown_scraper_tool import scrape_website_to_markdown
 from .tools.base.search_tools import get_recent_news
+from .tools.base.site_crawler import crawl_company_site, website_content
+from .tools.base.prefetcher import prefetch_site
+from .tools.base.boilerplate import strip_boilerplate
+from .tools.base.content_reducer import (
+    reduce_content,
+    WEBSITE_CONTENT_TOKEN_BUDGET,
+    BLOG_CONTENT_TOKEN_BUDGET,
+)
+from .tools.base.link_rewriter import (
+    rewrite_links,
+    format_correct_links,
+    OUTREACH_PROOFREAD,
+)
+from .tools.base.prompt_serializer import compact_serialize
 from .tools.base.gmail_tools import GmailTools
+from .tools.base.fake_tools import FAKE_TOOLS
 from .tools.google_docs_tools import GoogleDocsManager
+from .tools.local_docs_manager import LocalDocsManager
 from .tools.lead_research import research_lead_on_linkedin
-from .tools.company_research import research_lead_company, generate_company_profile
+from .tools.company_research import (
+    research_lead_company,
+    generate_company_profile,
+    CREATE_COMPANY_PROFILE,
+)
 from .tools.youtube_tools import get_youtube_stats
+from .tools.lead_scoring import score_lead_report
 from .tools.rag_tool import fetch_similar_case_study
 from .prompts import *
 from .state import LeadData, CompanyData, Report, GraphInputState, GraphState
-from .structured_outputs import WebsiteData, EmailResponse
+from .structured_outputs import (
+    WebsiteData,
+    EmailResponse,
+    CompanyResearch,
+    LeadResearchReports,
+    InterviewPreparation,
+)
 from .utils import invoke_llm, get_report, get_current_date, save_reports_locally
 
 # Enable or disable sending emails directly using GMAIL
@@ -21,12 +48,20 @@ SEND_EMAIL_DIRECTLY = False
 # Enable or disable saving emails to Google Docs
 # By defauly all reports are save locally in `reports` folder
 SAVE_TO_GOOGLE_DOCS = True
+# Enable or disable creating Gmail drafts of the personalized emails
+CREATE_EMAIL_DRAFTS = True
+# Enable or disable the LLM summary of the company website, when disabled
+# only the blog & social media links are extracted from it
+SUMMARIZE_WEBSITE = True
 
 
 class OutReachAutomationNodes:
     def __init__(self, loader, docs_manager=None):
         self.lead_loader = loader
-        self.docs_manager = docs_manager if docs_manager else GoogleDocsManager()
+        if not docs_manager:
+            # Offline runs keep the reports on disk instead of Google Drive
+            docs_manager = LocalDocsManager() if FAKE_TOOLS else GoogleDocsManager()
+        self.docs_manager = docs_manager
         self.drive_folder_name = ""
 
     def get_new_leads(self, state: GraphInputState):
@@ -116,24 +151,23 @@ class OutReachAutomationNodes:
         logger.info("----- Searching Lead data on LinkedIn -----")
         lead_data = state["current_lead"]
         company_data = state.get("company_data", CompanyData())
+        # The website of the email domain downloads in the background while
+        # the lead & company are researched on LinkedIn
+        prefetch_site(lead_data.website)
 
         # Scrape lead linkedin profile
         (lead_profile, company_name, company_website, company_linkedin_url) = (
             research_lead_on_linkedin(lead_data.name, lead_data.email)
         )
         lead_data.profile = lead_profile
+        # Unless it's the same site, the LinkedIn company website too
+        prefetch_site(company_website, prefetched=lead_data.website)
 
         # Research company on linkedin
         company_profile = research_lead_company(company_linkedin_url)
+        self._set_company_data(company_data, company_name, company_website, company_profile)
 
-        # Update company name from LinkedIn data
-        company_data.name = company_name
-        company_data.website = company_website
-        company_data.profile = str(company_profile)
-
-        # Use a stable per-lead folder: Lead_Reports/{lead_name}_{company_name}
-        lead_folder = f"{lead_data.name}_{company_data.name}".strip().replace("/", "_")
-        self.drive_folder_name = f"Lead_Reports/{lead_folder}"
+        self.drive_folder_name = self._lead_folder(lead_data, company_data)
         # Ensure the folder exists in Drive; if already exists, leave it
         try:
             self.docs_manager.ensure_folder_path(
@@ -144,6 +178,19 @@ class OutReachAutomationNodes:
 
         return {"current_lead": lead_data, "company_data": company_data, "reports": []}
 
+    @staticmethod
+    def _set_company_data(company_data, company_name, company_website, company_profile):
+        # Update company name from LinkedIn data
+        company_data.name = company_name
+        company_data.website = company_website
+        company_data.profile = compact_serialize(company_profile, label="company LinkedIn data")
+
+    @staticmethod
+    def _lead_folder(lead_data, company_data):
+        # Use a stable per-lead folder: Lead_Reports/{lead_name}_{company_name}
+        lead_folder = f"{lead_data.name}_{company_data.name}".strip().replace("/", "_")
+        return f"Lead_Reports/{lead_folder}"
+
     def review_company_website(self, state: GraphState):
         logger.info("----- Scraping company website -----")
         lead_data = state.get("current_lead")
@@ -151,44 +198,89 @@ class OutReachAutomationNodes:
         company_website = company_data.website
         # print(f"Company Website: {company_website}")
         if company_website:
-            # Scrape company website
+            # Crawl the company website in one burst (home, blog, about & products
+            # pages), blog & social links are read from the HTML
             try:
-                content = scrape_website_to_markdown(company_website)
+                company_data.website_pages, links = crawl_company_site(company_website)
             except Exception:
-                content = ""
-
-            if not content or not content.strip():
-                # Avoid calling LLM when nothing to analyze
-                website_info = WebsiteData(
-                    summary="",
-                    blog_url="",
-                    youtube="",
-                    twitter="",
-                    facebook="",
+                company_data.website_pages, links = {}, {}
+            content = website_content(company_data.website_pages)
+
+            website_output = None
+            if self._should_analyze_website(content, links):
+                # Strip menus, footers & repeated blocks to fit the token budget
+                content = reduce_content(
+                    content, WEBSITE_CONTENT_TOKEN_BUDGET, label="website content"
                 )
-            else:
-                # Call LLM to analyze website
-                website_info = invoke_llm(
-                    system_prompt=WEBSITE_ANALYSIS_PROMPT.format(
-                        main_url=company_website
-                    ),
-                    user_message=content,
-                    model="gemini-2.5-pro",
-                    response_format=WebsiteData,
-                )
-
-            # Extract all relevant links
-            company_data.social_media_links.blog = website_info.blog_url
-            company_data.social_media_links.facebook = website_info.facebook
-            company_data.social_media_links.twitter = website_info.twitter
-            company_data.social_media_links.youtube = website_info.youtube
+                website_output = invoke_llm(**self._website_request(company_website, content, links))
+            website_summary = self._set_website_links(company_data, links, website_output)
 
             # Update company profile with website summary
-            company_data.profile = generate_company_profile(
-                company_data.profile, website_info.summary
-            )
+            company_data.profile = generate_company_profile(company_data.profile, website_summary)
 
-        inputs = f"""
+        # Generate general lead search report
+        general_lead_search_report = invoke_llm(
+            system_prompt=LEAD_SEARCH_REPORT_PROMPT,
+            user_message=self._lead_search_inputs(lead_data, company_data),
+            model="gemini-2.5-pro",
+        )
+        return {
+            "company_data": company_data,
+            "reports": [self._report("General Lead Research Report", general_lead_search_report)],
+        }
+
+    @staticmethod
+    def _report(title, content, is_markdown=True):
+        return Report(title=title, content=content, is_markdown=is_markdown)
+
+    @staticmethod
+    def _should_analyze_website(content, links):
+        # The LLM reads the website for its summary, or for the links the HTML didn't have
+        return bool(content and content.strip()) and (SUMMARIZE_WEBSITE or not any(links.values()))
+
+    @staticmethod
+    def _website_request(company_website, content, links):
+        if any(links.values()):
+            # Call LLM to summarize website
+            return {
+                "system_prompt": WEBSITE_SUMMARY_PROMPT.format(main_url=company_website),
+                "user_message": content,
+                "model": "gemini-2.5-pro",
+            }
+        # No link found in the HTML (e.g. rendered by JavaScript),
+        # let the LLM look for them in the content
+        return {
+            "system_prompt": WEBSITE_ANALYSIS_PROMPT.format(main_url=company_website),
+            "user_message": content,
+            "model": "gemini-2.5-pro",
+            "response_format": WebsiteData,
+        }
+
+    @staticmethod
+    def _set_website_links(company_data, links, website_output):
+        """
+        Store the blog & social links of the website (from its HTML, or from
+        the LLM analysis of `_website_request`) and return the website summary.
+        """
+        if isinstance(website_output, WebsiteData):
+            website_info = website_output
+            if not SUMMARIZE_WEBSITE:
+                website_info.summary = ""
+        else:
+            website_info = WebsiteData(summary=website_output or "", **{
+                key: links.get(key, "") for key in ("blog_url", "youtube", "twitter", "facebook")
+            })
+
+        # Extract all relevant links
+        company_data.social_media_links.blog = website_info.blog_url
+        company_data.social_media_links.facebook = website_info.facebook
+        company_data.social_media_links.twitter = website_info.twitter
+        company_data.social_media_links.youtube = website_info.youtube
+        return website_info.summary
+
+    @staticmethod
+    def _lead_search_inputs(lead_data, company_data):
+        return f"""
         # **Lead Profile:**
 
         {lead_data.profile}
@@ -199,21 +291,88 @@ class OutReachAutomationNodes:
         {company_data.profile}
         """
 
-        # Generate general lead search report
-        general_lead_search_report = invoke_llm(
-            system_prompt=LEAD_SEARCH_REPORT_PROMPT,
+    def review_company_website_fused(self, state: GraphState):
+        """
+        Fused variant of `review_company_website`: extracts the website links,
+        writes the company profile and the general lead research report in a
+        single LLM call instead of three.
+        """
+        logger.info("----- Researching company website & profile (fused) -----")
+        lead_data = state.get("current_lead")
+        company_data = state.get("company_data")
+        company_website = company_data.website
+
+        content, links = "", {}
+        if company_website:
+            # Crawl the company website, blog & social links are read from the HTML
+            try:
+                company_data.website_pages, links = crawl_company_site(company_website)
+            except Exception:
+                company_data.website_pages, links = {}, {}
+            content = website_content(company_data.website_pages)
+            if content and content.strip():
+                content = reduce_content(
+                    content, WEBSITE_CONTENT_TOKEN_BUDGET, label="website content"
+                )
+
+        prompt, inputs = self._fused_research_inputs(lead_data, company_data, content)
+        research = invoke_llm(
+            system_prompt=prompt,
             user_message=inputs,
             model="gemini-2.5-pro",
+            response_format=CompanyResearch,
         )
+        return self._fused_research_result(company_data, links, research)
+
+    @staticmethod
+    def _fused_research_result(company_data, links, research):
+        # Extract all relevant links, the ones found in the HTML take precedence
+        company_data.social_media_links.blog = links.get("blog_url") or research.blog_url
+        company_data.social_media_links.facebook = links.get("facebook") or research.facebook
+        company_data.social_media_links.twitter = links.get("twitter") or research.twitter
+        company_data.social_media_links.youtube = links.get("youtube") or research.youtube
+        company_data.profile = research.company_profile
 
         lead_search_report = Report(
             title="General Lead Research Report",
-            content=general_lead_search_report,
+            content=research.lead_research_report,
             is_markdown=True,
         )
-
         return {"company_data": company_data, "reports": [lead_search_report]}
 
+    @staticmethod
+    def _fused_research_inputs(lead_data, company_data, content):
+        inputs = f"""
+        # **Lead Profile:**
+
+        {lead_data.profile}
+
+
+        # **Company LinkedIn Information:**
+
+        {company_data.profile}
+
+
+        # **Scraped Website:**
+
+        {content}
+        """
+
+        prompt = FUSED_COMPANY_RESEARCH_PROMPT.format(
+            main_url=company_data.website,
+            profile_instructions=CREATE_COMPANY_PROFILE,
+            lead_report_instructions=LEAD_SEARCH_REPORT_PROMPT,
+        )
+        return prompt, inputs
+
+    @staticmethod
+    def _crawled_page(company_data, kind, url):
+        # Markdown of a page fetched by the website crawl, None if it wasn't
+        page = company_data.website_pages.get(kind)
+        if page and page["url"].rstrip("/") == url.rstrip("/"):
+            return page["markdown"]
+        return None
+
     @staticmethod
     def collect_company_information(state: GraphState):
         return {"reports": []}
@@ -226,19 +385,19 @@ class OutReachAutomationNodes:
         company_data = state["company_data"]
         blog_url = company_data.social_media_links.blog
         if blog_url:
-            blog_content = scrape_website_to_markdown(blog_url)
-            prompt = BLOG_ANALYSIS_PROMPT.format(company_name=company_data.name)
+            # The blog index is usually fetched by the website crawl
+            blog_content = self._crawled_page(company_data, "blog", blog_url)
+            if blog_content is None:
+                blog_content = strip_boilerplate(blog_url, scrape_website_to_markdown(blog_url))
+            blog_content = reduce_content(
+                blog_content, BLOG_CONTENT_TOKEN_BUDGET, label="blog content"
+            )
             blog_analysis_report = invoke_llm(
-                system_prompt=prompt,
+                system_prompt=BLOG_ANALYSIS_PROMPT.format(company_name=company_data.name),
                 user_message=blog_content,
                 model="gemini-2.5-pro",
             )
-            blog_analysis_report = Report(
-                title="Blog Analysis Report",
-                content=blog_analysis_report,
-                is_markdown=True,
-            )
-            reports_out.append(blog_analysis_report)
+            reports_out.append(self._report("Blog Analysis Report", blog_analysis_report))
         return {"reports": reports_out}
 
     def analyze_social_media_content(self, state: GraphState):
@@ -257,28 +416,15 @@ class OutReachAutomationNodes:
         if youtube_url:
             # Safely attempt to fetch YouTube stats; fall back to error text for LLM
             try:
-                youtube_data = get_youtube_stats(youtube_url)
-                if youtube_data is None:
-                    # Avoid passing None to LLM; provide clear context text instead
-                    youtube_data = "Skipping YouTube analysis: No data returned."
-                    logger.warning("Skipping YouTube analysis: No data returned.")
+                youtube_data = self._youtube_inputs(get_youtube_stats(youtube_url))
             except Exception as e:
-                # If API key is missing or any other error occurs, skip the step but
-                # pass a textual error message to the LLM instead of None
-                youtube_data = f"Skipping YouTube analysis due to error: {str(e)}"
-                logger.warning(f"Skipping YouTube analysis due to error: {str(e)}")
-            prompt = YOUTUBE_ANALYSIS_PROMPT.format(company_name=company_data.name)
+                youtube_data = self._youtube_inputs(error=e)
             youtube_insight = invoke_llm(
-                system_prompt=prompt,
+                system_prompt=YOUTUBE_ANALYSIS_PROMPT.format(company_name=company_data.name),
                 user_message=youtube_data,
                 model="gemini-2.5-pro",
             )
-            youtube_analysis_report = Report(
-                title="Youtube Analysis Report",
-                content=youtube_insight,
-                is_markdown=True,
-            )
-            reports_out.append(youtube_analysis_report)
+            reports_out.append(self._report("Youtube Analysis Report", youtube_insight))
 
         # Check If company has Facebook account
         if facebook_url:
@@ -292,6 +438,20 @@ class OutReachAutomationNodes:
 
         return {"company_data": company_data, "reports": reports_out}
 
+    @staticmethod
+    def _youtube_inputs(youtube_data=None, error=None):
+        if error is not None:
+            # If API key is missing or any other error occurs, skip the step but
+            # pass a textual error message to the LLM instead of None
+            message = f"Skipping YouTube analysis due to error: {str(error)}"
+        elif youtube_data is None:
+            # Avoid passing None to LLM; provide clear context text instead
+            message = "Skipping YouTube analysis: No data returned."
+        else:
+            return youtube_data
+        logger.warning(message)
+        return message
+
     def analyze_recent_news(self, state: GraphState):
         logger.info("----- Analyzing recent news about company -----")
 
@@ -300,29 +460,34 @@ class OutReachAutomationNodes:
 
         # Fetch recent news using serper API
         recent_news = get_recent_news(company=company_data.name)
-        number_months = 6
-        current_date = get_current_date()
-        news_analysis_prompt = NEWS_ANALYSIS_PROMPT.format(
-            company_name=company_data.name,
-            number_months=number_months,
-            date=current_date,
-        )
 
-        # Craft news analysis prompt
         news_insight = invoke_llm(
-            system_prompt=news_analysis_prompt,
+            system_prompt=self._news_analysis_prompt(company_data),
             user_message=recent_news,
             model="gemini-2.5-pro",
         )
+        return {"reports": [self._report("News Analysis Report", news_insight)]}
 
-        news_analysis_report = Report(
-            title="News Analysis Report", content=news_insight, is_markdown=True
+    @staticmethod
+    def _news_analysis_prompt(company_data):
+        # Craft news analysis prompt
+        return NEWS_ANALYSIS_PROMPT.format(
+            company_name=company_data.name,
+            number_months=6,
+            date=get_current_date(),
         )
-        return {"reports": [news_analysis_report]}
 
     def generate_digital_presence_report(self, state: GraphState):
         logger.info("----- Generate Digital presence analysis report -----")
 
+        prompt, inputs = self._digital_presence_inputs(state)
+        digital_presence_report = invoke_llm(
+            system_prompt=prompt, user_message=inputs, model="gemini-2.5-pro"
+        )
+        return {"reports": [self._report("Digital Presence Report", digital_presence_report)]}
+
+    @staticmethod
+    def _digital_presence_inputs(state):
         # Load reports
         reports = state["reports"]
         blog_analysis_report = get_report(reports, "Blog Analysis Report")
@@ -357,20 +522,23 @@ class OutReachAutomationNodes:
         prompt = DIGITAL_PRESENCE_REPORT_PROMPT.format(
             company_name=state["company_data"].name, date=get_current_date()
         )
-        digital_presence_report = invoke_llm(
-            system_prompt=prompt, user_message=inputs, model="gemini-2.5-pro"
-        )
-
-        digital_presence_report = Report(
-            title="Digital Presence Report",
-            content=digital_presence_report,
-            is_markdown=True,
-        )
-        return {"reports": [digital_presence_report]}
+        return prompt, inputs
 
     def generate_full_lead_research_report(self, state: GraphState):
         logger.info("----- Generate global lead analysis report -----")
 
+        prompt, inputs = self._full_report_inputs(state)
+        full_report = invoke_llm(
+            system_prompt=prompt,
+            user_message=inputs,
+            model="gemini-2.5-pro",
+            stream=True,
+            stream_label="Global Lead Analysis Report",
+        )
+        return {"reports": [self._report("Global Lead Analysis Report", full_report)]}
+
+    @staticmethod
+    def _full_report_inputs(state):
         # Load reports
         reports = state["reports"]
         general_lead_search_report = get_report(reports, "General Lead Research Report")
@@ -391,14 +559,84 @@ class OutReachAutomationNodes:
         prompt = GLOBAL_LEAD_RESEARCH_REPORT_PROMPT.format(
             company_name=state["company_data"].name, date=get_current_date()
         )
-        full_report = invoke_llm(
-            system_prompt=prompt, user_message=inputs, model="gemini-2.5-pro"
+        return prompt, inputs
+
+    def generate_lead_research_reports_fused(self, state: GraphState):
+        """
+        Fused variant of `generate_digital_presence_report` followed by
+        `generate_full_lead_research_report`: both reports in a single LLM call.
+        """
+        logger.info("----- Generate digital presence & global lead analysis reports (fused) -----")
+
+        prompt, inputs = self._fused_reports_inputs(state)
+        output = invoke_llm(
+            system_prompt=prompt,
+            user_message=inputs,
+            model="gemini-2.5-pro",
+            response_format=LeadResearchReports,
         )
+        return self._fused_reports_result(output)
 
+    @staticmethod
+    def _fused_reports_result(output):
+        digital_presence_report = Report(
+            title="Digital Presence Report",
+            content=output.digital_presence_report,
+            is_markdown=True,
+        )
         global_research_report = Report(
-            title="Global Lead Analysis Report", content=full_report, is_markdown=True
+            title="Global Lead Analysis Report",
+            content=output.global_research_report,
+            is_markdown=True,
+        )
+        return {"reports": [digital_presence_report, global_research_report]}
+
+    @staticmethod
+    def _fused_reports_inputs(state):
+        # Load reports
+        reports = state["reports"]
+        general_lead_search_report = get_report(reports, "General Lead Research Report")
+
+        inputs = f"""
+        # **Lead & company Information:**
+
+        {general_lead_search_report}
+
+        ---
+
+        # **Digital Presence Data:**
+        ## **Blog Information:**
+
+        {get_report(reports, "Blog Analysis Report")}
+
+        ## **Facebook Information:**
+
+        {get_report(reports, "Facebook Analysis Report")}
+
+        ## **Twitter Information:**
+
+        {get_report(reports, "Twitter Analysis Report")}
+
+        ## **Youtube Information:**
+
+        {get_report(reports, "Youtube Analysis Report")}
+
+        # **Recent News:**
+
+        {get_report(reports, "News Analysis Report")}
+        """
+
+        company_name = state["company_data"].name
+        current_date = get_current_date()
+        prompt = FUSED_LEAD_RESEARCH_REPORTS_PROMPT.format(
+            digital_presence_instructions=DIGITAL_PRESENCE_REPORT_PROMPT.format(
+                company_name=company_name, date=current_date
+            ),
+            global_report_instructions=GLOBAL_LEAD_RESEARCH_REPORT_PROMPT.format(
+                company_name=company_name, date=current_date
+            ),
         )
-        return {"reports": [global_research_report]}
+        return prompt, inputs
 
     @staticmethod
     def score_lead(state: GraphState):
@@ -414,13 +652,9 @@ class OutReachAutomationNodes:
         reports = state["reports"]
         global_research_report = get_report(reports, "Global Lead Analysis Report")
 
-        # Scoring lead
-        lead_score = invoke_llm(
-            system_prompt=SCORE_LEAD_PROMPT,
-            user_message=global_research_report,
-            model="gemini-2.5-pro",
-        )
-        return {"lead_score": lead_score.strip()}
+        # Scoring lead, together with other in-flight leads when micro-batching is enabled
+        lead_score = score_lead_report(state["current_lead"].id, global_research_report)
+        return {"lead_score": lead_score}
 
     @staticmethod
     def is_lead_qualified(state: GraphState):
@@ -467,7 +701,63 @@ class OutReachAutomationNodes:
         # get relevant case study
         case_study_report = fetch_similar_case_study(general_lead_search_report)
 
-        inputs = f"""
+        # Generate report
+        custom_outreach_report = invoke_llm(
+            **self._outreach_request(global_research_report, case_study_report)
+        )
+
+        # Insert and validate our website/case study links deterministically
+        revised_outreach_report, unresolved = rewrite_links(custom_outreach_report)
+
+        # Proof read generated report only when links/placeholders are left unresolved
+        proofread_request = self._proofread_request(revised_outreach_report, unresolved)
+        if proofread_request:
+            # Call our editor/proof-reader agent
+            revised_outreach_report, _ = rewrite_links(invoke_llm(**proofread_request))
+
+        # Store report into google docs and get shareable link
+        new_doc = self.docs_manager.add_document(**self._outreach_document(revised_outreach_report))
+        return self._outreach_links(new_doc)
+
+    def _outreach_request(self, global_research_report, case_study_report):
+        return {
+            "system_prompt": GENERATE_OUTREACH_REPORT_PROMPT,
+            "user_message": self._outreach_inputs(global_research_report, case_study_report),
+            "model": "gemini-2.5-pro",
+            "cache_prompt": True,
+            "stream": True,
+            "stream_label": "Outreach Report",
+        }
+
+    def _proofread_request(self, outreach_report, unresolved):
+        # None when the report doesn't need proof-reading
+        if not self._needs_proofreading(unresolved):
+            return None
+        if unresolved:
+            logger.info(f"Unresolved placeholders {unresolved}, proof-reading report")
+        return {
+            "system_prompt": PROOF_READER_PROMPT,
+            "user_message": self._proofread_inputs(outreach_report),
+            "model": "gemini-2.5-pro",
+        }
+
+    def _outreach_document(self, outreach_report):
+        return {
+            "content": outreach_report,
+            "doc_title": "Outreach Report",
+            "folder_name": self.drive_folder_name,
+            "make_shareable": True,
+            "folder_shareable": True,  # Set to false if only personal or true if with a team
+            "markdown": True,
+        }
+
+    @staticmethod
+    def _needs_proofreading(unresolved):
+        return OUTREACH_PROOFREAD == "always" or (unresolved and OUTREACH_PROOFREAD != "never")
+
+    @staticmethod
+    def _outreach_inputs(global_research_report, case_study_report):
+        return f"""
         **Research Report:**
 
         {global_research_report}
@@ -479,42 +769,20 @@ class OutReachAutomationNodes:
         {case_study_report}
         """
 
-        # Generate report
-        custom_outreach_report = invoke_llm(
-            system_prompt=GENERATE_OUTREACH_REPORT_PROMPT,
-            user_message=inputs,
-            model="gemini-2.5-pro",
-        )
-
-        # TODO Find better way to include correct links into the final report
-        # Proof read generated report
-        inputs = f"""
-        {custom_outreach_report}
+    @staticmethod
+    def _proofread_inputs(outreach_report):
+        return f"""
+            {outreach_report}
 
-        ---
+            ---
 
-        **Correct Links:**
+            **Correct Links:**
 
-        ** Our website link**: https://www.adople.com
-        ** Case study link**: https://www.adople.com/project.html/
-        """
-
-        # Call our editor/proof-reader agent
-        revised_outreach_report = invoke_llm(
-            system_prompt=PROOF_READER_PROMPT,
-            user_message=inputs,
-            model="gemini-2.5-pro",
-        )
+            {format_correct_links()}
+            """
 
-        # Store report into google docs and get shareable link
-        new_doc = self.docs_manager.add_document(
-            content=revised_outreach_report,
-            doc_title="Outreach Report",
-            folder_name=self.drive_folder_name,
-            make_shareable=True,
-            folder_shareable=True,  # Set to false if only personal or true if with a team
-            markdown=True,
-        )
+    @staticmethod
+    def _outreach_links(new_doc):
         if not new_doc:
             return {
                 "custom_outreach_report_link": None,
@@ -534,11 +802,22 @@ class OutReachAutomationNodes:
         """
         logger.info("----- Generating personalized email -----")
 
+        output = invoke_llm(
+            system_prompt=PERSONALIZE_EMAIL_PROMPT,
+            user_message=self._email_inputs(state),
+            model="gemini-2.5-pro",
+            response_format=EmailResponse,
+        )
+
+        return self._deliver_email(state, output)
+
+    @staticmethod
+    def _email_inputs(state):
         # Load reports
         reports = state["reports"]
         general_lead_search_report = get_report(reports, "General Lead Research Report")
 
-        lead_data = f"""
+        return f"""
         # **Lead & company Information:**
 
         {general_lead_search_report}
@@ -547,13 +826,9 @@ class OutReachAutomationNodes:
 
         {state["custom_outreach_report_link"]}
         """
-        output = invoke_llm(
-            system_prompt=PERSONALIZE_EMAIL_PROMPT,
-            user_message=lead_data,
-            model="gemini-2.5-pro",
-            response_format=EmailResponse,
-        )
 
+    @staticmethod
+    def _deliver_email(state, output):
         # Get relevant fields
         subject = output.subject
         personalized_email = output.email
@@ -561,18 +836,19 @@ class OutReachAutomationNodes:
         # Get lead email
         email = state["current_lead"].email
 
-        # Create draft email
-        gmail = GmailTools()
-        gmail.create_draft_email(
-            recipient=email, subject=subject, email_content=personalized_email
-        )
-
-        # Send email directly
-        if SEND_EMAIL_DIRECTLY:
-            gmail.send_email(
+        # Create draft email (not in offline runs, Gmail has no fake)
+        if CREATE_EMAIL_DRAFTS and not FAKE_TOOLS:
+            gmail = GmailTools()
+            gmail.create_draft_email(
                 recipient=email, subject=subject, email_content=personalized_email
             )
 
+            # Send email directly
+            if SEND_EMAIL_DIRECTLY:
+                gmail.send_email(
+                    recipient=email, subject=subject, email_content=personalized_email
+                )
+
         # Save email with reports for reference
         personalized_email_doc = Report(
             title="Personalized Email", content=personalized_email, is_markdown=False
@@ -593,7 +869,17 @@ class OutReachAutomationNodes:
             model="gemini-2.5-pro",
         )
 
-        inputs = f"""
+        # Generating interview script
+        interview_script = invoke_llm(
+            system_prompt=WRITE_INTERVIEW_SCRIPT_PROMPT,
+            user_message=self._interview_inputs(global_research_report, spin_questions),
+            model="gemini-2.5-pro",
+        )
+        return {"reports": [self._report("Interview Script", interview_script)]}
+
+    @staticmethod
+    def _interview_inputs(global_research_report, spin_questions):
+        return f"""
         # **Lead & company Information:**
 
         {global_research_report}
@@ -603,18 +889,40 @@ class OutReachAutomationNodes:
         {spin_questions}
         """
 
-        # Generating interview script
-        interview_script = invoke_llm(
-            system_prompt=WRITE_INTERVIEW_SCRIPT_PROMPT,
+    def generate_interview_script_fused(self, state: GraphState):
+        """
+        Fused variant of `generate_interview_script`: SPIN questions and the
+        interview script in a single LLM call.
+        """
+        logger.info("----- Generating interview script (fused) -----")
+
+        prompt, inputs = self._fused_interview_inputs(state)
+        output = invoke_llm(
+            system_prompt=prompt,
             user_message=inputs,
             model="gemini-2.5-pro",
+            response_format=InterviewPreparation,
+            cache_prompt=True,
         )
+        return {"reports": [self._report("Interview Script", output.interview_script)]}
 
-        interview_script_doc = Report(
-            title="Interview Script", content=interview_script, is_markdown=True
-        )
+    @staticmethod
+    def _fused_interview_inputs(state):
+        # Load reports
+        reports = state["reports"]
+        global_research_report = get_report(reports, "Global Lead Analysis Report")
+
+        inputs = f"""
+        # **Lead & company Information:**
 
-        return {"reports": [interview_script_doc]}
+        {global_research_report}
+        """
+
+        prompt = FUSED_INTERVIEW_SCRIPT_PROMPT.format(
+            spin_instructions=GENERATE_SPIN_QUESTIONS_PROMPT,
+            script_instructions=WRITE_INTERVIEW_SCRIPT_PROMPT,
+        )
+        return prompt, inputs
 
     @staticmethod
     def await_reports_creation(state: GraphState):
@@ -628,8 +936,41 @@ class OutReachAutomationNodes:
             return state
 
         # Load all reports
-        reports = state["reports"]
+        reports = self._unique_reports(state["reports"])
+
+        # Ensure reports are saved locally
+        save_reports_locally(reports)
+
+        # Save all reports to Google docs in the same per-lead folder
+        if SAVE_TO_GOOGLE_DOCS:
+            for report in reports:
+                # Skip creating a doc if one with the same title already exists
+                exists = self.docs_manager.document_exists_in_folder(current_folder, report.title)
+                if not self._skip_existing_document(report, exists):
+                    self.docs_manager.add_document(**self._report_document(report))
+
+        return state
 
+    def _skip_existing_document(self, report, exists):
+        if exists:
+            logger.info(
+                f"Document '{report.title}' already exists in "
+                f"folder '{self.drive_folder_name}', skipping."
+            )
+        return exists
+
+    def _report_document(self, report):
+        return {
+            "content": report.content,
+            "doc_title": report.title,
+            "folder_name": self.drive_folder_name,
+            "markdown": report.is_markdown,
+            "make_shareable": False,
+            "folder_shareable": True,
+        }
+
+    @staticmethod
+    def _unique_reports(reports):
         # Deduplicate reports by title so we don't keep trying to save / check
         # the same logical document many times in a single run.
         # This also avoids printing a long list of identical
@@ -642,33 +983,7 @@ class OutReachAutomationNodes:
             if title not in unique_reports_by_title:
                 unique_reports_by_title[title] = report
 
-        reports = list(unique_reports_by_title.values())
-
-        # Ensure reports are saved locally
-        save_reports_locally(reports)
-
-        # Save all reports to Google docs in the same per-lead folder
-        if SAVE_TO_GOOGLE_DOCS:
-            for report in reports:
-                # Skip creating a doc if one with the same title already exists
-                if self.docs_manager.document_exists_in_folder(
-                    current_folder, report.title
-                ):
-                    logger.info(
-                        f"Document '{report.title}' already exists in "
-                        f"folder '{current_folder}', skipping."
-                    )
-                    continue
-                self.docs_manager.add_document(
-                    content=report.content,
-                    doc_title=report.title,
-                    folder_name=self.drive_folder_name,
-                    markdown=report.is_markdown,
-                    make_shareable=False,
-                    folder_shareable=True,
-                )
-
-        return state
+        return list(unique_reports_by_title.values())
 
     def update_CRM(self, state: GraphState):
         logger.info("----- Updating CRM records -----")
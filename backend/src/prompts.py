@@ -17,6 +17,16 @@ If the link is relative (e.g., "/blog"), prepend it with {main_url} to form an a
 * Ensure the summary is organized in markdown format.
 """
 
+WEBSITE_SUMMARY_PROMPT = """
+The provided webpage content is scraped from: {main_url}.
+
+# Task
+Write a 500 words comprehensive summary in markdow format about the content of the webpage, focus on relevant information related to company mission, products and services.
+
+# IMPORTANT:
+* Ensure the summary is organized in markdown format.
+"""
+
 LEAD_SEARCH_REPORT_PROMPT = f"""
 # **Role:**
 
@@ -653,3 +663,74 @@ Our solutions free up your team to focus on core priorities, driving measurable
 - Ensure the conversation stays focused on their challenges and how Adople AI can provide tailored solutions.  
 - Emphasize measurable results and time-saving benefits. 
 """
+
+
+# Prompts of the fused graph variant: each one merges a chain of calls into
+# a single structured call. The original instructions are inserted as-is so
+# the outputs stay comparable with the standard graph.
+
+FUSED_COMPANY_RESEARCH_PROMPT = """
+You are given the lead's LinkedIn profile summary, the company's LinkedIn information and the scraped content of the company website ({main_url}).
+Complete the three tasks below in a single pass and return each result in its own field.
+
+---
+
+# Task 1: Extract the company links (fields `blog_url`, `youtube`, `twitter`, `facebook`)
+1. Blog URL: Extract the main blog URL of the company from the website content.
+2. Social Media Links: Extract links to the company's YouTube, Twitter, and Facebook profiles.
+If a link is not found, its value is an empty string.
+If the link is relative (e.g., "/blog"), prepend it with {main_url} to form an absolute URL.
+
+---
+
+# Task 2: Company profile (field `company_profile`)
+{profile_instructions}
+
+---
+
+# Task 3: General lead research report (field `lead_research_report`)
+Use the lead profile and the company profile you wrote in Task 2.
+{lead_report_instructions}
+"""
+
+FUSED_LEAD_RESEARCH_REPORTS_PROMPT = """
+You will write two reports in a single pass and return each one in its own field.
+
+---
+
+# Task 1: Digital presence report (field `digital_presence_report`)
+Use the digital presence data (blog, social media and news analyses) provided.
+{digital_presence_instructions}
+
+---
+
+# Task 2: Global lead research report (field `global_research_report`)
+Use the lead & company information provided and the digital presence report you wrote in Task 1 as the digital presence information.
+{global_report_instructions}
+"""
+
+FUSED_INTERVIEW_SCRIPT_PROMPT = """
+You will prepare a discovery call in a single pass and return each result in its own field.
+
+---
+
+# Task 1: SPIN questions (field `spin_questions`)
+{spin_instructions}
+
+---
+
+# Task 2: Interview script (field `interview_script`)
+Use the lead & company information provided and the SPIN questions you wrote in Task 1.
+{script_instructions}
+"""
+
+BATCH_SCORE_LEAD_PROMPT = """
+You will score several leads in a single pass. The input contains one lead analysis report per lead, each under a `# Lead: <lead id>` heading.
+
+Score every lead independently, using only its own report, with the instructions below.
+Ignore their output format: return one entry per lead in the `scores` field, with the `lead_id` exactly as given in its heading and the final average `score` as a number.
+
+---
+
+{scoring_instructions}
+"""
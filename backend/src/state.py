@@ -65,6 +65,9 @@ class CompanyData(BaseModel):
     profile: str = ""
     website: str = ""
     social_media_links: SocialMediaLinks = SocialMediaLinks()
+    # Pages crawled from the website: {kind: {"url", "markdown"}}, kind being
+    # home, blog, about or products
+    website_pages: dict = {}
 
 
 class GraphInputState(TypedDict):
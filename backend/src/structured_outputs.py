@@ -1,3 +1,4 @@
+from typing import List
 from pydantic import BaseModel, Field
 
 
@@ -11,3 +12,31 @@ class WebsiteData(BaseModel):
 class EmailResponse(BaseModel):
     subject: str = Field(description="An engaging subject line to encourage the lead to open the email.")
     email: str = Field(description="The personalized email content tailored to the lead’s profile and company information.")
+
+
+class CompanyResearch(BaseModel):
+    blog_url: str = Field(description="The main blog URL of the company.")
+    youtube: str = Field(description="The company's YouTube profile link.")
+    twitter: str = Field(description="The company's Twitter profile link.")
+    facebook: str = Field(description="The company's Facebook profile link.")
+    company_profile: str = Field(description="The company profile summary.")
+    lead_research_report: str = Field(description="The general lead research report in markdown.")
+
+
+class LeadResearchReports(BaseModel):
+    digital_presence_report: str = Field(description="The digital presence report in markdown.")
+    global_research_report: str = Field(description="The global lead research report in markdown.")
+
+
+class InterviewPreparation(BaseModel):
+    spin_questions: str = Field(description="The SPIN selling questions.")
+    interview_script: str = Field(description="The interview script in markdown.")
+
+
+class LeadScore(BaseModel):
+    lead_id: str = Field(description="The id of the lead, exactly as given in the input.")
+    score: float = Field(description="The average score of the lead (1-10).")
+
+
+class LeadScores(BaseModel):
+    scores: List[LeadScore] = Field(description="One score per lead of the input.")
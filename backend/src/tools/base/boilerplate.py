@@ -0,0 +1,143 @@
+import os
+import re
+import math
+import logging
+import threading
+from collections import Counter, OrderedDict
+from urllib.parse import urlparse
+from src.usage import record_usage
+from src.llm.rate_limiter import estimate_tokens
+from .markdown_scraper_tool import host_domain
+
+logger = logging.getLogger(__name__)
+
+# Strip the blocks repeated across the pages of a website (header menus,
+# cookie banners, footer link lists) from the markdown sent to the LLM
+BOILERPLATE_STRIPPING = os.getenv("BOILERPLATE_STRIPPING", "true").lower() in ("1", "true", "yes")
+# A block is part of the site template when found on this share of its pages (2 at least)
+BOILERPLATE_MIN_SHARE = float(os.getenv("BOILERPLATE_MIN_SHARE", "0.6"))
+# Pages left with less content than this once stripped are kept whole
+# (e.g. a blog URL redirecting to the home page, a thin about page)
+BOILERPLATE_MIN_CONTENT_CHARS = int(os.getenv("BOILERPLATE_MIN_CONTENT_CHARS", "200"))
+# Websites whose template is remembered for later scrapes
+BOILERPLATE_MAX_SITES = int(os.getenv("BOILERPLATE_MAX_SITES", "1000"))
+
+BLOCK_SEPARATOR = re.compile(r"\n{2,}")
+DIGITS_PATTERN = re.compile(r"\d+")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def _blocks(markdown):
+    return [block for block in BLOCK_SEPARATOR.split(markdown or "") if block.strip()]
+
+
+def _fingerprint(block):
+    # Numbers (years, counters, prices) don't make a block different
+    return hash(WHITESPACE_PATTERN.sub(" ", DIGITS_PATTERN.sub("0", block.lower())).strip())
+
+
+class SiteTemplates:
+    """
+    Fingerprints of the template blocks of each website, learned from pages
+    of the same domain fetched together (the website crawl).
+    """
+
+    def __init__(self, max_sites=None):
+        self.max_sites = max_sites or BOILERPLATE_MAX_SITES
+        self.templates = OrderedDict()
+        self.lock = threading.Lock()
+
+    def learn(self, domain, markdowns):
+        markdowns = [markdown for markdown in markdowns if markdown]
+        if len(markdowns) < 2:
+            return self.get(domain)
+        counts = Counter()
+        for markdown in markdowns:
+            counts.update({_fingerprint(block) for block in _blocks(markdown)})
+        needed = max(2, math.ceil(BOILERPLATE_MIN_SHARE * len(markdowns)))
+        template = {fingerprint for fingerprint, count in counts.items() if count >= needed}
+        with self.lock:
+            self.templates[domain] = template
+            self.templates.move_to_end(domain)
+            while len(self.templates) > self.max_sites:
+                self.templates.popitem(last=False)
+        return template
+
+    def get(self, domain):
+        with self.lock:
+            template = self.templates.get(domain)
+            if template is not None:
+                self.templates.move_to_end(domain)
+            return template or set()
+
+
+site_templates = SiteTemplates()
+
+
+def _strip(markdown, template):
+    """
+    Remove the template blocks leading & trailing the page content. Blocks
+    repeated in the middle (e.g. blog teasers on the home page) are kept.
+    Returns the stripped markdown and the removed blocks; pages that would
+    be left (almost) empty are returned unchanged.
+    """
+    blocks = _blocks(markdown)
+    start, end = 0, len(blocks)
+    while start < end and _fingerprint(blocks[start]) in template:
+        start += 1
+    while end > start and _fingerprint(blocks[end - 1]) in template:
+        end -= 1
+    if start == 0 and end == len(blocks):
+        return markdown, ""
+    content = "\n\n".join(blocks[start:end])
+    if len(content.strip()) < BOILERPLATE_MIN_CONTENT_CHARS:
+        return markdown, ""
+    return content, "\n\n".join(blocks[:start] + blocks[end:])
+
+
+def _record(url, removed_tokens, total_tokens):
+    if removed_tokens:
+        logger.info(
+            f"Stripped ~{removed_tokens} tokens of site boilerplate from {url} "
+            f"(-{100 * removed_tokens / max(total_tokens, 1):.0f}%)"
+        )
+    record_usage("boilerplate_stripping", saved_tokens=removed_tokens)
+
+
+def strip_boilerplate(url, markdown):
+    """
+    Strip the template of the website (learned by `strip_site_pages`) from
+    a page scraped on its own.
+    """
+    if not BOILERPLATE_STRIPPING or not markdown:
+        return markdown
+    template = site_templates.get(host_domain(urlparse(url).netloc))
+    if not template:
+        return markdown
+    stripped, removed = _strip(markdown, template)
+    _record(url, estimate_tokens(removed), estimate_tokens(markdown))
+    return stripped
+
+
+def strip_site_pages(home_url, pages):
+    """
+    Learn the template of a website from its crawled pages ({kind: {"url",
+    "markdown"}}) and strip it from all of them but the home page, which
+    keeps one copy of the shared blocks.
+    """
+    if not BOILERPLATE_STRIPPING:
+        return pages
+    template = site_templates.learn(
+        host_domain(urlparse(home_url).netloc), [page["markdown"] for page in pages.values()]
+    )
+    if not template:
+        return pages
+    removed_tokens = total_tokens = 0
+    for kind, page in pages.items():
+        if kind == "home":
+            continue
+        total_tokens += estimate_tokens(page["markdown"])
+        page["markdown"], removed = _strip(page["markdown"], template)
+        removed_tokens += estimate_tokens(removed)
+    _record(home_url, removed_tokens, total_tokens)
+    return pages
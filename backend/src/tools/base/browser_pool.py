@@ -0,0 +1,191 @@
+import os
+import time
+import queue
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Render client-side (JavaScript) websites in headless Chromium when their
+# static HTML has too little text. Needs selenium & chromium + chromedriver
+# (installed by the Dockerfile)
+JS_RENDERING = os.getenv("JS_RENDERING", "false").lower() in ("1", "true", "yes")
+# Static pages with less markdown than this are rendered
+JS_RENDER_MIN_CHARS = int(os.getenv("JS_RENDER_MIN_CHARS", "500"))
+# Browsers kept warm, i.e. pages rendered at once
+JS_RENDER_POOL_SIZE = int(os.getenv("JS_RENDER_POOL_SIZE", "2"))
+JS_RENDER_PAGE_TIMEOUT_SECONDS = float(os.getenv("JS_RENDER_PAGE_TIMEOUT_SECONDS", "20"))
+# After the load event, longest wait for the app to render its text
+JS_RENDER_SETTLE_SECONDS = float(os.getenv("JS_RENDER_SETTLE_SECONDS", "3"))
+# Longest wait for a free browser before giving up on rendering
+JS_RENDER_QUEUE_TIMEOUT_SECONDS = float(os.getenv("JS_RENDER_QUEUE_TIMEOUT_SECONDS", "60"))
+# Browsers are relaunched after this many pages (memory growth)
+JS_RENDER_PAGES_PER_BROWSER = int(os.getenv("JS_RENDER_PAGES_PER_BROWSER", "50"))
+CHROMIUM_PATH = os.getenv("CHROMIUM_PATH", "/usr/bin/chromium")
+CHROMEDRIVER_PATH = os.getenv("CHROMEDRIVER_PATH", "/usr/bin/chromedriver")
+
+# Not needed to render the text of a page
+BLOCKED_RESOURCES = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3",
+]
+
+
+class Browser:
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception as e:
+            logger.debug(f"Could not quit the browser: {e}")
+
+
+class BrowserPool:
+    """
+    Warm pool of headless Chromium browsers reused across pages and leads:
+    each render takes a browser from the pool (at most `size` pages render at
+    once), loads the page with images, fonts & media blocked and gives the
+    browser back. Browsers that fail are dropped and relaunched on demand.
+    """
+
+    def __init__(self, size=None, enabled=None):
+        self.size = size or JS_RENDER_POOL_SIZE
+        self.enabled = JS_RENDERING if enabled is None else enabled
+        self.idle = queue.LifoQueue()
+        self.launched = 0
+        self.lock = threading.Lock()
+
+    def _launch(self):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+
+        options = webdriver.ChromeOptions()
+        options.binary_location = CHROMIUM_PATH
+        for argument in (
+            "--headless=new",
+            "--no-sandbox",
+            "--disable-dev-shm-usage",
+            "--disable-gpu",
+            "--disable-extensions",
+            "--blink-settings=imagesEnabled=false",
+        ):
+            options.add_argument(argument)
+        driver = webdriver.Chrome(service=Service(CHROMEDRIVER_PATH), options=options)
+        driver.set_page_load_timeout(JS_RENDER_PAGE_TIMEOUT_SECONDS)
+        driver.set_script_timeout(JS_RENDER_PAGE_TIMEOUT_SECONDS)
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_RESOURCES})
+        return Browser(driver)
+
+    def _acquire(self):
+        # An idle browser, a new one while under the pool size, else wait
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            launch = self.launched < self.size
+            if launch:
+                self.launched += 1
+        if launch:
+            try:
+                return self._launch()
+            except Exception:
+                with self.lock:
+                    self.launched -= 1
+                raise
+        return self.idle.get(timeout=JS_RENDER_QUEUE_TIMEOUT_SECONDS)
+
+    def _release(self, browser, healthy):
+        if healthy and browser.pages < JS_RENDER_PAGES_PER_BROWSER:
+            self.idle.put(browser)
+            return
+        browser.quit()
+        with self.lock:
+            self.launched -= 1
+
+    def warm(self):
+        """
+        Launch the browsers ahead of the first render (e.g. on server startup).
+        """
+        if not self.enabled:
+            return
+        browsers = []
+        try:
+            while len(browsers) < self.size:
+                browsers.append(self._acquire())
+        except Exception as e:
+            logger.warning(f"Could not start the headless browsers: {e}")
+        for browser in browsers:
+            self._release(browser, True)
+        logger.info(f"{len(browsers)} headless browsers ready for JS rendering")
+
+    @staticmethod
+    def _wait_for_text(driver):
+        deadline = time.monotonic() + JS_RENDER_SETTLE_SECONDS
+        while time.monotonic() < deadline:
+            length = driver.execute_script(
+                "return document.body ? document.body.innerText.length : 0"
+            )
+            if length >= JS_RENDER_MIN_CHARS:
+                return
+            time.sleep(0.2)
+
+    def render(self, url):
+        """
+        HTML of the page once rendered by its JavaScript, None when rendering
+        is disabled or fails (the static HTML is kept).
+        """
+        if not self.enabled:
+            return None
+        started_at = time.monotonic()
+        try:
+            browser = self._acquire()
+        except ImportError:
+            logger.warning("JS_RENDERING is enabled but selenium is missing, pages are not rendered")
+            self.enabled = False
+            return None
+        except Exception as e:
+            logger.warning(f"No headless browser to render {url}: {e}")
+            return None
+        healthy = True
+        try:
+            browser.pages += 1
+            browser.driver.get(url)
+            self._wait_for_text(browser.driver)
+            html = browser.driver.page_source
+            logger.info(f"Rendered {url} in {time.monotonic() - started_at:.1f}s")
+            return html
+        except Exception as e:
+            # Timeouts leave the tab loading: the browser is not reused
+            healthy = False
+            logger.warning(f"Could not render {url}: {e}")
+            return None
+        finally:
+            if healthy:
+                try:
+                    # Leave a blank, cookie-free tab for the next page
+                    browser.driver.delete_all_cookies()
+                    browser.driver.get("about:blank")
+                except Exception:
+                    healthy = False
+            self._release(browser, healthy)
+
+    def close(self):
+        while True:
+            try:
+                browser = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            self._release(browser, False)
+
+
+browser_pool = BrowserPool()
+
+
+def needs_rendering(markdown):
+    return browser_pool.enabled and len(markdown) < JS_RENDER_MIN_CHARS
@@ -0,0 +1,275 @@
+import os
+import re
+import asyncio
+import logging
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from src.utils import invoke_llm, ainvoke_llm
+from src.usage import record_usage
+from src.llm.rate_limiter import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Token budgets of the scraped content sent to the LLM per prompt
+WEBSITE_CONTENT_TOKEN_BUDGET = int(os.getenv("WEBSITE_CONTENT_TOKEN_BUDGET", "8000"))
+BLOG_CONTENT_TOKEN_BUDGET = int(os.getenv("BLOG_CONTENT_TOKEN_BUDGET", "8000"))
+# Size of the chunks summarized separately when content is still over budget
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "6000"))
+# Chunks summarized at once
+SUMMARY_MAX_CONCURRENCY = 8
+# Rounds summarizing the joined summaries again while they're over budget
+SUMMARY_REDUCE_ROUNDS = 3
+# Smallest share of the budget asked for a chunk summary
+SUMMARY_MIN_TOKENS = 200
+SUMMARY_MODEL = os.getenv("SUMMARY_MODEL", "gemini-2.5-flash")
+
+# Links that must survive link-list collapsing (they are extracted by the LLM)
+IMPORTANT_LINK_PATTERN = re.compile(
+    r"blog|news|insights|articles|youtube\.com|youtu\.be|twitter\.com|x\.com|facebook\.com|linkedin\.com",
+    re.IGNORECASE,
+)
+MARKDOWN_LINK_PATTERN = re.compile(r"!?\[([^\]]*)\]\(([^)\s]*)[^)]*\)")
+# Minimum number of consecutive link-only lines considered as a link list (menus, footers)
+MIN_LINK_LIST_LINES = 4
+
+SUMMARIZE_CHUNK_PROMPT = """
+You are condensing one part of a scraped web page so it can be analyzed later.
+
+# Instructions
+- Keep every fact about the company: mission, products, services, customers, locations, dates, numbers.
+- Keep verbatim every URL pointing to a blog, news page or social media profile (YouTube, Twitter/X, Facebook, LinkedIn).
+- Drop navigation menus, cookie notices, legal text and repeated boilerplate.
+- Output concise markdown, no preamble.
+"""
+
+MERGE_SUMMARIES_PROMPT = """
+You are merging the summaries of consecutive parts of a scraped web page into one shorter summary.
+
+# Instructions
+- Keep every fact about the company: mission, products, services, customers, locations, dates, numbers.
+- Keep verbatim every URL pointing to a blog, news page or social media profile (YouTube, Twitter/X, Facebook, LinkedIn).
+- Merge facts repeated across the summaries.
+- Output concise markdown, no preamble.
+"""
+
+SUMMARY_LENGTH_INSTRUCTION = "\n- Keep the output under {words} words.\n"
+
+
+def _is_link_only_line(line):
+    stripped = line.strip().lstrip("*-+ ").strip()
+    if not stripped:
+        return False
+    remainder = MARKDOWN_LINK_PATTERN.sub("", stripped).strip(" |•·-")
+    return stripped != remainder and not remainder
+
+
+def collapse_link_lists(markdown):
+    """
+    Collapse runs of link-only lines (menus, footers, link lists) into a single
+    line of link texts, keeping blog/news/social links intact.
+    """
+    lines = markdown.split("\n")
+    output, run = [], []
+
+    def flush_run():
+        if len(run) < MIN_LINK_LIST_LINES:
+            output.extend(run)
+        else:
+            texts, kept = [], []
+            for line in run:
+                for text, url in MARKDOWN_LINK_PATTERN.findall(line):
+                    if IMPORTANT_LINK_PATTERN.search(url):
+                        kept.append(f"[{text.strip()}]({url})")
+                    elif text.strip():
+                        texts.append(text.strip())
+            if texts:
+                output.append("Links: " + " | ".join(dict.fromkeys(texts)))
+            output.extend(dict.fromkeys(kept))
+            output.append("")
+        run.clear()
+
+    for line in lines:
+        if _is_link_only_line(line):
+            run.append(line)
+            continue
+        # Blank lines inside a link list don't end it
+        if not line.strip() and run:
+            continue
+        flush_run()
+        output.append(line)
+    flush_run()
+    return "\n".join(output)
+
+
+def remove_repeated_blocks(markdown):
+    """
+    Remove paragraphs that are exact (whitespace-insensitive) repeats of an earlier one.
+    """
+    seen = set()
+    blocks = []
+    for block in re.split(r"\n\s*\n", markdown):
+        key = re.sub(r"\s+", " ", block).strip().lower()
+        if not key:
+            continue
+        if key in seen:
+            continue
+        seen.add(key)
+        blocks.append(block.strip("\n"))
+    return "\n\n".join(blocks)
+
+
+def split_into_chunks(text, chunk_tokens):
+    """
+    Split text into chunks of about `chunk_tokens` tokens on paragraph boundaries.
+    """
+    max_chars = chunk_tokens * 4
+    chunks, current = [], ""
+    for block in text.split("\n\n"):
+        while len(block) > max_chars:
+            chunks.append(block[:max_chars])
+            block = block[max_chars:]
+        if current and len(current) + len(block) + 2 > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{block}" if current else block
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _summary_requests(chunks, prompt, token_budget):
+    # Each chunk gets an equal share of the budget
+    target_tokens = max(SUMMARY_MIN_TOKENS, token_budget // len(chunks))
+    system_prompt = prompt + SUMMARY_LENGTH_INSTRUCTION.format(words=target_tokens * 3 // 4)
+    return [
+        {"system_prompt": system_prompt, "user_message": chunk, "model": SUMMARY_MODEL}
+        for chunk in chunks
+    ]
+
+
+def _reduce_step(summaries, token_budget):
+    """
+    Joined summaries within the budget, else the chunks of the joined
+    summaries to merge in the next round.
+    """
+    summary = "\n\n".join(summaries)
+    if estimate_tokens(summary) <= token_budget:
+        return summary, None
+    return None, split_into_chunks(summary, SUMMARY_CHUNK_TOKENS)
+
+
+def _fit_summaries(summaries, token_budget):
+    summary = "\n\n".join(summaries)
+    if estimate_tokens(summary) <= token_budget:
+        return summary
+    # Last resort when the LLM keeps exceeding its share: every summary is cut
+    # to its share of the budget, so the later parts of the page aren't lost
+    share = (token_budget * 4 - 2 * (len(summaries) - 1)) // len(summaries)
+    return "\n\n".join(summary[:share].rstrip() for summary in summaries)
+
+
+def summarize_chunks(text, token_budget):
+    """
+    Map-reduce summarization: the chunks are summarized concurrently, each
+    within its share of the token budget. While the joined summaries are over
+    budget they are merged by summarizing them again (reduce rounds).
+    """
+    chunks = split_into_chunks(text, SUMMARY_CHUNK_TOKENS)
+
+    def summarize_all(chunks, prompt):
+        requests = _summary_requests(chunks, prompt, token_budget)
+        with ThreadPoolExecutor(max_workers=min(SUMMARY_MAX_CONCURRENCY, len(requests))) as executor:
+            # Copy the context per chunk so usage stays attributed to the current node/lead
+            futures = [
+                executor.submit(contextvars.copy_context().run, invoke_llm, **request)
+                for request in requests
+            ]
+            return [future.result() for future in futures]
+
+    summaries = summarize_all(chunks, SUMMARIZE_CHUNK_PROMPT)
+    for _ in range(SUMMARY_REDUCE_ROUNDS):
+        summary, chunks = _reduce_step(summaries, token_budget)
+        if summary is not None:
+            return summary
+        summaries = summarize_all(chunks, MERGE_SUMMARIES_PROMPT)
+    return _fit_summaries(summaries, token_budget)
+
+
+async def asummarize_chunks(text, token_budget):
+    """
+    Async version of `summarize_chunks`, the chunks summarized concurrently
+    on the running event loop.
+    """
+    chunks = split_into_chunks(text, SUMMARY_CHUNK_TOKENS)
+    semaphore = asyncio.Semaphore(SUMMARY_MAX_CONCURRENCY)
+
+    async def summarize(request):
+        async with semaphore:
+            return await ainvoke_llm(**request)
+
+    async def summarize_all(chunks, prompt):
+        # Tasks copy the current context, usage stays attributed to the node/lead
+        requests = _summary_requests(chunks, prompt, token_budget)
+        return await asyncio.gather(*(summarize(request) for request in requests))
+
+    summaries = await summarize_all(chunks, SUMMARIZE_CHUNK_PROMPT)
+    for _ in range(SUMMARY_REDUCE_ROUNDS):
+        summary, chunks = _reduce_step(summaries, token_budget)
+        if summary is not None:
+            return summary
+        summaries = await summarize_all(chunks, MERGE_SUMMARIES_PROMPT)
+    return _fit_summaries(summaries, token_budget)
+
+
+def _record_reduction(label, original_tokens, reduced):
+    reduced_tokens = estimate_tokens(reduced)
+    saved_tokens = max(0, original_tokens - reduced_tokens)
+    if original_tokens:
+        logger.info(
+            f"Reduced {label} from ~{original_tokens} to ~{reduced_tokens} tokens "
+            f"(-{100 * saved_tokens / original_tokens:.0f}%)"
+        )
+    record_usage("content_reduction", saved_tokens=saved_tokens)
+
+
+def reduce_content(content, token_budget, label="content"):
+    """
+    Shrink scraped markdown before sending it to the LLM: collapse link lists,
+    drop repeated blocks and, when still over the token budget, summarize it
+    chunk by chunk. Logs and records the measured token reduction.
+    """
+    if not content:
+        return content
+    original_tokens = estimate_tokens(content)
+
+    reduced = remove_repeated_blocks(collapse_link_lists(content))
+    if estimate_tokens(reduced) > token_budget:
+        try:
+            reduced = summarize_chunks(reduced, token_budget)
+        except Exception as e:
+            logger.warning(f"Could not summarize {label}, truncating it instead: {e}")
+            reduced = reduced[: token_budget * 4]
+
+    _record_reduction(label, original_tokens, reduced)
+    return reduced
+
+
+async def areduce_content(content, token_budget, label="content"):
+    """
+    Async version of `reduce_content`: the summaries are awaited instead of
+    blocking the event loop.
+    """
+    if not content:
+        return content
+    original_tokens = estimate_tokens(content)
+
+    reduced = remove_repeated_blocks(collapse_link_lists(content))
+    if estimate_tokens(reduced) > token_budget:
+        try:
+            reduced = await asummarize_chunks(reduced, token_budget)
+        except Exception as e:
+            logger.warning(f"Could not summarize {label}, truncating it instead: {e}")
+            reduced = reduced[: token_budget * 4]
+
+    _record_reduction(label, original_tokens, reduced)
+    return reduced
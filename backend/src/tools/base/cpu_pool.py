@@ -0,0 +1,60 @@
+import os
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+# Worker processes of the CPU-bound work (HTML parsing & conversion), so it
+# scales across cores instead of serializing the lead threads on the GIL.
+# One per core by default, 0 (the default on a single core) runs everything
+# in the calling thread
+_cores = os.cpu_count() or 1
+CPU_POOL_PROCESSES = int(os.getenv("CPU_POOL_PROCESSES", str(_cores if _cores > 1 else 0)))
+# Smaller inputs (in characters of decoded text) are processed in the calling
+# thread, cheaper than the IPC
+CPU_POOL_MIN_CHARS = int(os.getenv("CPU_POOL_MIN_CHARS", "50000"))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned workers don't inherit the threads, locks & sockets of the app.
+            # They re-import the main script: it must keep its heavy imports lazy
+            # (see server.py), servers started with `uvicorn server:app` aren't affected
+            _pool = ProcessPoolExecutor(
+                max_workers=CPU_POOL_PROCESSES, mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(f"Started {CPU_POOL_PROCESSES} worker processes for CPU-bound work")
+        return _pool
+
+
+def run_cpu_bound(fn, data, *args):
+    """
+    Run `fn(data, *args)` in the worker processes when `data` (a string) is
+    large enough, else in the calling thread. `fn` must be a module-level function
+    and its arguments & result picklable.
+    """
+    if CPU_POOL_PROCESSES <= 0 or len(data) < CPU_POOL_MIN_CHARS:
+        return fn(data, *args)
+    try:
+        return _get_pool().submit(fn, data, *args).result()
+    except BrokenProcessPool:
+        # A worker died (e.g. out of memory): start a new pool next time
+        logger.warning("The worker process pool broke, restarting it")
+        shutdown_cpu_pool()
+        return fn(data, *args)
+
+
+def shutdown_cpu_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
@@ -0,0 +1,310 @@
+import os
+import re
+import glob
+import json
+import hashlib
+import httpx
+
+# The tools answer with offline fixtures instead of calling Serper, RapidAPI,
+# the company websites, YouTube and the case study embeddings. On by default
+# with the fake LLM provider, so the whole graph runs with no network
+FAKE_TOOLS = os.getenv(
+    "FAKE_TOOLS", str(os.getenv("LLM_PROVIDER", "google") == "fake")
+).lower() in ("1", "true", "yes")
+
+SERPER_HOST = "google.serper.dev"
+RAPIDAPI_HOST = "fresh-linkedin-profile-data.p.rapidapi.com"
+CASE_STUDIES_PATH = "data/case_studies"
+
+if FAKE_TOOLS:
+    # The tools skip or fail their calls without API keys, the fake transport ignores them
+    for key in ("SERPER_API_KEY", "RAPIDAPI_KEY", "YOUTUBE_API_KEY"):
+        os.environ.setdefault(key, "fake")
+
+# Email domain of the fake profiles found by the searches, their LinkedIn data
+# points to the same company website
+_profile_domains = {}
+
+
+def _words(text):
+    return re.findall(r"[a-z0-9]+", (text or "").lower())
+
+
+def _seed(text):
+    return int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:8], 16)
+
+
+def _host(domain):
+    domain = domain.lower().split("@")[-1].strip("/ ")
+    return domain[4:] if domain.startswith("www.") else domain
+
+
+def _company_name(domain):
+    # "acme-corp.co.uk" -> "Acme Corp"
+    label = _host(domain).split(".")[0] or "example"
+    return " ".join(word.capitalize() for word in re.split(r"[-_]+", label) if word)
+
+
+def _company_token(domain):
+    return re.sub(r"[^a-z0-9-]", "", _host(domain).split(".")[0]) or "example"
+
+
+def fake_search_results(query):
+    """
+    Organic results of a Serper search, the lead profile first for the
+    "LinkedIn <lead name> <email domain>" searches of the lead research.
+    """
+    words = query.split()
+    if len(words) >= 3 and words[0].lower() == "linkedin" and "." in words[-1]:
+        name, domain = " ".join(words[1:-1]), _host(words[-1])
+    else:
+        name, domain = " ".join(words) or "Jane Doe", "example.com"
+    company = _company_name(domain)
+    slug = "-".join(_words(name)) or "jane-doe"
+    profile_url = f"https://www.linkedin.com/in/{slug}"
+    _profile_domains[profile_url] = domain
+    return [
+        {
+            "title": f"{name} - Head of Operations - {company} | LinkedIn",
+            "link": profile_url,
+            "snippet": f"{name} leads operations at {company}. Experience: {company}.",
+            "position": 1,
+        },
+        {
+            "title": f"{company} | LinkedIn",
+            "link": f"https://www.linkedin.com/company/{_company_token(domain)}",
+            "snippet": f"{company} helps businesses grow with data and automation.",
+            "position": 2,
+        },
+        {
+            "title": f"{company} - Official website",
+            "link": f"https://{domain}/",
+            "snippet": f"{company} builds software for modern teams.",
+            "position": 3,
+        },
+    ]
+
+
+def fake_news(query):
+    """
+    Serper news results about the company.
+    """
+    company = _company_name(query) if "." in query else query.strip() or "Example"
+    slug = "-".join(_words(company)) or "example"
+    return [
+        {
+            "title": f"{company} {title}",
+            "snippet": f"{company} {snippet}",
+            "date": f"{months} months ago",
+            "link": f"https://news.example.com/{slug}-{index}",
+        }
+        for index, (title, snippet, months) in enumerate(
+            [
+                ("raises Series B to expand its platform", "announced new funding to grow its team.", 2),
+                ("launches an AI assistant for customers", "released a new product for its clients.", 5),
+                ("opens a new office in Europe", "expands its operations to new markets.", 9),
+            ],
+            start=1,
+        )
+    ]
+
+
+def fake_lead_profile(linkedin_url):
+    """
+    `data` of the RapidAPI enrich-lead response for the profile URL.
+    """
+    url = linkedin_url.split("?")[0].rstrip("/")
+    slug = url.rsplit("/", 1)[-1] or "jane-doe"
+    domain = _profile_domains.get(url, "example.com")
+    company = _company_name(domain)
+    full_name = " ".join(word.capitalize() for word in _words(slug)) or "Jane Doe"
+    return {
+        "full_name": full_name,
+        "about": f"Operations leader at {company}, focused on scaling teams with automation and data.",
+        "location": "London, United Kingdom",
+        "city": "London",
+        "country": "United Kingdom",
+        "skills": "Operations|Automation|Team Leadership|Data Analysis",
+        "company": company,
+        "company_industry": "Software Development",
+        "company_website": f"https://{domain}",
+        "company_linkedin_url": f"https://www.linkedin.com/company/{_company_token(domain)}",
+        "current_company_join_month": 3,
+        "current_company_join_year": 2021,
+        "experiences": [
+            {
+                "company": company,
+                "title": "Head of Operations",
+                "date_range": "Mar 2021 - Present",
+                "is_current": True,
+                "location": "London, United Kingdom",
+                "description": "Runs customer operations and the automation roadmap.",
+            },
+            {
+                "company": "Northwind Consulting",
+                "title": "Operations Manager",
+                "date_range": "Jan 2017 - Feb 2021",
+                "is_current": False,
+                "location": "Manchester, United Kingdom",
+                "description": "Streamlined back-office processes for retail clients.",
+            },
+        ],
+        "educations": [
+            {
+                "school": "University of Leeds",
+                "field_of_study": "Business Management",
+                "degree": "BSc",
+                "date_range": "2010 - 2013",
+            }
+        ],
+    }
+
+
+def fake_company_profile(linkedin_url):
+    """
+    RapidAPI company response for the company LinkedIn URL.
+    """
+    token = linkedin_url.split("?")[0].rstrip("/").rsplit("/", 1)[-1] or "example"
+    company = _company_name(token)
+    return {
+        "company_name": company,
+        "description": (
+            f"{company} builds software that helps businesses automate their operations, "
+            "understand their customers and grow revenue."
+        ),
+        "year_founded": 2012 + _seed(token) % 10,
+        "industries": ["Software Development"],
+        "specialties": "Automation, Analytics, Customer Engagement",
+        "employee_count": 50 + _seed(token) % 450,
+        "follower_count": 1000 + _seed(token) % 20000,
+        "locations": [{"city": "London", "country": "GB", "is_headquarter": True}],
+    }
+
+
+WEBSITE_PAGES = {
+    "/": "Home",
+    "/about": "About us",
+    "/products": "Products",
+    "/blog": "Blog",
+    "/blog/automation-playbook": "The automation playbook",
+    "/blog/customer-insights": "Turning data into customer insights",
+}
+
+
+def _website_html(domain, path):
+    company = _company_name(domain)
+    token = _company_token(domain)
+    title = WEBSITE_PAGES[path]
+    navigation = "".join(
+        f'<li><a href="{page}">{label}</a></li>'
+        for page, label in WEBSITE_PAGES.items()
+        if page.count("/") == 1
+    )
+    paragraphs = [
+        f"{company} builds software that helps businesses automate their operations, "
+        "understand their customers and grow revenue. Teams use our platform to connect "
+        "their data, automate repetitive work and focus on the customers that matter.",
+        f"Founded to make automation accessible, {company} serves hundreds of companies "
+        "in retail, finance and healthcare across Europe and North America.",
+        "Our products cover workflow automation, customer analytics and engagement "
+        "campaigns, with integrations for the tools sales and support teams already use.",
+    ]
+    if path == "/blog":
+        paragraphs = [
+            f'<a href="{page}">{label}</a>: insights from the {company} team.'
+            for page, label in WEBSITE_PAGES.items()
+            if page.startswith("/blog/")
+        ] + paragraphs[:1]
+    body = "".join(f"<p>{paragraph}</p>" for paragraph in paragraphs)
+    return (
+        f"<html><head><title>{title} | {company}</title></head><body>"
+        f"<nav><ul>{navigation}</ul></nav>"
+        f"<main><h1>{title}</h1>{body}</main>"
+        "<footer>"
+        f'<a href="https://www.youtube.com/@{token}">YouTube</a> '
+        f'<a href="https://twitter.com/{token}">Twitter</a> '
+        f'<a href="https://www.facebook.com/{token}">Facebook</a> '
+        f'<a href="https://www.linkedin.com/company/{token}">LinkedIn</a>'
+        "</footer></body></html>"
+    )
+
+
+def _website_response(url):
+    path = url.path.rstrip("/") or "/"
+    # Fake pages must not end up in the HTTP cache of the real runs
+    headers = {"Cache-Control": "no-store"}
+    if path == "/sitemap.xml":
+        locations = "".join(
+            f"<url><loc>{url.scheme}://{url.host}{page}</loc></url>" for page in WEBSITE_PAGES
+        )
+        return httpx.Response(
+            200,
+            headers={**headers, "Content-Type": "application/xml"},
+            text=f'<?xml version="1.0" encoding="UTF-8"?><urlset>{locations}</urlset>',
+        )
+    if path not in WEBSITE_PAGES:
+        return httpx.Response(404, headers=headers, text="Not found")
+    return httpx.Response(
+        200,
+        headers={**headers, "Content-Type": "text/html; charset=utf-8"},
+        text=_website_html(url.host, path),
+    )
+
+
+def _handle_request(request):
+    url = request.url
+    if url.host == SERPER_HOST:
+        query = json.loads(request.content or b"{}").get("q", "")
+        if url.path == "/news":
+            return httpx.Response(200, json={"news": fake_news(query)})
+        return httpx.Response(200, json={"organic": fake_search_results(query)})
+    if url.host == RAPIDAPI_HOST:
+        linkedin_url = url.params.get("linkedin_url", "")
+        if url.path == "/get-company-by-linkedinurl":
+            return httpx.Response(200, json=fake_company_profile(linkedin_url))
+        return httpx.Response(200, json={"data": fake_lead_profile(linkedin_url)})
+    # Any other host is a company website
+    return _website_response(url)
+
+
+def fake_transport():
+    """
+    httpx transport of the shared clients answering every request offline
+    (Serper, RapidAPI and the company websites), sync and async.
+    """
+    return httpx.MockTransport(_handle_request)
+
+
+def fake_youtube_stats(channel_url):
+    """
+    YouTube channel stats in the format of `get_youtube_stats`.
+    """
+    seed = _seed(channel_url)
+    videos = "\n".join(
+        f"- Product tour part {index} (Published: 2025-{12 - index:02d}-01T10:00:00Z)"
+        for index in range(1, 6)
+    )
+    return f"""
+    Total Videos: {20 + seed % 80}
+    Number of Subscribers: {500 + seed % 5000}
+    Average Views: {300 + seed % 2000}
+    Average Likes: {10 + seed % 100}
+    Last 15 Videos:
+    {videos}
+    """
+
+
+def fake_case_study(description):
+    """
+    Case study sharing the most words with the description, instead of the
+    embeddings similarity search.
+    """
+    words = set(_words(description))
+    best, best_overlap = "", -1
+    for path in sorted(glob.glob(os.path.join(CASE_STUDIES_PATH, "*.md"))):
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read()
+        overlap = len(words & set(_words(content)))
+        if overlap > best_overlap:
+            best, best_overlap = content, overlap
+    return best
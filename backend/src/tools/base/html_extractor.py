@@ -0,0 +1,204 @@
+import re
+from collections import namedtuple
+import lxml.html
+from lxml import etree
+
+# Never part of the page content
+SKIPPED_TAGS = {
+    "head", "script", "style", "noscript", "template", "svg", "canvas",
+    "iframe", "object", "embed", "nav", "img", "picture", "video", "audio",
+    "form", "button", "select", "input", "textarea",
+}
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "header", "footer", "aside",
+    "table", "thead", "tbody", "tfoot", "ul", "ol", "dl", "dd", "figure",
+    "figcaption", "address", "details", "summary", "body", "center",
+}
+HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+INLINE_MARKS = {"strong": "**", "b": "**", "em": "_", "i": "_"}
+# Deeper trees (broken markup) are read as plain text
+MAX_DEPTH = 150
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+BLANK_LINES_PATTERN = re.compile(r"\n{3,}")
+INNER_SPACES_PATTERN = re.compile(r"(?<=\S) {2,}")
+LIST_ITEM_PATTERN = re.compile(r"^ *(\*|\d+\.) ")
+PARAGRAPH = "\n\n"
+CHROME_TAGS = ("header", "footer", "nav")
+
+# Page link: href, rel values, inside header/footer/nav, text
+Anchor = namedtuple("Anchor", ["href", "rel", "chrome", "text"])
+
+
+def parse_html(html):
+    """
+    Parse a page with lxml (libxml2), None for empty documents.
+    """
+    if not html or not html.strip():
+        return None
+    try:
+        return lxml.html.document_fromstring(html)
+    except ValueError:
+        # Unicode strings can't carry an XML encoding declaration
+        return lxml.html.document_fromstring(html.encode("utf-8"))
+    except etree.ParserError:
+        return None
+
+
+def _text(text):
+    return WHITESPACE_PATTERN.sub(" ", text) if text else ""
+
+
+def _inline(parts):
+    return WHITESPACE_PATTERN.sub(" ", "".join(parts)).strip()
+
+
+class _Converter:
+    """
+    Walks the parsed tree once, skipping non-content nodes and writing the
+    markdown as it goes (same conventions as html2text: links kept, images
+    and table layout dropped).
+    """
+
+    def __init__(self):
+        self.out = []
+        # Item counter of each open list, None for unordered lists
+        self.lists = []
+
+    def convert(self, root):
+        self._children(root, 0)
+        lines, in_code = [], False
+        for line in "".join(self.out).split("\n"):
+            if line.startswith("```"):
+                in_code = not in_code
+            elif not in_code:
+                # List items keep their nesting indent, other lines are trimmed
+                indent = len(line) - len(line.lstrip(" ")) if LIST_ITEM_PATTERN.match(line) else 0
+                line = " " * indent + INNER_SPACES_PATTERN.sub(" ", line.strip())
+            lines.append(line.rstrip())
+        return BLANK_LINES_PATTERN.sub(PARAGRAPH, "\n".join(lines)).strip()
+
+    def _children(self, element, depth):
+        if element.text:
+            self.out.append(_text(element.text))
+        for child in element:
+            if isinstance(child.tag, str):
+                self._element(child, depth + 1)
+            if child.tail:
+                self.out.append(_text(child.tail))
+
+    def _render(self, element, depth):
+        # Markdown of the element's content, for wrapping (links, headings...)
+        out, self.out = self.out, []
+        self._children(element, depth)
+        rendered, self.out = self.out, out
+        return _inline(rendered)
+
+    def _element(self, element, depth):
+        tag = element.tag.lower()
+        if tag in SKIPPED_TAGS:
+            return
+        if depth > MAX_DEPTH:
+            self.out.append(_text(element.text_content()))
+            return
+
+        if tag in HEADINGS:
+            text = self._render(element, depth)
+            if text:
+                self.out.append(f"{PARAGRAPH}{'#' * HEADINGS[tag]} {text}{PARAGRAPH}")
+        elif tag == "a":
+            text = self._render(element, depth)
+            href = (element.get("href") or "").strip()
+            if text and href and not href.startswith(("#", "javascript:")):
+                self.out.append(f"[{text}]({href})")
+            else:
+                self.out.append(text)
+        elif tag in INLINE_MARKS:
+            text = self._render(element, depth)
+            if text:
+                mark = INLINE_MARKS[tag]
+                self.out.append(f"{mark}{text}{mark}")
+        elif tag == "code":
+            text = _inline([element.text_content()])
+            if text:
+                self.out.append(f"`{text}`")
+        elif tag == "pre":
+            code = element.text_content().strip("\n")
+            if code.strip():
+                self.out.append(f"{PARAGRAPH}```\n{code}\n```{PARAGRAPH}")
+        elif tag == "br":
+            self.out.append("\n")
+        elif tag == "hr":
+            self.out.append(f"{PARAGRAPH}* * *{PARAGRAPH}")
+        elif tag == "li":
+            bullet = "*"
+            if self.lists and self.lists[-1] is not None:
+                self.lists[-1] += 1
+                bullet = f"{self.lists[-1]}."
+            self.out.append(f"\n{'  ' * max(0, len(self.lists) - 1)}{bullet} ")
+            self._children(element, depth)
+        elif tag in ("ul", "ol"):
+            self.lists.append(0 if tag == "ol" else None)
+            # Items start their own line, only the outermost list is a paragraph
+            self.out.append("" if len(self.lists) > 1 else PARAGRAPH)
+            self._children(element, depth)
+            self.lists.pop()
+            self.out.append("" if self.lists else PARAGRAPH)
+        elif tag == "blockquote":
+            text = self._render(element, depth)
+            if text:
+                self.out.append(f"{PARAGRAPH}> {text}{PARAGRAPH}")
+        elif tag in ("tr", "dt"):
+            self.out.append("\n")
+            self._children(element, depth)
+            self.out.append("\n")
+        elif tag in ("td", "th"):
+            self._children(element, depth)
+            self.out.append(" ")
+        elif tag in BLOCK_TAGS:
+            self.out.append(PARAGRAPH)
+            self._children(element, depth)
+            self.out.append(PARAGRAPH)
+        else:
+            self._children(element, depth)
+
+
+def html_to_markdown(root):
+    """
+    Markdown of the page content in a single pass over the lxml tree (see
+    `parse_html`): scripts, styles, navigation, media & forms are skipped.
+    """
+    if root is None:
+        return ""
+    return _Converter().convert(root)
+
+
+def page_anchors(root):
+    """
+    Links of the parsed page, as plain `Anchor` tuples.
+    """
+    if root is None:
+        return []
+    anchors = []
+    for anchor in root.iter("a"):
+        href = (anchor.get("href") or "").strip()
+        if not href:
+            continue
+        anchors.append(
+            Anchor(
+                href,
+                (anchor.get("rel") or "").split(),
+                any(parent.tag in CHROME_TAGS for parent in anchor.iterancestors()),
+                " ".join(anchor.text_content().split()),
+            )
+        )
+    return anchors
+
+
+def extract_page(html):
+    """
+    Markdown and anchors of a page in one parse. Only plain data goes in and
+    out, so it can run in a worker process (see `cpu_pool`).
+    """
+    root = parse_html(html)
+    return html_to_markdown(root), page_anchors(root)
@@ -0,0 +1,257 @@
+import os
+import re
+import json
+import time
+import zlib
+import sqlite3
+import logging
+import threading
+from src.usage import record_usage
+
+logger = logging.getLogger(__name__)
+
+# Disk cache of the scraped pages (HTML & derived markdown), shared by runs
+HTTP_CACHE = os.getenv("HTTP_CACHE", "true").lower() in ("1", "true", "yes")
+HTTP_CACHE_PATH = os.getenv("HTTP_CACHE_PATH", "database/http_cache.sqlite3")
+# Size of the compressed cache, least recently used pages are evicted above it
+HTTP_CACHE_MAX_MB = float(os.getenv("HTTP_CACHE_MAX_MB", "256"))
+# Pages are served without any request for this long (unless the server's
+# Cache-Control says otherwise), then revalidated with ETag/Last-Modified
+HTTP_CACHE_TTL_SECONDS = int(os.getenv("HTTP_CACHE_TTL_SECONDS", "86400"))
+
+CACHE_CONTROL_MAX_AGE = re.compile(r"max-age=(\d+)", re.IGNORECASE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    html BLOB NOT NULL,
+    markdown BLOB,
+    etag TEXT,
+    last_modified TEXT,
+    fresh_until REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL,
+    anchors BLOB
+)
+"""
+
+
+def _compress(text):
+    return zlib.compress(text.encode("utf-8"), 6)
+
+
+def _decompress(blob):
+    return zlib.decompress(blob).decode("utf-8") if blob is not None else None
+
+
+class CachedPage:
+    def __init__(
+        self, url, html, etag=None, last_modified=None, fresh_until=0, markdown=None, anchors=None
+    ):
+        self.url = url
+        self.html = html
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fresh_until = fresh_until
+        self.markdown = markdown
+        # Links of the page as plain lists (see `html_extractor.Anchor`)
+        self.anchors = anchors
+        # The HTML was replaced by the browser-rendered page
+        self.rendered = False
+        # The download was cut (size cap or deadline): the page isn't cached
+        self.truncated = False
+
+    @property
+    def fresh(self):
+        return time.time() < self.fresh_until
+
+    def validators(self):
+        """
+        Headers of the conditional request revalidating the page.
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """
+    Size-bounded (LRU) disk cache of scraped pages keyed by URL, in SQLite.
+    HTML and markdown are stored zlib-compressed; the markdown & anchors are
+    added once derived so cached pages are served without parsing them again.
+    """
+
+    def __init__(self, path=None, max_bytes=None, ttl=None, enabled=None):
+        self.path = path or HTTP_CACHE_PATH
+        self.max_bytes = max_bytes or int(HTTP_CACHE_MAX_MB * 1024 * 1024)
+        self.ttl = HTTP_CACHE_TTL_SECONDS if ttl is None else ttl
+        self.enabled = HTTP_CACHE if enabled is None else enabled
+        self.lock = threading.Lock()
+        self._connection = None
+        self.total_size = 0
+
+    def _db(self):
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute(SCHEMA)
+            columns = [row[1] for row in self._connection.execute("PRAGMA table_info(pages)")]
+            if "anchors" not in columns:
+                # Caches created before the anchors were stored
+                self._connection.execute("ALTER TABLE pages ADD COLUMN anchors BLOB")
+            self.total_size = self._connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM pages"
+            ).fetchone()[0]
+        return self._connection
+
+    def _fresh_until(self, response):
+        cache_control = response.headers.get("Cache-Control", "").lower()
+        if "no-cache" in cache_control:
+            return 0
+        max_age = CACHE_CONTROL_MAX_AGE.search(cache_control)
+        ttl = min(int(max_age.group(1)), self.ttl) if max_age else self.ttl
+        return time.time() + ttl
+
+    def get(self, url):
+        """
+        Cached page of the URL (fresh or to revalidate), None if not cached.
+        """
+        if not self.enabled:
+            return None
+        try:
+            with self.lock:
+                db = self._db()
+                row = db.execute(
+                    "SELECT html, etag, last_modified, fresh_until, markdown, anchors FROM pages WHERE url = ?",
+                    (url,),
+                ).fetchone()
+                if row is None:
+                    return None
+                db.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (time.time(), url))
+                db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"HTTP cache lookup failed for {url}: {e}")
+            return None
+        html, etag, last_modified, fresh_until, markdown, anchors = row
+        anchors = _decompress(anchors)
+        return CachedPage(
+            url,
+            _decompress(html),
+            etag,
+            last_modified,
+            fresh_until,
+            _decompress(markdown),
+            json.loads(anchors) if anchors is not None else None,
+        )
+
+    def store(self, url, response, html, truncated=False):
+        """
+        Cache the HTML of a 200 response (unless the server forbids it) and return its page.
+        Truncated bodies are returned uncached, a later fetch downloads the page again.
+        """
+        page = CachedPage(
+            url,
+            html,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+            0 if truncated else self._fresh_until(response),
+        )
+        page.truncated = truncated
+        cacheable = "no-store" not in response.headers.get("Cache-Control", "").lower()
+        if self.enabled and cacheable and not truncated:
+            self._write(page)
+        return page
+
+    def revalidated(self, page, response):
+        """
+        The server answered 304 Not Modified: the cached page is fresh again.
+        """
+        page.etag = response.headers.get("ETag") or page.etag
+        page.last_modified = response.headers.get("Last-Modified") or page.last_modified
+        page.fresh_until = self._fresh_until(response)
+        self._execute(
+            "UPDATE pages SET etag = ?, last_modified = ?, fresh_until = ? WHERE url = ?",
+            (page.etag, page.last_modified, page.fresh_until, page.url),
+        )
+        record_usage("http_cache", cache_hits=1)
+        return page
+
+    def store_parsed(self, page):
+        """
+        Add the markdown & anchors derived from a cached page.
+        """
+        if not self.enabled or page.truncated:
+            return
+        markdown = _compress(page.markdown)
+        anchors = _compress(json.dumps(page.anchors or []))
+        # Rendered pages are cached as rendered, revalidation keeps them
+        html = _compress(page.html) if page.rendered else None
+        with self.lock:
+            try:
+                db = self._db()
+                row = db.execute("SELECT size, html FROM pages WHERE url = ?", (page.url,)).fetchone()
+                if row is None:
+                    return
+                size = len(html or row[1]) + len(markdown) + len(anchors)
+                db.execute(
+                    "UPDATE pages SET html = COALESCE(?, html), markdown = ?, anchors = ?, size = ? "
+                    "WHERE url = ?",
+                    (html, markdown, anchors, size, page.url),
+                )
+                db.commit()
+                self.total_size += size - row[0]
+            except sqlite3.Error as e:
+                logger.warning(f"HTTP cache write failed for {page.url}: {e}")
+
+    def _write(self, page):
+        html = _compress(page.html)
+        with self.lock:
+            try:
+                db = self._db()
+                previous = db.execute("SELECT size FROM pages WHERE url = ?", (page.url,)).fetchone()
+                db.execute(
+                    "INSERT OR REPLACE INTO pages VALUES (?, ?, NULL, ?, ?, ?, ?, ?, NULL)",
+                    (page.url, html, page.etag, page.last_modified, page.fresh_until, time.time(), len(html)),
+                )
+                self.total_size += len(html) - (previous[0] if previous else 0)
+                self._evict(db)
+                db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"HTTP cache write failed for {page.url}: {e}")
+
+    def _execute(self, query, params):
+        if not self.enabled:
+            return
+        with self.lock:
+            try:
+                db = self._db()
+                db.execute(query, params)
+                db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"HTTP cache update failed: {e}")
+
+    def _evict(self, db):
+        # Least recently used pages go first, down to 90% of the size limit
+        if self.total_size <= self.max_bytes:
+            return
+        target = self.max_bytes * 0.9
+        evicted = 0
+        for url, size in db.execute("SELECT url, size FROM pages ORDER BY accessed_at").fetchall():
+            if self.total_size <= target:
+                break
+            db.execute("DELETE FROM pages WHERE url = ?", (url,))
+            self.total_size -= size
+            evicted += 1
+        logger.info(f"HTTP cache evicted {evicted} pages ({self.total_size / 1024 / 1024:.1f} MB left)")
+
+    def close(self):
+        with self.lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+http_cache = HttpCache()
@@ -0,0 +1,102 @@
+import os
+import asyncio
+import logging
+import threading
+import weakref
+import httpx
+from .fake_tools import FAKE_TOOLS, fake_transport
+
+logger = logging.getLogger(__name__)
+
+# Timeouts of the outbound HTTP requests of the tools (scraping, Serper, RapidAPI...)
+HTTP_CONNECT_TIMEOUT_SECONDS = float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "10"))
+HTTP_READ_TIMEOUT_SECONDS = float(os.getenv("HTTP_READ_TIMEOUT_SECONDS", "30"))
+# Connection pool shared by all tools, keep-alive connections are per host
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_SECONDS = float(os.getenv("HTTP_KEEPALIVE_SECONDS", "60"))
+# HTTP/2 needs the `h2` package (pip install httpx[http2]), ignored when missing
+HTTP_HTTP2 = os.getenv("HTTP_HTTP2", "false").lower() in ("1", "true", "yes")
+
+
+def _http2_enabled():
+    if not HTTP_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("HTTP_HTTP2 is enabled but the h2 package is missing, using HTTP/1.1")
+        return False
+    return True
+
+
+def _client_options():
+    options = {
+        "timeout": httpx.Timeout(
+            HTTP_READ_TIMEOUT_SECONDS, connect=HTTP_CONNECT_TIMEOUT_SECONDS
+        ),
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_SECONDS,
+        ),
+        "http2": _http2_enabled(),
+        "follow_redirects": True,
+        # Compressed transfer (httpx decodes it transparently)
+        "headers": {"Accept-Encoding": "gzip, deflate"},
+    }
+    if FAKE_TOOLS:
+        # Offline runs: every request is answered by the fake tools
+        options["transport"] = fake_transport()
+    return options
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> httpx.Client:
+    """
+    Process-wide, thread-safe HTTP client of the tools: connections to the
+    same hosts (google.serper.dev, the RapidAPI host...) are kept alive and
+    reused across calls and leads instead of a new TCP+TLS handshake each time.
+    """
+    global _client
+    with _client_lock:
+        if _client is None or _client.is_closed:
+            _client = httpx.Client(**_client_options())
+        return _client
+
+
+# An async client is bound to the event loop it was first used on
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Shared async HTTP client of the running event loop, used by the async tools.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(**_client_options())
+        _async_clients[loop] = client
+    return client
+
+
+def close_http_clients():
+    """
+    Close the sync client (e.g. on server shutdown), the async clients are
+    closed with `aclose_async_client` from their event loop.
+    """
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+async def aclose_async_client():
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -0,0 +1,165 @@
+import os
+import re
+import json
+import logging
+from urllib.parse import urlparse
+from .markdown_scraper_tool import host_domain
+
+logger = logging.getLogger(__name__)
+
+# Optional JSON file overriding/extending the link map:
+# {"<key>": {"url": "...", "label": "...", "keywords": ["..."]}}
+OUTREACH_LINKS_FILE = os.getenv("OUTREACH_LINKS_FILE", "")
+# LLM proof-read of the outreach report: "auto" (only when the rewriter finds
+# unresolved placeholders), "always" or "never"
+OUTREACH_PROOFREAD = os.getenv("OUTREACH_PROOFREAD", "auto").lower()
+
+# Links inserted into the outreach report. Keys are matched in order against
+# link texts and placeholders, so specific entries come first.
+DEFAULT_OUTREACH_LINKS = {
+    "case_studies": {
+        "url": "https://www.adople.com/project.html/",
+        "label": "case study",
+        "keywords": ["case stud", "success stor"],
+    },
+    "website": {
+        "url": "https://www.adople.com",
+        "label": "Adople AI",
+        "keywords": ["adople", "website", "our site", "homepage", "our services"],
+    },
+}
+
+MARKDOWN_LINK_PATTERN = re.compile(r"(?<!!)\[([^\]\n]+)\]\(([^)\n]*)\)")
+# Link placeholders left by the LLM: [Insert link], [Case study URL], {website},
+# {{case_study_link}}, <case study URL>. Other placeholders ([Your Name],
+# {job title}) aren't links, the rewriter leaves them to the writer
+PLACEHOLDER_PATTERN = re.compile(
+    r"\[([^\[\]\n]*(?:link|url|website|case stud)[^\[\]\n]*)\](?!\()"
+    r"|\{\{?\s*([a-z_ ]*(?:link|url|website|case stud)[a-z_ ]*?)\s*\}?\}"
+    r"|<([^<>\n]*(?:link|url)[^<>\n]*)>",
+    re.IGNORECASE,
+)
+# URLs written as placeholders: example.com, your-website.com, /insert-link
+PLACEHOLDER_URL_PATTERN = re.compile(
+    r"(?:^|[/.])example\.(?:com|org|net)\b|your[-_]?(?:company|domain|site|website)|insert|placeholder",
+    re.IGNORECASE,
+)
+
+
+def load_outreach_links():
+    links = dict(DEFAULT_OUTREACH_LINKS)
+    if OUTREACH_LINKS_FILE:
+        with open(OUTREACH_LINKS_FILE, "r", encoding="utf-8") as f:
+            links.update(json.load(f))
+    return links
+
+
+def _match_link(text, links):
+    text = text.lower().replace("_", " ").replace("-", " ")
+    for key, link in links.items():
+        if key.lower() in text or any(keyword in text for keyword in link.get("keywords", [])):
+            return link
+    return None
+
+
+def _is_valid_url(url):
+    parsed = urlparse(url.strip())
+    return parsed.scheme in ("http", "https") and "." in parsed.netloc
+
+
+def _normalize(url):
+    # Scheme, "www." & trailing slash don't make a different page
+    parsed = urlparse(url.strip())
+    return f"{host_domain(parsed.netloc)}{parsed.path.rstrip('/')}".lower()
+
+
+def _link_target(url):
+    # Markdown link destination without its optional title: (url "title")
+    return url.strip().split(" ")[0]
+
+
+def _is_broken_url(url, own_domains):
+    """
+    Missing, relative or invalid URLs, and placeholder URLs (example.com,
+    your-website.com). Valid pages, of our own domains or not, aren't broken.
+    """
+    if not _is_valid_url(url):
+        return True
+    if host_domain(urlparse(url).netloc) in own_domains:
+        return False
+    return bool(PLACEHOLDER_URL_PATTERN.search(url))
+
+
+def rewrite_links(markdown, links=None):
+    """
+    Deterministically fix the links of a generated report using the link map:
+    - link placeholders ("[Insert case study link]", "{website}") become links,
+    - links with a missing, invalid or placeholder URL are rewritten to the
+      matching configured URL (valid pages are kept, e.g. a specific case study),
+    - the first mention of a link label is linked when the link is missing.
+    Returns the rewritten markdown and the list of unresolved placeholders/links.
+    """
+    links = links or load_outreach_links()
+    own_domains = {host_domain(urlparse(link["url"]).netloc) for link in links.values()}
+    unresolved = []
+    rewrites = 0
+
+    def replace_link(match):
+        nonlocal rewrites
+        text, url = match.group(1), _link_target(match.group(2))
+        if not _is_broken_url(url, own_domains):
+            return match.group(0)
+        link = _match_link(f"{text} {url}", links)
+        if not link:
+            unresolved.append(match.group(0))
+            return match.group(0)
+        rewrites += 1
+        return f"[{text}]({link['url']})"
+
+    def replace_placeholder(match):
+        nonlocal rewrites
+        placeholder = next(group for group in match.groups() if group)
+        link = _match_link(placeholder, links)
+        if not link:
+            unresolved.append(match.group(0))
+            return match.group(0)
+        rewrites += 1
+        return f"[{link['label']}]({link['url']})"
+
+    markdown = MARKDOWN_LINK_PATTERN.sub(replace_link, markdown)
+    markdown = PLACEHOLDER_PATTERN.sub(replace_placeholder, markdown)
+
+    # Link the first plain mention of each label whose URL is still missing
+    # (URLs are compared to the link targets: one URL can prefix another)
+    targets = {
+        _normalize(_link_target(url)) for _, url in MARKDOWN_LINK_PATTERN.findall(markdown)
+    }
+    for link in links.values():
+        if _normalize(link["url"]) in targets or not link.get("label"):
+            continue
+        label_pattern = re.compile(
+            rf"(?<![\[\w])(\*\*)?({re.escape(link['label'])})(\*\*)?(?![\w\]])"
+        )
+        markdown, count = label_pattern.subn(
+            lambda m: f"{m.group(1) or ''}[{m.group(2)}]({link['url']}){m.group(3) or ''}",
+            markdown,
+            count=1,
+        )
+        rewrites += count
+
+    if rewrites or unresolved:
+        logger.info(
+            f"Link rewriter: {rewrites} links fixed, {len(unresolved)} unresolved"
+        )
+    return markdown, unresolved
+
+
+def format_correct_links(links=None):
+    """
+    Markdown list of the configured links, given to the proof-reader LLM.
+    """
+    links = links or load_outreach_links()
+    return "\n".join(
+        f"** {key.replace('_', ' ').capitalize()} link**: {link['url']}"
+        for key, link in links.items()
+    )
@@ -1,6 +1,10 @@
 import os
-import requests
-from src.utils import invoke_llm
+import re
+import unicodedata
+from src.utils import invoke_llm, ainvoke_llm
+from src.usage import track_usage
+from .http_client import get_http_client, get_async_client
+from .prompt_serializer import compact_serialize
 
 
 def extract_linkedin_url_base(search_results):
@@ -13,36 +17,141 @@ def extract_linkedin_url_base(search_results):
     return ""
 
 
-def extract_linkedin_url(search_results):
-    EXTRACT_LINKEDIN_URL_PROMPT = """
-    **Role:**  
-    You are an expert in extracting LinkedIn URLs from Google search results, specializing in finding the correct personal LinkedIn URL.
+# Rule-based matching of the lead LinkedIn profile in search results: the best
+# candidate is accepted without the LLM when its score reaches the minimum and
+# is ahead of the runner-up by the margin
+LINKEDIN_MATCH_MIN_SCORE = 4.0
+LINKEDIN_MATCH_MIN_MARGIN = 1.5
+LINKEDIN_PROFILE_PATTERN = re.compile(
+    r"^https?://([a-z]{2,3}\.)?(www\.)?linkedin\.com/in/([^/?#]+)/?(?:[?#].*)?$",
+    re.IGNORECASE,
+)
 
-    **Objective:**  
-    From the provided search results, find the LinkedIn URL of a specific person working at a specific company.
 
-    **Instructions:**  
-    1. Output **only** the correct LinkedIn URL if found, nothing else.  
-    2. If no valid URL exists, output **only** an empty string.  
-    3. Only consider URLs with `"/in"`. Ignore those with `"/posts"` or `"/company"`.  
+def _tokens(text):
+    text = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode()
+    return [token for token in re.split(r"[^a-z0-9]+", text.lower()) if len(token) > 1]
+
+
+def _company_token(company_name):
+    # "acme-corp.co.uk" -> "acme"; "Acme Corp" -> "acme"
+    tokens = _tokens(company_name.split("@")[-1].split(".")[0])
+    return tokens[0] if tokens else ""
+
+
+def score_linkedin_candidate(result, name_tokens, company_token, rank=0):
+    """
+    Score a search result as the lead profile: name tokens in the title/URL slug,
+    company in the title/snippet and a plain `/in/<slug>` profile URL.
+    Returns None for results that are not personal profile pages.
+    """
+    match = LINKEDIN_PROFILE_PATTERN.match(result.get("link", ""))
+    if not match:
+        return None
+    title = set(_tokens(result.get("title", "")))
+    slug = set(_tokens(match.group(3)))
+    snippet = set(_tokens(result.get("snippet", "")))
+
+    score = 1.0  # profile URL shape
+    if name_tokens:
+        score += 3 * sum(token in title for token in name_tokens) / len(name_tokens)
+        if all(token in slug for token in name_tokens):
+            score += 1
+    if company_token and company_token in title | snippet:
+        score += 2
+    # Search engine ranking breaks ties
+    score += 0.5 / (rank + 1)
+    return score
+
+
+def rank_linkedin_candidates(search_results, lead_name="", company_name=""):
+    """
+    Rank the personal LinkedIn profile URLs of the search results, best first.
     """
+    name_tokens = _tokens(lead_name)
+    company_token = _company_token(company_name)
+    candidates = []
+    for rank, result in enumerate(search_results):
+        score = score_linkedin_candidate(result, name_tokens, company_token, rank)
+        if score is not None:
+            candidates.append((score, result))
+    candidates.sort(key=lambda candidate: -candidate[0])
+    return candidates
+
+
+EXTRACT_LINKEDIN_URL_PROMPT = """
+**Role:**  
+You are an expert in extracting LinkedIn URLs from Google search results, specializing in finding the correct personal LinkedIn URL.
 
+**Objective:**  
+From the provided search results, find the LinkedIn URL of a specific person working at a specific company.
+
+**Instructions:**  
+1. Output **only** the correct LinkedIn URL if found, nothing else.  
+2. If no valid URL exists, output **only** an empty string.  
+3. Only consider URLs with `"/in"`. Ignore those with `"/posts"` or `"/company"`.  
+"""
+
+
+def _match_linkedin_url(search_results, lead_name, company_name):
+    """
+    Returns (url, None) when the rules settle the match, else (None, llm_inputs).
+    """
+    candidates = rank_linkedin_candidates(search_results, lead_name, company_name)
+    if not candidates:
+        return "", None
+    best_score, best = candidates[0]
+    runner_up_score = candidates[1][0] if len(candidates) > 1 else 0
+    if (
+        best_score >= LINKEDIN_MATCH_MIN_SCORE
+        and best_score - runner_up_score >= LINKEDIN_MATCH_MIN_MARGIN
+    ):
+        return best["link"], None
+
+    # Only send the top candidates, not the whole search results
+    top_candidates = [
+        {key: result.get(key, "") for key in ("title", "link", "snippet")}
+        for _, result in candidates[:3]
+    ]
+    inputs = (
+        f"Person: {lead_name}\nCompany: {company_name}\n\n"
+        f"Search results:\n{compact_serialize(top_candidates, label='LinkedIn candidates')}"
+    )
+    return None, inputs
+
+
+def extract_linkedin_url(search_results, lead_name="", company_name=""):
+    """
+    Find the lead LinkedIn URL in the search results. Candidates are ranked
+    with rules and the LLM is only asked to choose when the best ones are ambiguous.
+    """
+    url, inputs = _match_linkedin_url(search_results, lead_name, company_name)
+    if url is not None:
+        return url
     result = invoke_llm(
         system_prompt=EXTRACT_LINKEDIN_URL_PROMPT,
-        user_message=str(search_results),
+        user_message=inputs,
         model="gemini-2.5-pro",
     )
-    return result
+    return result.strip().strip('"')
 
 
-def scrape_linkedin(linkedin_url, is_company=False):
+async def aextract_linkedin_url(search_results, lead_name="", company_name=""):
     """
-    Scrapes LinkedIn profile data based on the provided LinkedIn URL.
-
-    @param linkedin_url: The LinkedIn URL to scrape.
-    @param is_company: Boolean indicating whether to scrape a company profile or a person profile.
-    @return: The scraped LinkedIn profile data.
+    Async version of `extract_linkedin_url`.
     """
+    url, inputs = _match_linkedin_url(search_results, lead_name, company_name)
+    if url is not None:
+        return url
+    result = await ainvoke_llm(
+        system_prompt=EXTRACT_LINKEDIN_URL_PROMPT,
+        user_message=inputs,
+        model="gemini-2.5-pro",
+    )
+    return result.strip().strip('"')
+
+
+def _linkedin_request(linkedin_url, is_company):
     if is_company:
         url = "https://fresh-linkedin-profile-data.p.rapidapi.com/get-company-by-linkedinurl"
 
@@ -68,15 +177,45 @@ def scrape_linkedin(linkedin_url, is_company=False):
         "x-rapidapi-key": os.getenv("RAPIDAPI_KEY"),
         "x-rapidapi-host": "fresh-linkedin-profile-data.p.rapidapi.com",
     }
+    return url, headers, querystring
 
-    # Ensure RapidAPI key is configured
-    if not headers.get("x-rapidapi-key"):
-        print("RapidAPI key not configured; skipping LinkedIn scrape.")
-        return {}
-    response = requests.get(url, headers=headers, params=querystring)
+
+def _linkedin_response(response):
     if response.status_code == 200:
         data = response.json()
         return data if isinstance(data, dict) else {}
     else:
         print(f"Request failed with status code: {response.status_code}")
         return {}
+
+
+@track_usage("scrape_linkedin")
+def scrape_linkedin(linkedin_url, is_company=False):
+    """
+    Scrapes LinkedIn profile data based on the provided LinkedIn URL.
+
+    @param linkedin_url: The LinkedIn URL to scrape.
+    @param is_company: Boolean indicating whether to scrape a company profile or a person profile.
+    @return: The scraped LinkedIn profile data.
+    """
+    url, headers, querystring = _linkedin_request(linkedin_url, is_company)
+
+    # Ensure RapidAPI key is configured
+    if not headers.get("x-rapidapi-key"):
+        print("RapidAPI key not configured; skipping LinkedIn scrape.")
+        return {}
+    response = get_http_client().get(url, headers=headers, params=querystring)
+    return _linkedin_response(response)
+
+
+@track_usage("scrape_linkedin")
+async def ascrape_linkedin(linkedin_url, is_company=False):
+    """
+    Async version of `scrape_linkedin`.
+    """
+    url, headers, querystring = _linkedin_request(linkedin_url, is_company)
+    if not headers.get("x-rapidapi-key"):
+        print("RapidAPI key not configured; skipping LinkedIn scrape.")
+        return {}
+    response = await get_async_client().get(url, headers=headers, params=querystring)
+    return _linkedin_response(response)
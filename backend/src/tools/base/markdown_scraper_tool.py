@@ -1,40 +1,359 @@
 import re
 import os
-import html2text
-import requests
-from bs4 import BeautifulSoup
+import time
+import codecs
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from contextlib import nullcontext, asynccontextmanager
 from datetime import datetime
-from urllib.parse import urlparse
+from urllib.parse import urlparse, urljoin
+from src.usage import track_usage, record_usage
+from .http_client import get_http_client, get_async_client
+from .http_cache import http_cache
+from .html_extractor import Anchor, extract_page
+from .cpu_pool import run_cpu_bound
+from .browser_pool import browser_pool, needs_rendering
 
+logger = logging.getLogger(__name__)
 
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.77 Safari/537.36",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Accept-Encoding": "gzip, deflate",
+}
+
+# Domains of the social profiles extracted from the website
+SOCIAL_DOMAINS = {
+    "youtube": ("youtube.com", "youtu.be"),
+    "twitter": ("twitter.com", "x.com"),
+    "facebook": ("facebook.com", "fb.com", "fb.me"),
+}
+# Share buttons, embeds & single posts are not the company profile
+SOCIAL_IGNORED_PATHS = re.compile(
+    r"/(sharer|share|intent|embed|hashtag|search|watch|status|posts|plugins|dialog)\b",
+    re.IGNORECASE,
+)
+SOCIAL_PROFILE_PATHS = re.compile(r"^/(@|channel/|c/|user/)", re.IGNORECASE)
+BLOG_SECTIONS = ("blog", "news", "insights", "articles", "resources", "stories")
+
+# Page downloads are streamed: bytes kept per page (the rest isn't downloaded)
+# and deadline of the whole download, on top of the connect/read timeouts
+SCRAPE_MAX_BYTES = int(os.getenv("SCRAPE_MAX_BYTES", str(2 * 1024 * 1024)))
+SCRAPE_TOTAL_TIMEOUT_SECONDS = float(os.getenv("SCRAPE_TOTAL_TIMEOUT_SECONDS", "20"))
+# Other content types (PDFs, images, scripts...) are not downloaded
+SCRAPE_CONTENT_TYPES = (
+    "text/html",
+    "application/xhtml+xml",
+    "text/xml",
+    "application/xml",
+    "text/plain",
+)
+
+
+def _request_headers(page):
+    # Conditional request when a stale copy of the page is cached
+    return {**HEADERS, **page.validators()} if page is not None else HEADERS
+
+
+class PageBody:
+    """
+    Reads a streamed page body: non-HTML content types are refused before
+    any download, the charset is decoded chunk by chunk and the download is
+    cut once SCRAPE_MAX_BYTES are read or the deadline is passed.
+    """
+
+    def __init__(self, url, response, started_at):
+        if response.status_code != 200:
+            raise Exception(f"Failed to fetch the URL. Status code: {response.status_code}")
+        content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if content_type and content_type not in SCRAPE_CONTENT_TYPES:
+            raise Exception(f"Skipped {url}: not an HTML page ({content_type})")
+        try:
+            decoder = codecs.getincrementaldecoder(response.charset_encoding or "utf-8")
+        except LookupError:
+            decoder = codecs.getincrementaldecoder("utf-8")
+        self.decoder = decoder(errors="replace")
+        self.url = url
+        self.deadline = started_at + SCRAPE_TOTAL_TIMEOUT_SECONDS
+        self.parts = []
+        self.size = 0
+        self.truncated = None
+
+    def feed(self, chunk):
+        """
+        Decode the next chunk, False once the download must stop.
+        """
+        room = SCRAPE_MAX_BYTES - self.size
+        # A body of exactly SCRAPE_MAX_BYTES is complete, it is cut when more arrives
+        if len(chunk) > room:
+            chunk, self.truncated = chunk[:room], f"{SCRAPE_MAX_BYTES} bytes"
+        elif time.monotonic() > self.deadline:
+            self.truncated = f"{SCRAPE_TOTAL_TIMEOUT_SECONDS:g}s"
+        self.size += len(chunk)
+        self.parts.append(self.decoder.decode(chunk))
+        return self.truncated is None
+
+    def text(self):
+        self.parts.append(self.decoder.decode(b"", final=True))
+        if self.truncated:
+            logger.info(f"Truncated {self.url} after {self.truncated} ({self.size} bytes read)")
+        return "".join(self.parts)
+
+
+# Downloads in progress by URL: fetching a page already being downloaded
+# (e.g. prefetched, see `prefetcher`) waits for it instead of downloading it again
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def _page_url(url):
+    # Home pages are cached under one URL with or without the trailing slash
+    return url + "/" if not urlparse(url).path else url
+
+
+def _join_inflight(url):
+    """
+    (future, True) when the caller must download the page & resolve the
+    future, (future, False) when another download of the URL is in progress.
+    """
+    with _inflight_lock:
+        future = _inflight.get(url)
+        if future is not None:
+            return future, False
+        future = _inflight[url] = Future()
+        return future, True
+
+
+def _resolve_inflight(url, future, page=None, error=None):
+    with _inflight_lock:
+        _inflight.pop(url, None)
+    if error is not None:
+        if not isinstance(error, Exception):
+            error = Exception(f"Download of {url} was cancelled")
+        future.set_exception(error)
+    else:
+        future.set_result(page)
+
+
+def fetch_page(url, limit=None):
+    """
+    Fetch a page through the disk cache: fresh pages are served without any
+    request, stale ones are revalidated (a 304 costs no download).
+    `limit(url)` optionally wraps the HTTP request (e.g. politeness limits).
+    """
+    url = _page_url(url)
+    page = http_cache.get(url)
+    if page is not None and page.fresh:
+        record_usage("http_cache", cache_hits=1)
+        return page
+    future, owner = _join_inflight(url)
+    if not owner:
+        return future.result()
+    try:
+        page = _download(url, page, limit)
+    except BaseException as e:
+        # Waiting fetches fail too (cancellations included, they'd wait forever)
+        _resolve_inflight(url, future, error=e)
+        raise
+    _resolve_inflight(url, future, page)
+    return page
+
+
+def _download(url, page, limit):
+    started_at = time.monotonic()
+    with limit(url) if limit else nullcontext():
+        # Stream the response, the body is only read for HTML pages
+        with get_http_client().stream("GET", url, headers=_request_headers(page)) as response:
+            if response.status_code == 304 and page is not None:
+                return http_cache.revalidated(page, response)
+            body = PageBody(url, response, started_at)
+            for chunk in response.iter_bytes():
+                if not body.feed(chunk):
+                    break
+    return http_cache.store(url, response, body.text(), truncated=bool(body.truncated))
+
+
+@asynccontextmanager
+async def _no_limit(url):
+    yield
+
+
+async def afetch_page(url, limit=None):
+    """
+    Async version of `fetch_page`, `limit(url)` being an async context manager.
+    """
+    url = _page_url(url)
+    page = await asyncio.to_thread(http_cache.get, url)
+    if page is not None and page.fresh:
+        record_usage("http_cache", cache_hits=1)
+        return page
+    future, owner = _join_inflight(url)
+    if not owner:
+        return await asyncio.wrap_future(future)
+    try:
+        page = await _adownload(url, page, limit)
+    except BaseException as e:
+        # Waiting fetches fail too (cancellations included, they'd wait forever)
+        _resolve_inflight(url, future, error=e)
+        raise
+    _resolve_inflight(url, future, page)
+    return page
+
+
+async def _adownload(url, page, limit):
+    started_at = time.monotonic()
+    async with (limit or _no_limit)(url):
+        async with get_async_client().stream("GET", url, headers=_request_headers(page)) as response:
+            if response.status_code == 304 and page is not None:
+                return await asyncio.to_thread(http_cache.revalidated, page, response)
+            body = PageBody(url, response, started_at)
+            async for chunk in response.aiter_bytes():
+                if not body.feed(chunk):
+                    break
+    return await asyncio.to_thread(
+        http_cache.store, url, response, body.text(), bool(body.truncated)
+    )
+
+
+def parse_page(page):
+    """
+    Markdown & anchors of a fetched page, converted in the worker processes
+    (see `cpu_pool`). Pages with too little text are rendered first (see
+    `browser_pool`); both are then cached with the page, cached pages are
+    served without parsing them again.
+    """
+    if page.markdown is not None and page.anchors is not None:
+        return page.markdown, [Anchor._make(anchor) for anchor in page.anchors]
+    markdown, anchors = run_cpu_bound(extract_page, page.html)
+    if page.markdown is None:
+        if needs_rendering(markdown):
+            # Too little text: most likely rendered client-side
+            html = browser_pool.render(page.url)
+            if html:
+                page.html, page.rendered = html, True
+                markdown, anchors = run_cpu_bound(extract_page, html)
+        page.markdown = markdown
+    page.anchors = [list(anchor) for anchor in anchors]
+    http_cache.store_parsed(page)
+    return page.markdown, anchors
+
+
+def page_markdown(page):
+    """
+    Markdown of a fetched page, derived from its HTML once then served from the cache.
+    """
+    if page.markdown is None:
+        parse_page(page)
+    return page.markdown
+
+
+def _parse_with_links(page):
+    markdown, anchors = parse_page(page)
+    return markdown, extract_social_links(anchors, page.url)
+
+
+def host_domain(netloc):
+    """
+    Domain of a URL host, without port & "www." (e.g. "www.acme.com:443" -> "acme.com").
+    """
+    netloc = netloc.lower().split(":")[0]
+    return netloc[4:] if netloc.startswith("www.") else netloc
+
+
+def extract_social_links(anchors, base_url):
+    """
+    Find the company blog and YouTube, Twitter & Facebook profiles among the
+    page anchors (see `extract_page`). Links in header/footer/nav or marked
+    `rel=me` are preferred.
+    Returns a dict with `blog_url`, `youtube`, `twitter` and `facebook` (empty if not found).
+    """
+    site_domain = host_domain(urlparse(base_url).netloc)
+    best = {key: (0, "") for key in ("blog_url", *SOCIAL_DOMAINS)}
+
+    def offer(key, score, url):
+        if score > best[key][0]:
+            best[key] = (score, url)
+
+    for anchor in anchors:
+        if anchor.href.startswith(("mailto:", "tel:", "javascript:", "#")):
+            continue
+        url = urljoin(base_url, anchor.href)
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https"):
+            continue
+        domain = host_domain(parsed.netloc)
+
+        score = 1
+        if "me" in anchor.rel:
+            score += 3
+        if anchor.chrome:
+            score += 1
+
+        for key, domains in SOCIAL_DOMAINS.items():
+            if any(domain == d or domain.endswith("." + d) for d in domains):
+                path = parsed.path or "/"
+                if path == "/" or SOCIAL_IGNORED_PATHS.search(path):
+                    break
+                if key == "youtube" and SOCIAL_PROFILE_PATHS.search(path):
+                    score += 2
+                offer(key, score, url)
+                break
+        else:
+            # Blog: a section or a subdomain of the company website
+            if domain != site_domain and not domain.endswith("." + site_domain):
+                continue
+            first_segment = parsed.path.strip("/").split("/")[0].lower()
+            subdomain = domain[: -len(site_domain)].rstrip(".")
+            text = anchor.text.lower()
+            if first_segment in BLOG_SECTIONS or subdomain in BLOG_SECTIONS:
+                # The section index is preferred over single articles
+                if parsed.path.strip("/").count("/") == 0:
+                    score += 2
+                if text in BLOG_SECTIONS:
+                    score += 2
+                if "blog" in (first_segment, subdomain):
+                    score += 1
+                offer("blog_url", score, url)
+
+    return {key: url for key, (_, url) in best.items()}
+
+
+@track_usage("scrape_website")
 def scrape_website_to_markdown(url: str) -> str:
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.77 Safari/537.36",
-        "Accept-Language": "en-US,en;q=0.5",
-        "Accept-Encoding": "gzip, deflate",
-    }
-
-    # Make the HTTP request
-    response = requests.get(url, headers=headers)
-    if response.status_code != 200:
-        raise Exception(f"Failed to fetch the URL. Status code: {response.status_code}")
-
-    # Parse the HTML
-    soup = BeautifulSoup(response.text, "html.parser")
-    html_content = soup.prettify()
-
-    # Convert HTML to markdown
-    h = html2text.HTML2Text()
-    h.ignore_links = False
-    h.ignore_images = True
-    h.ignore_tables = True
-    markdown_content = h.handle(html_content)
-
-    # Clean up excess newlines
-    markdown_content = re.sub(r"\n{3,}", "\n\n", markdown_content)
-    markdown_content = markdown_content.strip()
-
-    return markdown_content
+    # Cached pages are served with their markdown, others are parsed once
+    return page_markdown(fetch_page(url))
+
+
+@track_usage("scrape_website")
+def scrape_website_with_links(url: str):
+    """
+    Scrape the website as markdown along with its blog & social media links
+    found in the HTML (see `extract_social_links`).
+    """
+    return _parse_with_links(fetch_page(url))
+
+
+@track_usage("scrape_website")
+async def ascrape_website_to_markdown(url: str) -> str:
+    """
+    Async version of `scrape_website_to_markdown`, parsing runs in a thread
+    so large pages don't block the event loop.
+    """
+    page = await afetch_page(url)
+    if page.markdown is not None:
+        return page.markdown
+    return await asyncio.to_thread(page_markdown, page)
+
+
+@track_usage("scrape_website")
+async def ascrape_website_with_links(url: str):
+    """
+    Async version of `scrape_website_with_links`.
+    """
+    page = await afetch_page(url)
+    return await asyncio.to_thread(_parse_with_links, page)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,61 @@
+import os
+import logging
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse
+from .markdown_scraper_tool import host_domain
+from .site_crawler import fetch_site_page, normalize_url
+
+logger = logging.getLogger(__name__)
+
+# Download the home page, sitemap & conventional pages of a company website
+# as soon as it is known, while the LLM calls & API lookups of the lead run
+PREFETCH_PAGES = os.getenv("PREFETCH_PAGES", "true").lower() in ("1", "true", "yes")
+PREFETCH_PATHS = [
+    path.strip()
+    for path in os.getenv("PREFETCH_PATHS", "/blog,/news,/about").split(",")
+    if path.strip()
+]
+# Prefetches run in their own small pool, so the speculative downloads of
+# later leads never queue ahead of the crawl of the current one
+PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", "4"))
+
+# Email providers, not company websites
+WEBMAIL_DOMAINS = {
+    "gmail.com", "googlemail.com", "yahoo.com", "outlook.com", "hotmail.com",
+    "live.com", "msn.com", "icloud.com", "me.com", "aol.com", "proton.me",
+    "protonmail.com", "gmx.com", "mail.com", "zoho.com", "yandex.com",
+}
+
+_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch")
+
+
+def _prefetch(url):
+    try:
+        fetch_site_page(url)
+    except Exception as e:
+        # Speculative: most sites don't have all the conventional pages
+        logger.debug(f"Prefetch of {url} failed: {e}")
+
+
+def _site(website):
+    return host_domain(urlparse(normalize_url(website)).netloc) if website else ""
+
+
+def prefetch_site(website, prefetched=None):
+    """
+    Start downloading the pages of a company website into the HTTP cache in
+    the background (within the crawl politeness limits). Scraping one of them
+    later is served from the cache, or waits for the download in progress.
+    Nothing is done for webmail domains or when `website` is the same site as
+    `prefetched` (a website already prefetched for the lead).
+    """
+    site = _site(website)
+    if not PREFETCH_PAGES or not site or site in WEBMAIL_DOMAINS or site == _site(prefetched):
+        return
+    home_url = normalize_url(website)
+    urls = [home_url, urljoin(home_url, "/sitemap.xml")]
+    urls += [urljoin(home_url, path) for path in PREFETCH_PATHS]
+    for url in dict.fromkeys(urls):
+        _executor.submit(contextvars.copy_context().run, _prefetch, url)
+    logger.info(f"Prefetching {len(urls)} pages of {home_url}")
@@ -0,0 +1,119 @@
+import os
+import re
+import logging
+from src.usage import record_usage
+from src.llm.rate_limiter import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Longest text value kept per field (descriptions, about...), in characters
+PROMPT_FIELD_MAX_CHARS = int(os.getenv("PROMPT_FIELD_MAX_CHARS", "500"))
+# Most items kept per list (experiences, skills...)
+PROMPT_LIST_MAX_ITEMS = int(os.getenv("PROMPT_LIST_MAX_ITEMS", "15"))
+# Token budget of one serialized record, extra lines are cut
+PROMPT_DATA_TOKEN_BUDGET = int(os.getenv("PROMPT_DATA_TOKEN_BUDGET", "3000"))
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def _is_empty(value):
+    # Missing data only: False and 0 are values the LLM must see
+    return value is None or (isinstance(value, (str, list, tuple, dict)) and not value)
+
+
+def _scalar(value, max_chars):
+    if isinstance(value, bool):
+        return "yes" if value else "no"
+    text = WHITESPACE_PATTERN.sub(" ", str(value)).strip()
+    if len(text) > max_chars:
+        text = text[:max_chars].rsplit(" ", 1)[0] + "…"
+    return text
+
+
+def _prune(value):
+    # Drop empty fields recursively
+    if isinstance(value, dict):
+        pruned = {key: _prune(item) for key, item in value.items()}
+        return {key: item for key, item in pruned.items() if not _is_empty(item)}
+    if isinstance(value, (list, tuple)):
+        pruned = [_prune(item) for item in value]
+        return [item for item in pruned if not _is_empty(item)]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def _inline(value, max_chars, max_items):
+    """
+    One-line form of a value: `a, b, c` for lists, `k: v; k: v` for dicts.
+    """
+    if isinstance(value, dict):
+        return "; ".join(
+            f"{key}: {_inline(item, max_chars, max_items)}" for key, item in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        items = [_inline(item, max_chars, max_items) for item in value[:max_items]]
+        if len(value) > max_items:
+            items.append(f"(+{len(value) - max_items} more)")
+        return ", ".join(items)
+    return _scalar(value, max_chars)
+
+
+def _lines(data, max_chars, max_items):
+    lines = []
+    for key, value in data.items():
+        if isinstance(value, (list, tuple)) and any(isinstance(item, dict) for item in value):
+            # Records (experiences, educations...): one line each
+            lines.append(f"{key}:")
+            for item in value[:max_items]:
+                lines.append(f"- {_inline(item, max_chars, max_items)}")
+            if len(value) > max_items:
+                lines.append(f"- (+{len(value) - max_items} more)")
+        else:
+            lines.append(f"{key}: {_inline(value, max_chars, max_items)}")
+    return lines
+
+
+def compact_serialize(
+    data,
+    label="data",
+    max_chars=None,
+    max_items=None,
+    token_budget=None,
+):
+    """
+    Serialize structured data (dicts/lists scraped from APIs) for a prompt in
+    a dense line-oriented format: empty fields are dropped, long texts and
+    lists are cut and the whole record is kept within the token budget.
+    Records the tokens saved compared to the Python `repr` of the data.
+    """
+    max_chars = max_chars or PROMPT_FIELD_MAX_CHARS
+    max_items = max_items or PROMPT_LIST_MAX_ITEMS
+    token_budget = token_budget or PROMPT_DATA_TOKEN_BUDGET
+
+    pruned = _prune(data)
+    if isinstance(pruned, dict):
+        lines = _lines(pruned, max_chars, max_items)
+    elif isinstance(pruned, (list, tuple)):
+        lines = [f"- {_inline(item, max_chars, max_items)}" for item in pruned]
+    else:
+        lines = [_scalar(pruned, max_chars)] if not _is_empty(pruned) else []
+
+    serialized, tokens = [], 0
+    for line in lines:
+        tokens += estimate_tokens(line) + 1
+        if tokens > token_budget:
+            serialized.append("(truncated)")
+            break
+        serialized.append(line)
+    serialized = "\n".join(serialized)
+
+    original_tokens = estimate_tokens(repr(data))
+    saved_tokens = max(0, original_tokens - estimate_tokens(serialized))
+    if original_tokens:
+        logger.info(
+            f"Serialized {label} in ~{original_tokens - saved_tokens} tokens "
+            f"instead of ~{original_tokens} (-{100 * saved_tokens / original_tokens:.0f}%)"
+        )
+    record_usage("prompt_serialization", saved_tokens=saved_tokens)
+    return serialized
@@ -1,7 +1,9 @@
 import os
 import json
-import requests
+from src.usage import track_usage
+from .http_client import get_http_client, get_async_client
 
+@track_usage("google_search")
 def google_search(query):
     """
     Performs a Google search using the provided query.
@@ -12,10 +14,11 @@ def google_search(query):
         'X-API-KEY': os.environ['SERPER_API_KEY'],
         'content-type': 'application/json'
     }
-    response = requests.request("POST", url, headers=headers, data=payload)
+    response = get_http_client().post(url, headers=headers, content=payload)
     results = response.json().get('organic', [])
     return results
 
+@track_usage("google_news")
 def get_recent_news(company: str) -> str:
     url = "https://google.serper.dev/news"
     
@@ -33,24 +36,61 @@ def get_recent_news(company: str) -> str:
     }
     
     # Make the POST request to the API
-    response = requests.post(url, headers=headers, data=payload)
+    response = get_http_client().post(url, headers=headers, content=payload)
     
     # Check if the response is successful
     if response.status_code == 200:
-        news = response.json().get("news", [])
-        
-        # Prepare the string to return
-        news_string = ""
-        news.reverse()  # Reverse the list to get the most recent news first
-        
-        for item in news:
-            title = item.get('title')
-            snippet = item.get('snippet')
-            date = item.get('date')
-            link = item.get('link')
-            
-            news_string += f"Title: {title}\nSnippet: {snippet}\nDate: {date}\nURL: {link}\n\n"
-        
-        return news_string
+        return format_news(response.json().get("news", []))
     else:
-        return f"Error fetching news: {response.status_code}"
\ No newline at end of file
+        return f"Error fetching news: {response.status_code}"
+
+
+def format_news(news):
+    # Prepare the string to return
+    news_string = ""
+    news.reverse()  # Reverse the list to get the most recent news first
+
+    for item in news:
+        title = item.get('title')
+        snippet = item.get('snippet')
+        date = item.get('date')
+        link = item.get('link')
+
+        news_string += f"Title: {title}\nSnippet: {snippet}\nDate: {date}\nURL: {link}\n\n"
+
+    return news_string
+
+
+@track_usage("google_search")
+async def agoogle_search(query):
+    """
+    Async version of `google_search`.
+    """
+    headers = {
+        'X-API-KEY': os.environ['SERPER_API_KEY'],
+        'content-type': 'application/json'
+    }
+    response = await get_async_client().post(
+        "https://google.serper.dev/search", headers=headers, json={"q": query}
+    )
+    return response.json().get('organic', [])
+
+
+@track_usage("google_news")
+async def aget_recent_news(company: str) -> str:
+    """
+    Async version of `get_recent_news`.
+    """
+    headers = {
+        'X-API-KEY': os.getenv("SERPER_API_KEY"),
+        'Content-Type': 'application/json'
+    }
+    response = await get_async_client().post(
+        "https://google.serper.dev/news",
+        headers=headers,
+        json={"q": company, "num": 20, "tbs": "qdr:y"},
+    )
+    if response.status_code == 200:
+        return format_news(response.json().get("news", []))
+    else:
+        return f"Error fetching news: {response.status_code}"
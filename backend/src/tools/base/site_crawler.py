@@ -0,0 +1,261 @@
+import os
+import re
+import time
+import asyncio
+import logging
+import threading
+import contextvars
+from collections import defaultdict
+from contextlib import contextmanager, asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, urljoin
+from src.usage import track_usage
+from .markdown_scraper_tool import (
+    fetch_page,
+    afetch_page,
+    host_domain,
+    page_markdown,
+    parse_page,
+    extract_social_links,
+)
+from .boilerplate import strip_site_pages
+
+logger = logging.getLogger(__name__)
+
+# Pages fetched per company website (home page included)
+CRAWL_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", "5"))
+# Requests in flight across all crawls of the process, and per host
+CRAWL_MAX_CONNECTIONS = int(os.getenv("CRAWL_MAX_CONNECTIONS", "32"))
+CRAWL_PER_HOST_CONNECTIONS = int(os.getenv("CRAWL_PER_HOST_CONNECTIONS", "2"))
+# Minimum delay between two requests started to the same host
+CRAWL_HOST_DELAY_SECONDS = float(os.getenv("CRAWL_HOST_DELAY_SECONDS", "0.25"))
+
+# High-value pages looked for in the home page anchors & the sitemap, in order
+PAGE_KEYWORDS = {
+    "about": ("about", "about-us", "company", "who-we-are", "our-story"),
+    "products": ("products", "services", "solutions", "platform", "features"),
+}
+SITEMAP_LOC_PATTERN = re.compile(r"<loc>\s*([^<\s]+)\s*</loc>", re.IGNORECASE)
+
+_executor = ThreadPoolExecutor(max_workers=CRAWL_MAX_CONNECTIONS, thread_name_prefix="crawl")
+
+
+class HostLimiter:
+    """
+    Politeness limits shared by the sync & async crawls of the process:
+    a global connection budget, a per-host connection limit and a minimum
+    delay between requests to the same host.
+    """
+
+    def __init__(self, max_connections, per_host, host_delay):
+        self.max_connections = max_connections
+        self.per_host = per_host
+        self.host_delay = host_delay
+        self.total = 0
+        self.per_host_count = defaultdict(int)
+        self.next_request_at = defaultdict(float)
+        self.lock = threading.Lock()
+
+    def _try_acquire(self, host):
+        # Returns 0 once a slot is taken, else the time to wait before retrying
+        with self.lock:
+            now = time.monotonic()
+            if self.total >= self.max_connections or self.per_host_count[host] >= self.per_host:
+                return 0.05
+            if now < self.next_request_at[host]:
+                return self.next_request_at[host] - now
+            self.total += 1
+            self.per_host_count[host] += 1
+            self.next_request_at[host] = now + self.host_delay
+            return 0
+
+    def acquire(self, host):
+        while (wait := self._try_acquire(host)) > 0:
+            time.sleep(wait)
+
+    async def aacquire(self, host):
+        while (wait := self._try_acquire(host)) > 0:
+            await asyncio.sleep(wait)
+
+    def release(self, host):
+        with self.lock:
+            self.total -= 1
+            self.per_host_count[host] -= 1
+
+    @contextmanager
+    def limit(self, url):
+        host = host_domain(urlparse(url).netloc)
+        self.acquire(host)
+        try:
+            yield
+        finally:
+            self.release(host)
+
+    @asynccontextmanager
+    async def alimit(self, url):
+        host = host_domain(urlparse(url).netloc)
+        await self.aacquire(host)
+        try:
+            yield
+        finally:
+            self.release(host)
+
+
+host_limiter = HostLimiter(
+    CRAWL_MAX_CONNECTIONS, CRAWL_PER_HOST_CONNECTIONS, CRAWL_HOST_DELAY_SECONDS
+)
+
+
+def normalize_url(url):
+    """
+    Website URL with a scheme ("acme.com" -> "https://acme.com").
+    """
+    url = url.strip()
+    return url if urlparse(url).scheme else f"https://{url}"
+
+
+def fetch_site_page(url):
+    """
+    Fetch a page of a company website within the crawl politeness limits
+    (pages served from the HTTP cache don't count against them).
+    """
+    return fetch_page(url, limit=host_limiter.limit)
+
+
+async def afetch_site_page(url):
+    return await afetch_page(url, limit=host_limiter.alimit)
+
+
+def sitemap_urls(sitemap_xml):
+    return SITEMAP_LOC_PATTERN.findall(sitemap_xml or "")
+
+
+def _page_kind(url, text=""):
+    path = urlparse(url).path.strip("/").lower()
+    first_segment = path.split("/")[0]
+    text = text.lower().strip()
+    for kind, keywords in PAGE_KEYWORDS.items():
+        if first_segment in keywords or text in keywords or text.replace(" ", "-") in keywords:
+            return kind
+    return None
+
+
+def plan_pages(home_url, anchors, sitemap=None):
+    """
+    Pick the pages worth fetching besides the home page: the blog index
+    (see `extract_social_links`), then about & products pages found in the
+    home page anchors, or in the sitemap when the anchors have none.
+    Returns the social links and {kind: url}.
+    """
+    links = extract_social_links(anchors, home_url)
+    site_domain = host_domain(urlparse(home_url).netloc)
+    planned = {}
+    if links.get("blog_url"):
+        planned["blog"] = links["blog_url"]
+
+    def offer(kind, url):
+        # Section indexes (shortest paths) are preferred over sub-pages
+        if kind and (kind not in planned or len(url) < len(planned[kind])):
+            planned[kind] = url
+
+    for anchor in anchors:
+        url = urljoin(home_url, anchor.href).split("#")[0]
+        if host_domain(urlparse(url).netloc) != site_domain:
+            continue
+        offer(_page_kind(url, anchor.text), url)
+
+    for url in sitemap_urls(sitemap):
+        kind = _page_kind(url)
+        if kind and kind not in planned and host_domain(urlparse(url).netloc) == site_domain:
+            offer(kind, url)
+
+    # Keep the home page within the page budget
+    kinds = ["blog", *PAGE_KEYWORDS]
+    planned = {kind: planned[kind] for kind in kinds if kind in planned}
+    return links, dict(list(planned.items())[: max(0, CRAWL_MAX_PAGES - 1)])
+
+
+def _fetch_markdown(url):
+    return page_markdown(fetch_site_page(url))
+
+
+def _submit(fn, *args):
+    return _executor.submit(contextvars.copy_context().run, fn, *args)
+
+
+@track_usage("crawl_website")
+def crawl_company_site(url):
+    """
+    Fetch the home page and sitemap of a company website, then its blog
+    index, about & products pages, concurrently within the politeness limits.
+    Returns ({kind: {"url", "markdown"}}, social links) with the home page
+    under "home"; pages that fail are left out, a failing home page raises.
+    """
+    home_url = normalize_url(url)
+    home = _submit(fetch_site_page, home_url)
+    sitemap = _submit(fetch_site_page, urljoin(home_url, "/sitemap.xml"))
+
+    home_markdown, anchors = parse_page(home.result())
+    try:
+        sitemap_xml = sitemap.result().html
+    except Exception:
+        sitemap_xml = ""
+    links, planned = plan_pages(home_url, anchors, sitemap_xml)
+
+    futures = {kind: _submit(_fetch_markdown, page_url) for kind, page_url in planned.items()}
+    pages = {"home": {"url": home_url, "markdown": home_markdown}}
+    for kind, future in futures.items():
+        try:
+            pages[kind] = {"url": planned[kind], "markdown": future.result()}
+        except Exception as e:
+            logger.info(f"Could not crawl {kind} page {planned[kind]}: {e}")
+    logger.info(f"Crawled {len(pages)} pages of {home_url} ({', '.join(pages)})")
+    return strip_site_pages(home_url, pages), links
+
+
+@track_usage("crawl_website")
+async def acrawl_company_site(url):
+    """
+    Async version of `crawl_company_site`.
+    """
+    home_url = normalize_url(url)
+    home_page, sitemap = await asyncio.gather(
+        afetch_site_page(home_url),
+        afetch_site_page(urljoin(home_url, "/sitemap.xml")),
+        return_exceptions=True,
+    )
+    if isinstance(home_page, Exception):
+        raise home_page
+    sitemap_xml = "" if isinstance(sitemap, Exception) else sitemap.html
+
+    home_markdown, anchors = await asyncio.to_thread(parse_page, home_page)
+    links, planned = plan_pages(home_url, anchors, sitemap_xml)
+
+    async def fetch_markdown(page_url):
+        page = await afetch_site_page(page_url)
+        if page.markdown is not None:
+            return page.markdown
+        return await asyncio.to_thread(page_markdown, page)
+
+    results = await asyncio.gather(
+        *(fetch_markdown(page_url) for page_url in planned.values()), return_exceptions=True
+    )
+    pages = {"home": {"url": home_url, "markdown": home_markdown}}
+    for (kind, page_url), result in zip(planned.items(), results):
+        if isinstance(result, Exception):
+            logger.info(f"Could not crawl {kind} page {page_url}: {result}")
+            continue
+        pages[kind] = {"url": page_url, "markdown": result}
+    logger.info(f"Crawled {len(pages)} pages of {home_url} ({', '.join(pages)})")
+    return strip_site_pages(home_url, pages), links
+
+
+def website_content(pages):
+    """
+    Markdown of the crawled home, about & products pages for the website summary.
+    """
+    return "\n\n".join(
+        f"# Page: {pages[kind]['url']}\n\n{pages[kind]['markdown']}"
+        for kind in ("home", *PAGE_KEYWORDS)
+        if kind in pages and pages[kind]["markdown"]
+    )
@@ -1,5 +1,6 @@
-from src.utils import invoke_llm
-from .base.linkedin_tools import scrape_linkedin
+from src.utils import invoke_llm, ainvoke_llm
+from .base.linkedin_tools import scrape_linkedin, ascrape_linkedin
+from .base.prompt_serializer import compact_serialize
 
 CREATE_COMPANY_PROFILE = """
 ### Role  
@@ -29,7 +30,19 @@ def research_lead_company(linkedin_url):
     # Scrape company LinkedIn profile
     if not linkedin_url:
         return {}
-    company_page_content = scrape_linkedin(linkedin_url, True)
+    return structure_company_profile(scrape_linkedin(linkedin_url, True))
+
+
+async def aresearch_lead_company(linkedin_url):
+    """
+    Async version of `research_lead_company`.
+    """
+    if not linkedin_url:
+        return {}
+    return structure_company_profile(await ascrape_linkedin(linkedin_url, True))
+
+
+def structure_company_profile(company_page_content):
     if not company_page_content:
         return {}
 
@@ -42,20 +55,38 @@ def research_lead_company(linkedin_url):
         "industries": company_profile.get("industries", []),
         "specialties": company_profile.get("specialties", ""),
         "employee_count": company_profile.get("employee_count", ""),
-        "social_metrics": {"follower_count": company_profile.get("follower_count", 0)},
+        "social_metrics": {"follower_count": company_profile.get("follower_count")},
         "locations": company_profile.get("locations", []),
     }
 
 
-def generate_company_profile(company_linkedin_info, scraped_website):
-    # Get company profile summary
-    inputs = (
+def build_company_profile_inputs(company_linkedin_info, scraped_website):
+    if not isinstance(company_linkedin_info, str):
+        company_linkedin_info = compact_serialize(
+            company_linkedin_info, label="company LinkedIn data"
+        )
+    return (
         f"# Scraped Website:\n {scraped_website}\n\n"
         f"# Company LinkedIn Information:\n{company_linkedin_info}"
     )
+
+
+def generate_company_profile(company_linkedin_info, scraped_website):
+    # Get company profile summary
     profile_summary = invoke_llm(
         system_prompt=CREATE_COMPANY_PROFILE,
-        user_message=inputs,
+        user_message=build_company_profile_inputs(company_linkedin_info, scraped_website),
         model="gemini-2.5-pro",
     )
     return profile_summary
+
+
+async def agenerate_company_profile(company_linkedin_info, scraped_website):
+    """
+    Async version of `generate_company_profile`.
+    """
+    return await ainvoke_llm(
+        system_prompt=CREATE_COMPANY_PROFILE,
+        user_message=build_company_profile_inputs(company_linkedin_info, scraped_website),
+        model="gemini-2.5-pro",
+    )
@@ -1,8 +1,24 @@
 import os, re
+import asyncio
 import tempfile
+import threading
+import functools
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaFileUpload
 from src.utils import get_google_credentials
+from src.usage import track_usage
+
+
+def _serialized(method):
+    # The API client (httplib2) isn't thread-safe: the calls of the leads
+    # running in parallel (run_batch.py, async helpers) go one at a time.
+    # Reentrant, public methods call each other
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
 
 
 class GoogleDocsManager:
@@ -10,7 +26,27 @@ class GoogleDocsManager:
         # Disable cache_discovery to suppress oauth2client deprecation warning
         self.docs_service = build("docs", "v1", credentials=get_google_credentials(), cache_discovery=False)
         self.drive_service = build("drive", "v3", credentials=get_google_credentials(), cache_discovery=False)
+        self.lock = threading.RLock()
+
+    async def _run_async(self, fn, *args, **kwargs):
+        # googleapiclient is sync-only: calls run in a worker thread
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+    async def aensure_folder_path(self, folder_path, make_shareable=False):
+        return await self._run_async(self.ensure_folder_path, folder_path, make_shareable)
+
+    async def adocument_exists_in_folder(self, folder_path: str, title: str) -> bool:
+        return await self._run_async(self.document_exists_in_folder, folder_path, title)
+
+    async def aadd_document(self, content, doc_title, folder_name, **kwargs):
+        return await self._run_async(self.add_document, content, doc_title, folder_name, **kwargs)
+
+    async def aupload_file(self, file_path, file_name, folder_name, make_shareable=False):
+        return await self._run_async(
+            self.upload_file, file_path, file_name, folder_name, make_shareable
+        )
 
+    @_serialized
     def folder_has_files(self, folder_path: str) -> bool:
         """
         Check if the given Drive folder (by path) already contains any files.
@@ -32,6 +68,8 @@ class GoogleDocsManager:
             print(f"Failed to check files in Drive folder '{folder_path}': {e}")
             return False
 
+    @_serialized
+    @track_usage("google_drive")
     def document_exists_in_folder(self, folder_path: str, title: str) -> bool:
         """
         Check if a document with the given title already exists in the specified folder path.
@@ -60,6 +98,8 @@ class GoogleDocsManager:
             )
             return False
 
+    @_serialized
+    @track_usage("google_drive")
     def add_document(
         self,
         content,
@@ -125,6 +165,7 @@ class GoogleDocsManager:
             print(f"An error occurred: {e}")
             return None
 
+    @_serialized
     def get_document(self, doc_url):
         """
         Retrieve the content of a Google Document by its URL.
@@ -253,6 +294,8 @@ class GoogleDocsManager:
             print(f"An error occurred while creating nested folder path '{path}': {e}")
             return None, None
 
+    @_serialized
+    @track_usage("google_drive")
     def ensure_folder_path(self, folder_path, make_shareable=False):
         """
         Public helper to ensure a folder (optionally nested) exists.
@@ -316,6 +359,8 @@ class GoogleDocsManager:
                     os.remove(temp_file_path)
                 except Exception:
                     pass
+    @_serialized
+    @track_usage("google_drive")
     def upload_file(self, file_path, file_name, folder_name, make_shareable=False):
         """
         Upload a binary file to Google Drive.
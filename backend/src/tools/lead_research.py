@@ -1,6 +1,12 @@
-from src.utils import invoke_llm
-from .base.search_tools import google_search
-from .base.linkedin_tools import extract_linkedin_url, scrape_linkedin
+from src.utils import invoke_llm, ainvoke_llm
+from .base.prompt_serializer import compact_serialize
+from .base.search_tools import google_search, agoogle_search
+from .base.linkedin_tools import (
+    extract_linkedin_url,
+    aextract_linkedin_url,
+    scrape_linkedin,
+    ascrape_linkedin,
+)
 
 
 SUMMARIZE_LINKEDIN_PROFILE = """
@@ -47,7 +53,7 @@ def research_lead_on_linkedin(lead_name, lead_email):
     # Find lead LinkedIn URL by searching on Google 'LinkedIn {{lead name}} {{company name}}'
     query = f"LinkedIn {lead_name} {company_name}"
     search_results = google_search(query)
-    lead_linkedin_url = extract_linkedin_url(search_results)
+    lead_linkedin_url = extract_linkedin_url(search_results, lead_name, company_name)
     if not lead_linkedin_url:
         return "Lead LinkedIn URL not found."
 
@@ -56,8 +62,43 @@ def research_lead_on_linkedin(lead_name, lead_email):
     if "data" not in linkedin_data:
         return "LinkedIn profile not found"
 
-    # Summarize collected information about lead
+    # Get Lead Linkedin profile summary
+    profile_data = linkedin_data["data"]
+    profile_summary = invoke_llm(
+        system_prompt=SUMMARIZE_LINKEDIN_PROFILE,
+        user_message=build_profile_inputs(lead_name, profile_data),
+        model="gemini-2.5-pro",
+    )
+    return (profile_summary, *company_details(profile_data))
+
+
+async def aresearch_lead_on_linkedin(lead_name, lead_email):
+    """
+    Async version of `research_lead_on_linkedin`.
+    """
+    company_name = extract_company_name(lead_email)
+
+    query = f"LinkedIn {lead_name} {company_name}"
+    search_results = await agoogle_search(query)
+    lead_linkedin_url = await aextract_linkedin_url(search_results, lead_name, company_name)
+    if not lead_linkedin_url:
+        return "Lead LinkedIn URL not found."
+
+    linkedin_data = await ascrape_linkedin(lead_linkedin_url)
+    if "data" not in linkedin_data:
+        return "LinkedIn profile not found"
+
     profile_data = linkedin_data["data"]
+    profile_summary = await ainvoke_llm(
+        system_prompt=SUMMARIZE_LINKEDIN_PROFILE,
+        user_message=build_profile_inputs(lead_name, profile_data),
+        model="gemini-2.5-pro",
+    )
+    return (profile_summary, *company_details(profile_data))
+
+
+def build_profile_inputs(lead_name, profile_data):
+    # Summarize collected information about lead
     lead_profile_content = {
         "about": profile_data.get("about", ""),
         "full_name": profile_data.get("full_name", ""),
@@ -86,7 +127,7 @@ def research_lead_on_linkedin(lead_name, lead_email):
                 "company": exp.get("company", ""),
                 "title": exp.get("title", ""),
                 "date_range": exp.get("date_range", ""),
-                "is_current": exp.get("is_current", False),
+                "is_current": exp.get("is_current"),
                 "location": exp.get("location", ""),
                 "description": exp.get("description", ""),
             }
@@ -128,20 +169,16 @@ def research_lead_on_linkedin(lead_name, lead_email):
         ],
     }
 
+    return (
+        f"# Lead Name: {lead_name}\n\n"
+        f"# LinkedIn Scraped Information:\n"
+        f"{compact_serialize(lead_profile_content, label='lead LinkedIn profile')}"
+    )
+
+
+def company_details(profile_data):
     # Extract the exact company name and LinkedIn & website url for later research
     company_name = profile_data.get("company", "")
     company_website = profile_data.get("company_website", "")
     company_linkedin_url = profile_data.get("company_linkedin_url", "")
-
-    # Get Lead Linkedin profile summary
-    inputs = (
-        f"# Lead Name: {lead_name}\n\n"
-        f"# LinkedIn Scraped Information:\n{lead_profile_content}"
-    )
-    profile_summary = invoke_llm(
-        system_prompt=SUMMARIZE_LINKEDIN_PROFILE,
-        user_message=inputs,
-        model="gemini-2.5-pro",
-    )
-
-    return (profile_summary, company_name, company_website, company_linkedin_url)
+    return company_name, company_website, company_linkedin_url
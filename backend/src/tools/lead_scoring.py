@@ -0,0 +1,159 @@
+import os
+import time
+import logging
+import threading
+import weakref
+from contextlib import nullcontext
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from src.utils import invoke_llm
+from src.llm.batch import batch_collector, batch_worker
+from src.prompts import SCORE_LEAD_PROMPT, BATCH_SCORE_LEAD_PROMPT
+from src.structured_outputs import LeadScores
+
+logger = logging.getLogger(__name__)
+
+# Leads scored together in one LLM call, 1 disables micro-batching.
+# Only used in batch jobs (run_batch.py), where several leads are in flight at once
+LEAD_SCORE_BATCH_SIZE = int(os.getenv("LEAD_SCORE_BATCH_SIZE", "1"))
+# Longest a lead waits for others to fill its batch before being scored
+LEAD_SCORE_BATCH_WAIT_SECONDS = float(os.getenv("LEAD_SCORE_BATCH_WAIT_SECONDS", "5"))
+# How often a waiting lead checks whether other leads may still join its batch
+LEAD_SCORE_POLL_SECONDS = 0.25
+
+
+def score_single_lead(global_research_report):
+    lead_score = invoke_llm(
+        system_prompt=SCORE_LEAD_PROMPT,
+        user_message=global_research_report,
+        model="gemini-2.5-pro",
+    )
+    return lead_score.strip()
+
+
+def _valid_score(score):
+    return score is not None and 1 <= score <= 10
+
+
+class ScoreRequest:
+    def __init__(self, lead_id, report):
+        self.lead_id = lead_id
+        self.report = report
+        self.future = Future()
+
+
+class LeadScoreBatcher:
+    """
+    Collects the global research reports of concurrently processed leads and
+    scores up to `batch_size` of them in one structured LLM call. The thread
+    filling the batch (or the first one to time out) makes the call for all.
+    A batch is scored at once when no other lead of the batch job may still
+    join it, so a lone lead (or any lead outside a batch job) doesn't wait.
+    Leads missing from, or with an invalid score in, the batch output (or all
+    of them if the call fails) are scored on their own by their thread.
+    """
+
+    def __init__(self, batch_size=None, max_wait=None):
+        self.batch_size = batch_size or LEAD_SCORE_BATCH_SIZE
+        self.max_wait = LEAD_SCORE_BATCH_WAIT_SECONDS if max_wait is None else max_wait
+        self.pending = []
+        self.lock = threading.Lock()
+        # Lead workers of each batch job that reached the scoring
+        self.scorers = weakref.WeakKeyDictionary()
+
+    def _take(self):
+        batch, self.pending = self.pending[: self.batch_size], self.pending[self.batch_size :]
+        return batch
+
+    def _others_to_score(self, collector):
+        # Leads of the batch job still running that haven't reached the scoring
+        if collector is None:
+            return False
+        return bool(collector.running_workers() - self.scorers.get(collector, set()))
+
+    def score(self, lead_id, global_research_report):
+        request = ScoreRequest(lead_id, global_research_report)
+        collector = batch_collector.get()
+        with self.lock:
+            if collector is not None:
+                self.scorers.setdefault(collector, set()).add(batch_worker.get())
+            self.pending.append(request)
+            full = len(self.pending) >= self.batch_size or not self._others_to_score(collector)
+            batch = self._take() if full else None
+        if batch:
+            self._run(batch)
+        # In batch jobs, a lead waiting here doesn't hold back the LLM batches
+        with collector.blocked() if collector else nullcontext():
+            deadline = time.monotonic() + self.max_wait
+            while True:
+                timeout = max(0, min(LEAD_SCORE_POLL_SECONDS, deadline - time.monotonic()))
+                try:
+                    score = request.future.result(timeout=timeout)
+                    break
+                except FutureTimeout:
+                    pass
+                with self.lock:
+                    if request not in self.pending:
+                        # Taken by another thread, its batch is being scored
+                        batch = None
+                    elif time.monotonic() >= deadline or not self._others_to_score(collector):
+                        # Nobody filled the batch in time, or nobody else will:
+                        # score what's waiting now
+                        batch = self._take()
+                    else:
+                        continue
+                if batch:
+                    self._run(batch)
+                score = request.future.result()
+                break
+        return score if score is not None else score_single_lead(global_research_report)
+
+    def _run(self, batch):
+        try:
+            scores = self._score_batch(batch) if len(batch) > 1 else {}
+        except Exception as e:
+            logger.warning(f"Batched scoring of {len(batch)} leads failed, scoring them one by one: {e}")
+            scores = {}
+        for request in batch:
+            score = scores.get(request.lead_id)
+            request.future.set_result(f"{score:g}" if score is not None else None)
+
+    def _score_batch(self, batch):
+        # Lead ids are made unique within the batch (leads of different jobs may share ids)
+        keys = {}
+        for index, request in enumerate(batch, start=1):
+            request.lead_id = f"{index}-{request.lead_id}"
+            keys[request.lead_id] = request
+        inputs = "\n\n---\n\n".join(
+            f"# Lead: {request.lead_id}\n\n{request.report}" for request in batch
+        )
+        started_at = time.monotonic()
+        output = invoke_llm(
+            system_prompt=BATCH_SCORE_LEAD_PROMPT.format(scoring_instructions=SCORE_LEAD_PROMPT),
+            user_message=inputs,
+            model="gemini-2.5-pro",
+            response_format=LeadScores,
+        )
+        scores = {
+            item.lead_id.strip(): item.score
+            for item in output.scores
+            if item.lead_id.strip() in keys and _valid_score(item.score)
+        }
+        missing = len(batch) - len(scores)
+        logger.info(
+            f"Scored {len(scores)} leads in one call ({time.monotonic() - started_at:.1f}s)"
+            + (f", {missing} left to score one by one" if missing else "")
+        )
+        return scores
+
+
+lead_score_batcher = LeadScoreBatcher()
+
+
+def score_lead_report(lead_id, global_research_report):
+    """
+    Score a lead from its global research report, through the micro-batcher
+    when LEAD_SCORE_BATCH_SIZE > 1. Returns the score as a string.
+    """
+    if lead_score_batcher.batch_size <= 1:
+        return score_single_lead(global_research_report)
+    return lead_score_batcher.score(str(lead_id), global_research_report)
@@ -0,0 +1,22 @@
+import threading
+from .lead_loader_base import LeadLoaderBase
+
+
+class SingleLeadLoader(LeadLoaderBase):
+    """
+    Loader exposing one record of another loader, so each lead can run in its
+    own graph (e.g. batch jobs). Updates are written to the wrapped loader.
+    """
+
+    def __init__(self, loader: LeadLoaderBase, record, lock=None):
+        self.loader = loader
+        self.record = record
+        # Shared by the leads of the same loader (in-memory loaders aren't thread-safe)
+        self.lock = lock or threading.Lock()
+
+    def fetch_records(self, status_filter=""):
+        return [self.record]
+
+    def update_record(self, lead_id, update_data):
+        with self.lock:
+            return self.loader.update_record(lead_id, update_data)
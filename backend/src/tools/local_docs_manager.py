@@ -0,0 +1,85 @@
+import os
+import re
+import shutil
+import asyncio
+
+
+class LocalDocsManager:
+    """
+    Drop-in replacement of `GoogleDocsManager` writing documents to a local
+    folder tree, for offline runs and benchmarks (no Google credentials needed).
+    """
+
+    def __init__(self, root="reports/local_docs"):
+        self.root = root
+
+    @staticmethod
+    def _file_name(title):
+        return re.sub(r"[^\w\-. ]", "_", title).strip() or "untitled"
+
+    def _folder(self, folder_path):
+        path = os.path.join(self.root, *folder_path.split("/"))
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def ensure_folder_path(self, folder_path, make_shareable=False):
+        path = self._folder(folder_path)
+        return path, os.path.abspath(path)
+
+    def folder_has_files(self, folder_path: str) -> bool:
+        return bool(os.listdir(self._folder(folder_path)))
+
+    def document_exists_in_folder(self, folder_path: str, title: str) -> bool:
+        if not title:
+            return False
+        folder = self._folder(folder_path)
+        return any(
+            os.path.exists(os.path.join(folder, self._file_name(title) + extension))
+            for extension in (".md", ".txt")
+        )
+
+    def add_document(
+        self,
+        content,
+        doc_title,
+        folder_name,
+        make_shareable=False,
+        folder_shareable=False,
+        markdown=False,
+    ):
+        """
+        Save the document as a markdown/text file in the specified folder.
+        """
+        folder = self._folder(folder_name)
+        extension = ".md" if markdown else ".txt"
+        document_path = os.path.join(folder, self._file_name(doc_title) + extension)
+        with open(document_path, "w", encoding="utf-8") as f:
+            f.write(content or "")
+        document_url = os.path.abspath(document_path)
+        return {
+            "document_url": document_url,
+            "shareable_url": document_url if make_shareable else None,
+            "folder_url": os.path.abspath(folder),
+        }
+
+    def upload_file(self, file_path, file_name, folder_name, make_shareable=False):
+        """
+        Copy a binary file into the specified folder.
+        """
+        destination = os.path.join(self._folder(folder_name), file_name)
+        shutil.copyfile(file_path, destination)
+        return os.path.abspath(destination)
+
+    async def aensure_folder_path(self, folder_path, make_shareable=False):
+        return await asyncio.to_thread(self.ensure_folder_path, folder_path, make_shareable)
+
+    async def adocument_exists_in_folder(self, folder_path: str, title: str) -> bool:
+        return await asyncio.to_thread(self.document_exists_in_folder, folder_path, title)
+
+    async def aadd_document(self, content, doc_title, folder_name, **kwargs):
+        return await asyncio.to_thread(self.add_document, content, doc_title, folder_name, **kwargs)
+
+    async def aupload_file(self, file_path, file_name, folder_name, make_shareable=False):
+        return await asyncio.to_thread(
+            self.upload_file, file_path, file_name, folder_name, make_shareable
+        )
@@ -2,6 +2,8 @@ import os
 from langchain_community.document_loaders import DirectoryLoader
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain_chroma import Chroma
+from src.usage import track_usage
+from .base.fake_tools import FAKE_TOOLS, fake_case_study
 
 def get_vector_store():
     """Get or create the vector store."""
@@ -19,8 +21,11 @@ def get_vector_store():
     
     return vectorstore
 
+@track_usage("case_study_search")
 def fetch_similar_case_study(description):
     """Fetch the most similar case study to the given description."""
+    if FAKE_TOOLS:
+        return fake_case_study(description)
     vectorstore = get_vector_store()
     vectorstore_retreiver = vectorstore.as_retriever(search_kwargs={"k": 1})
     docs = vectorstore_retreiver.invoke(description)
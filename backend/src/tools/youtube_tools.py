@@ -1,5 +1,8 @@
 import re, os
+import asyncio
 import googleapiclient.discovery
+from src.usage import track_usage
+from .base.fake_tools import FAKE_TOOLS, fake_youtube_stats
 
 
 def build_youtube_client():
@@ -156,7 +159,10 @@ def get_channel_videos_stats(channel_id):
     }
 
 
+@track_usage("youtube")
 def get_youtube_stats(channel_url):
+    if FAKE_TOOLS:
+        return fake_youtube_stats(channel_url)
     # Attempt to extract a channel ID directly from URL
     channel_id = extract_channel_id_from_url(channel_url)
     if not channel_id:
@@ -188,5 +194,14 @@ def get_youtube_stats(channel_url):
     return youtube_data
 
 
+@track_usage("youtube")
+async def aget_youtube_stats(channel_url):
+    """
+    Async version of `get_youtube_stats`. The Google API client is sync-only,
+    so the calls run in a worker thread.
+    """
+    return await asyncio.to_thread(get_youtube_stats.__wrapped__, channel_url)
+
+
 if __name__ == "__main__":
     print(get_youtube_stats("https://www.youtube.com/channel/UCh2jMEvFpPZMpNWtkWEojwg"))
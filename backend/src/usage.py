@@ -0,0 +1,225 @@
+import os
+import time
+import logging
+import inspect
+import functools
+import threading
+import contextvars
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+# Job-level usage collector, node name and lead id of the running graph step
+job_usage = contextvars.ContextVar("job_usage", default=None)
+current_node = contextvars.ContextVar("current_node", default="")
+current_lead_id = contextvars.ContextVar("current_lead_id", default="")
+
+# Enable or disable appending the per-lead usage columns to the processed file
+USAGE_COLUMNS_IN_OUTPUT = os.getenv("USAGE_COLUMNS_IN_OUTPUT", "false").lower() in ("1", "true", "yes")
+
+# Price per 1M tokens (input, output) in USD, used for cost estimates
+MODEL_PRICES = {
+    "gemini-2.5-pro": (1.25, 10.0),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gpt-4o": (2.50, 10.0),
+    "gpt-4o-mini": (0.15, 0.60),
+    "claude-sonnet-4-5": (3.0, 15.0),
+    "claude-haiku-4-5": (1.0, 5.0),
+}
+
+STAT_FIELDS = (
+    "calls",
+    "errors",
+    "retries",
+    "cache_hits",
+    "input_tokens",
+    "output_tokens",
+    "wall_time",
+    "node_time",
+    "cost",
+    "saved_tokens",
+)
+
+
+def estimate_cost(model, input_tokens, output_tokens) -> float:
+    input_price, output_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+
+class JobUsage:
+    """
+    Thread-safe collector of calls, tokens, wall time, retries and cache hits
+    for one job, attributed to (lead id, node name, resource).
+    """
+
+    def __init__(self):
+        self.stats = defaultdict(lambda: dict.fromkeys(STAT_FIELDS, 0))
+        self.lock = threading.Lock()
+
+    def record(self, resource, lead_id="", node="", **values):
+        with self.lock:
+            stats = self.stats[(lead_id, node, resource)]
+            for field, value in values.items():
+                stats[field] += value
+
+    def _aggregate(self, key_index):
+        totals = defaultdict(lambda: dict.fromkeys(STAT_FIELDS, 0))
+        with self.lock:
+            items = list(self.stats.items())
+        for key, stats in items:
+            group = key[key_index] if key_index is not None else "total"
+            for field in STAT_FIELDS:
+                totals[group][field] += stats[field]
+        return {
+            group: {field: round(value, 4) for field, value in stats.items()}
+            for group, stats in totals.items()
+        }
+
+    def summary(self):
+        """
+        Summarize the job usage in total, per lead, per node and per resource.
+        """
+        return {
+            "total": self._aggregate(None).get("total", dict.fromkeys(STAT_FIELDS, 0)),
+            "per_lead": self._aggregate(0),
+            "per_node": self._aggregate(1),
+            "per_resource": self._aggregate(2),
+        }
+
+    def lead_columns(self):
+        """
+        Per-lead cost/latency columns to append to the processed leads file.
+        """
+        columns = {}
+        for lead_id, stats in self._aggregate(0).items():
+            if not lead_id:
+                continue
+            columns[lead_id] = {
+                "API_CALLS": stats["calls"],
+                "INPUT_TOKENS": stats["input_tokens"],
+                "OUTPUT_TOKENS": stats["output_tokens"],
+                "EST_COST_USD": round(stats["cost"], 4),
+                "PROCESSING_TIME_S": round(stats["node_time"], 1),
+            }
+        return columns
+
+
+def record_usage(resource, **values):
+    """
+    Record usage for the running job, attributed to the current node and lead.
+    No-op when no job collector is set.
+    """
+    usage = job_usage.get()
+    if usage is None:
+        return
+    usage.record(
+        resource, lead_id=current_lead_id.get(), node=current_node.get(), **values
+    )
+
+
+def track_usage(resource):
+    """
+    Decorator recording call count, errors and wall time of a tool function.
+    Wall time of tools is kept apart from `node_time` (time spent in graph nodes).
+    """
+
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                started_at = time.monotonic()
+                try:
+                    result = await fn(*args, **kwargs)
+                except Exception:
+                    record_usage(resource, calls=1, errors=1, wall_time=time.monotonic() - started_at)
+                    raise
+                record_usage(resource, calls=1, wall_time=time.monotonic() - started_at)
+                return result
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started_at = time.monotonic()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception:
+                record_usage(resource, calls=1, errors=1, wall_time=time.monotonic() - started_at)
+                raise
+            record_usage(resource, calls=1, wall_time=time.monotonic() - started_at)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def track_node(name, fn):
+    """
+    Wrap a graph node so everything it calls is attributed to the node and
+    the lead being processed, and record the node wall time.
+    Async nodes get an async wrapper.
+    """
+
+    def enter(state):
+        lead = state.get("current_lead") if isinstance(state, dict) else None
+        node_token = current_node.set(name)
+        lead_token = current_lead_id.set(str(getattr(lead, "id", "") or ""))
+        return node_token, lead_token, time.monotonic()
+
+    def exit(node_token, lead_token, started_at):
+        usage = job_usage.get()
+        if usage is not None:
+            usage.record(
+                "node",
+                lead_id=current_lead_id.get(),
+                node=name,
+                node_time=time.monotonic() - started_at,
+            )
+        current_lead_id.reset(lead_token)
+        current_node.reset(node_token)
+
+    if inspect.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def async_wrapper(state, *args, **kwargs):
+            tokens = enter(state)
+            try:
+                return await fn(state, *args, **kwargs)
+            finally:
+                exit(*tokens)
+
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(state, *args, **kwargs):
+        tokens = enter(state)
+        try:
+            return fn(state, *args, **kwargs)
+        finally:
+            exit(*tokens)
+
+    return wrapper
+
+
+def format_usage_summary(summary):
+    """
+    Human readable one-line-per-node summary for logs.
+    """
+    total = summary["total"]
+    lines = [
+        f"Usage: {total['calls']} API calls, {total['input_tokens']} input tokens, "
+        f"{total['output_tokens']} output tokens, {total['retries']} retries, "
+        f"{total['cache_hits']} cache hits, est. cost ${total['cost']:.4f}, "
+        f"{total['saved_tokens']} tokens saved by content reduction"
+    ]
+    for node, stats in sorted(
+        summary["per_node"].items(), key=lambda item: -item[1]["node_time"]
+    ):
+        if node:
+            lines.append(
+                f"  {node}: {stats['node_time']:.1f}s, {stats['calls']} calls, "
+                f"{stats['input_tokens'] + stats['output_tokens']} tokens"
+            )
+    return "\n".join(lines)
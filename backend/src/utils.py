@@ -1,10 +1,31 @@
 import os
+import time
+import asyncio
+import logging
 from datetime import datetime
 from langchain_core.messages import SystemMessage, HumanMessage
 from langchain_core.output_parsers import StrOutputParser
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
+from .llm.rate_limiter import get_provider_limiter, estimate_tokens, is_overload_error
+from .llm.prompt_cache import prompt_cache
+from .llm.retry import (
+    call_with_retries,
+    acall_with_retries,
+    backoff_delay,
+    is_retryable_error,
+    current_attempt,
+    MalformedOutputError,
+    LLMTimeoutError,
+    LLM_TIMEOUT_SECONDS,
+)
+from .llm.provider_pool import get_provider_pool, ProviderUnavailableError
+from .llm.streaming import stream_sink, TokenStreamForwarder
+from .llm.batch import batch_collector, BatchItemError, LLM_BATCH_PRICE_FACTOR
+from .usage import record_usage, estimate_cost
+
+logger = logging.getLogger(__name__)
 
 # Set the scopes for Google API
 SCOPES = [
@@ -18,6 +39,11 @@ SCOPES = [
 ]
 
 
+# Provider used by invoke_llm when none is given, set LLM_PROVIDER=fake
+# to run the whole graph against the offline fake provider
+DEFAULT_LLM_PROVIDER = os.getenv("LLM_PROVIDER", "google")
+
+
 def get_current_date():
     return datetime.now().strftime("%Y-%m-%d")
 
@@ -95,48 +121,386 @@ def save_reports_locally(reports):
             file.write(content)
 
 
-def get_llm_by_provider(llm_provider, model):
-    # Else find provider
-    if llm_provider == "openai":
+def get_llm_by_provider(llm_provider, model, cached_content=None, timeout=None):
+    # The client enforces the request deadline (`timeout` seconds) and leaves
+    # retries to `call_with_retries` (max_retries=0), so a hung call ends
+    # instead of holding its thread & limiter slot
+    if llm_provider == "fake":
+        # Offline provider for benchmarks & load tests (see src/llm/fake_provider.py)
+        from .llm.fake_provider import FakeChatModel
+
+        llm = FakeChatModel(model=model, timeout=timeout)
+    elif llm_provider == "openai":
         from langchain_openai import ChatOpenAI
 
-        llm = ChatOpenAI(model=model, temperature=0.1)
+        llm = ChatOpenAI(model=model, temperature=0.1, timeout=timeout, max_retries=0)
     elif llm_provider == "anthropic":
         from langchain_anthropic import ChatAnthropic
 
-        llm = ChatAnthropic(model=model, temperature=0.1)  # Use the correct model name
+        llm = ChatAnthropic(
+            model=model, temperature=0.1, timeout=timeout, max_retries=0
+        )  # Use the correct model name
     elif llm_provider == "google":
         from langchain_google_genai import ChatGoogleGenerativeAI
 
-        llm = ChatGoogleGenerativeAI(model="gemini-2.5-pro", temperature=0.1)
+        llm = ChatGoogleGenerativeAI(
+            model=model,
+            temperature=0.1,
+            cached_content=cached_content,
+            timeout=timeout,
+            max_retries=0,
+        )
     # ... add elif blocks for other providers ...
     else:
         raise ValueError(f"Unsupported LLM provider: {llm_provider}")
     return llm
 
 
+class LLMCall:
+    """
+    One LLM request as made by `invoke_llm` / `ainvoke_llm`: provider pool &
+    failover, prompt cache, rate limiting, streaming, structured output,
+    usage accounting and retries. The sync and async paths share everything
+    except how the provider is awaited.
+    """
+
+    def __init__(
+        self,
+        system_prompt,
+        user_message,
+        model="gemini-2.5-pro",
+        llm_provider=None,
+        response_format=None,
+        timeout=None,
+        max_retries=None,
+        hedge=None,
+        stream=False,
+        stream_label=None,
+        cache_prompt=False,
+        providers=None,
+    ):
+        self.system_prompt = system_prompt
+        self.user_message = user_message
+        self.model = model
+        self.response_format = response_format
+        self.timeout = LLM_TIMEOUT_SECONDS if timeout is None else timeout
+        self.max_retries = max_retries
+        self.hedge = hedge
+        self.stream_label = stream_label
+        self.cache_prompt = cache_prompt
+
+        # An explicit provider pins the call to it, otherwise the configured pool is used
+        if providers is None and llm_provider:
+            providers = [(llm_provider, 1)]
+        self.pool = get_provider_pool(providers, DEFAULT_LLM_PROVIDER)
+        # Providers that failed during this call, skipped by the next attempts
+        self.failed_providers = set()
+        self.last_attempt = {"provider": self.pool.providers[0], "model": model}
+
+        self.text_parser = StrOutputParser()
+        self.estimated_tokens = estimate_tokens(system_prompt) + estimate_tokens(user_message)
+
+        # Streaming only applies to text outputs and when a job stream is listening
+        self.sink = stream_sink.get()
+        self.stream = bool(stream and self.sink and not response_format)
+
+    def build_llm(self, llm_provider, model, cached=True):
+        # Build messages & base llm, referencing the provider prompt cache if enabled
+        if self.cache_prompt and cached:
+            messages, llm_kwargs = prompt_cache.prepare(
+                llm_provider,
+                model,
+                self.system_prompt,
+                self.user_message,
+                structured=bool(self.response_format),
+            )
+        else:
+            messages = [
+                SystemMessage(content=self.system_prompt),
+                HumanMessage(content=self.user_message),
+            ]
+            llm_kwargs = {}
+
+        # Get base llm
+        llm = get_llm_by_provider(llm_provider, model, timeout=self.timeout, **llm_kwargs)
+
+        # If Response format is provided the use structured output
+        # (the raw message is kept to read the token usage reported by the provider)
+        if self.response_format:
+            llm = llm.with_structured_output(self.response_format, include_raw=True)
+        return llm, messages, bool(llm_kwargs)
+
+    def batch_request(self):
+        """
+        Batch jobs: the request goes to the next provider batch. Returns
+        (True, output), or (False, None) to fall back to a regular call.
+        """
+        collector = batch_collector.get()
+        if collector is None:
+            return False, None
+        llm_provider, provider_model = self.pool.select(self.model)
+        started_at = time.monotonic()
+        try:
+            output, usage = collector.invoke(
+                self.system_prompt,
+                self.user_message,
+                llm_provider,
+                provider_model,
+                self.response_format,
+            )
+        except BatchItemError as e:
+            logger.warning(f"Batch request failed, calling {llm_provider} directly: {e}")
+            return False, None
+        record_usage(
+            f"llm:{provider_model}",
+            calls=1,
+            input_tokens=usage["input_tokens"],
+            output_tokens=usage["output_tokens"],
+            wall_time=time.monotonic() - started_at,
+            cost=LLM_BATCH_PRICE_FACTOR
+            * estimate_cost(provider_model, usage["input_tokens"], usage["output_tokens"]),
+        )
+        return True, output
+
+    def start_attempt(self):
+        llm_provider, provider_model = self.pool.select(self.model, exclude=self.failed_providers)
+        self.last_attempt.update(provider=llm_provider, model=provider_model)
+        return llm_provider, provider_model
+
+    def parse(self, result):
+        if self.response_format:
+            return result["raw"], result["parsed"]
+        return result, self.text_parser.invoke(result)
+
+    @staticmethod
+    def abandoned():
+        # The attempt timed out or lost its hedge: its outcome says nothing
+        # more about the provider (the timeout was already counted)
+        attempt = current_attempt.get()
+        return attempt is not None and attempt.abandoned
+
+    def record_failure(self, llm_provider, provider_model, error, started_at):
+        record_usage(
+            f"llm:{provider_model}", calls=1, errors=1, wall_time=time.monotonic() - started_at
+        )
+        if self.abandoned():
+            return
+        self.pool.record_failure(llm_provider, error)
+        self.failed_providers.add(llm_provider)
+        # Errors that retrying won't fix (auth, quota...) may not happen on another provider
+        if not is_retryable_error(error) and self.pool.has_alternative(self.failed_providers):
+            raise ProviderUnavailableError(f"{llm_provider} failed: {error}") from error
+
+    def record_success(self, llm_provider, provider_model, raw, output, started_at):
+        if not self.abandoned():
+            self.pool.record_success(llm_provider)
+        usage = getattr(raw, "usage_metadata", None) or {}
+        input_tokens = usage.get("input_tokens") or self.estimated_tokens
+        output_tokens = usage.get("output_tokens") or estimate_tokens(output)
+        cached_tokens = (usage.get("input_token_details") or {}).get("cache_read") or 0
+        record_usage(
+            f"llm:{provider_model}",
+            calls=1,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cache_hits=1 if cached_tokens else 0,
+            wall_time=time.monotonic() - started_at,
+            cost=estimate_cost(provider_model, input_tokens, output_tokens),
+        )
+
+        # Malformed structured outputs are retried like transient errors
+        if self.response_format and output is None:
+            raise MalformedOutputError(
+                f"LLM returned no parsable {self.response_format.__name__} output"
+            )
+        return output
+
+    def on_retry(self, error):
+        record_usage(f"llm:{self.last_attempt['model']}", retries=1)
+        if isinstance(error, LLMTimeoutError):
+            # Abandoned attempts (hedged calls past their deadline) don't raise inside the call
+            self.pool.record_failure(self.last_attempt["provider"], error)
+            self.failed_providers.add(self.last_attempt["provider"])
+
+    def backoff(self, attempt, error):
+        # Fail over to another healthy provider right away
+        if self.pool.has_alternative(self.failed_providers):
+            logger.info(f"Failing over from {self.last_attempt['provider']} to another provider")
+            return 0
+        return backoff_delay(attempt)
+
+    def retry_options(self):
+        output_kind = self.response_format.__name__ if self.response_format else "text"
+        return {
+            "timeout": self.timeout,
+            "max_retries": self.max_retries,
+            # A hedged duplicate would stream the same text twice
+            "hedge": False if self.stream else self.hedge,
+            "latency_key": f"{'+'.join(self.pool.providers)}:{self.model}:{output_kind}",
+            "on_retry": self.on_retry,
+            "backoff": self.backoff,
+        }
+
+    # Sync path
+
+    def run(self, llm, messages):
+        if self.stream:
+            forwarder = TokenStreamForwarder(self.sink, self.stream_label or "LLM output")
+            raw = None
+            try:
+                for chunk in llm.stream(messages):
+                    raw = chunk if raw is None else raw + chunk
+                    forwarder.push(self.text_parser.invoke(chunk))
+            finally:
+                forwarder.finish()
+            return raw
+        return llm.invoke(messages)
+
+    def call(self):
+        started_at = time.monotonic()
+        llm_provider, provider_model = self.start_attempt()
+        limiter = get_provider_limiter(llm_provider)
+        # Invoke LLM through the process-wide provider limiter so concurrent
+        # leads/jobs share the provider's request & token budget
+        try:
+            with limiter.limit(self.estimated_tokens, attempt=current_attempt.get()) as debit_tokens:
+                llm, messages, uses_cache = self.build_llm(llm_provider, provider_model)
+                try:
+                    result = self.run(llm, messages)
+                except Exception as e:
+                    if not uses_cache or is_overload_error(e):
+                        raise
+                    # The cache may have expired or been evicted: drop it and resend the full prompt
+                    prompt_cache.invalidate(llm_provider, provider_model, self.system_prompt)
+                    llm, messages, _ = self.build_llm(llm_provider, provider_model, cached=False)
+                    result = self.run(llm, messages)
+
+                raw, output = self.parse(result)
+                debit_tokens(estimate_tokens(output))
+        except Exception as e:
+            self.record_failure(llm_provider, provider_model, e, started_at)
+            raise
+        return self.record_success(llm_provider, provider_model, raw, output, started_at)
+
+    def invoke(self):
+        batched, output = self.batch_request()
+        if batched:
+            return output
+        return call_with_retries(self.call, **self.retry_options())
+
+    # Async path
+
+    async def arun(self, llm, messages):
+        if self.stream:
+            forwarder = TokenStreamForwarder(self.sink, self.stream_label or "LLM output")
+            raw = None
+            try:
+                async for chunk in llm.astream(messages):
+                    raw = chunk if raw is None else raw + chunk
+                    forwarder.push(self.text_parser.invoke(chunk))
+            finally:
+                forwarder.finish()
+            return raw
+        return await llm.ainvoke(messages)
+
+    async def abuild_llm(self, llm_provider, model):
+        if self.cache_prompt:
+            # Preparing the prompt cache may create it (network call): off the event loop
+            return await asyncio.to_thread(self.build_llm, llm_provider, model)
+        return self.build_llm(llm_provider, model)
+
+    async def acall(self):
+        started_at = time.monotonic()
+        llm_provider, provider_model = self.start_attempt()
+        limiter = get_provider_limiter(llm_provider)
+        try:
+            async with limiter.alimit(self.estimated_tokens) as debit_tokens:
+                llm, messages, uses_cache = await self.abuild_llm(llm_provider, provider_model)
+                try:
+                    result = await self.arun(llm, messages)
+                except Exception as e:
+                    if not uses_cache or is_overload_error(e):
+                        raise
+                    # The cache may have expired or been evicted: drop it and resend the full prompt
+                    prompt_cache.invalidate(llm_provider, provider_model, self.system_prompt)
+                    llm, messages, _ = self.build_llm(llm_provider, provider_model, cached=False)
+                    result = await self.arun(llm, messages)
+
+                raw, output = self.parse(result)
+                debit_tokens(estimate_tokens(output))
+        except Exception as e:
+            self.record_failure(llm_provider, provider_model, e, started_at)
+            raise
+        return self.record_success(llm_provider, provider_model, raw, output, started_at)
+
+    async def ainvoke(self):
+        if batch_collector.get() is not None:
+            # Batch results are awaited in a thread, batch jobs aren't latency bound
+            batched, output = await asyncio.to_thread(self.batch_request)
+            if batched:
+                return output
+        return await acall_with_retries(self.acall, **self.retry_options())
+
+
 def invoke_llm(
     system_prompt,
     user_message,
     model="gemini-2.5-pro",  # Specify the model name according to the provider
-    llm_provider="google",  # By default use Google as provider
+    llm_provider=None,  # Defaults to LLM_PROVIDER (Google unless overridden)
     response_format=None,
+    timeout=None,  # Per-attempt timeout in seconds, defaults to LLM_TIMEOUT_SECONDS
+    max_retries=None,  # Defaults to LLM_MAX_RETRIES
+    hedge=None,  # Send a duplicate request on slow calls, defaults to LLM_HEDGE_REQUESTS
+    stream=False,  # Forward text chunks to the job's WebSocket stream while generating
+    stream_label=None,  # Name shown with the streamed chunks in the console
+    cache_prompt=False,  # Register the (static) system prompt with the provider cache
+    providers=None,  # Weighted provider pool, e.g. "google:3,openai:1", defaults to LLM_PROVIDER_POOL
 ):
-    messages = [
-        SystemMessage(content=system_prompt),
-        HumanMessage(content=user_message),
-    ]
-
-    # Get base llm
-    llm = get_llm_by_provider(llm_provider, model)
-
-    # If Response format is provided the use structured output
-    if response_format:
-        llm = llm.with_structured_output(response_format)
-    else:  # Esle use parse string output
-        llm = llm | StrOutputParser()
+    return LLMCall(
+        system_prompt,
+        user_message,
+        model=model,
+        llm_provider=llm_provider,
+        response_format=response_format,
+        timeout=timeout,
+        max_retries=max_retries,
+        hedge=hedge,
+        stream=stream,
+        stream_label=stream_label,
+        cache_prompt=cache_prompt,
+        providers=providers,
+    ).invoke()
 
-    # Invoke LLM
-    output = llm.invoke(messages)
 
-    return output
+async def ainvoke_llm(
+    system_prompt,
+    user_message,
+    model="gemini-2.5-pro",
+    llm_provider=None,
+    response_format=None,
+    timeout=None,
+    max_retries=None,
+    hedge=None,
+    stream=False,
+    stream_label=None,
+    cache_prompt=False,
+    providers=None,
+):
+    """
+    Async version of `invoke_llm` (same arguments), awaiting the provider
+    on the running event loop instead of blocking a thread.
+    """
+    return await LLMCall(
+        system_prompt,
+        user_message,
+        model=model,
+        llm_provider=llm_provider,
+        response_format=response_format,
+        timeout=timeout,
+        max_retries=max_retries,
+        hedge=hedge,
+        stream=stream,
+        stream_label=stream_label,
+        cache_prompt=cache_prompt,
+        providers=providers,
+    ).ainvoke()
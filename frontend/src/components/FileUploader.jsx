@@ -11,6 +11,8 @@ const FileUploader = () => {
     const [progress, setProgress] = useState(0);
     const fileInputRef = useRef(null);
     const wsRef = useRef(null);
+    // Streamed LLM outputs being generated, keyed by stream_id
+    const streamsRef = useRef({});
 
     const handleDragOver = (e) => {
         e.preventDefault();
@@ -103,6 +105,26 @@ const FileUploader = () => {
         }
     };
 
+    const handleStreamEvent = (event) => {
+        // Keep a single, live-updated console line per streamed report
+        const stream = streamsRef.current[event.stream_id] || { text: '' };
+        stream.text += event.text;
+        streamsRef.current[event.stream_id] = stream;
+
+        const tail = stream.text.slice(-200).replace(/\s+/g, ' ');
+        const line = event.done
+            ? `Finished writing ${event.label} (${stream.text.length} chars)`
+            : `Writing ${event.label} (${stream.text.length} chars)... ${tail}`;
+
+        setLogs(prev => {
+            if (stream.index === undefined) stream.index = prev.length;
+            const next = [...prev];
+            next[stream.index] = line;
+            return next;
+        });
+        if (event.done) delete streamsRef.current[event.stream_id];
+    };
+
     const connectWebSocket = (fileId) => {
         const apiUrl = import.meta.env.VITE_API_URL || `http://${window.location.hostname}:8000`;
         const wsProtocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
@@ -119,8 +141,8 @@ const FileUploader = () => {
             const message = event.data;
 
             try {
-                // Check if it's a JSON message (final result)
-                if (message.startsWith('{') && message.includes('COMPLETED')) {
+                // Check if it's a JSON message (final result or streamed LLM output)
+                if (message.startsWith('{')) {
                     const result = JSON.parse(message);
                     if (result.type === 'COMPLETED') {
                         setAnalysisResult(result);
@@ -128,6 +150,16 @@ const FileUploader = () => {
                         setProgress(100);
                         setLogs(prev => [...prev, 'Analysis completed successfully!']);
                         ws.close();
+                    } else if (result.type === 'LLM_STREAM') {
+                        handleStreamEvent(result);
+                    } else if (result.type === 'USAGE_SUMMARY') {
+                        const total = result.usage.total;
+                        setLogs(prev => [...prev,
+                            `Usage: ${total.calls} API calls, ${total.input_tokens + total.output_tokens} tokens, ` +
+                            `${total.retries} retries, ${total.cache_hits} cache hits, est. cost $${total.cost.toFixed(4)}`
+                        ]);
+                    } else {
+                        setLogs(prev => [...prev, message]);
                     }
                 } else {
                     // Regular log message